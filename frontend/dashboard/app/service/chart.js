@@ -3,6 +3,20 @@ import "../globals.css";
 import React, { useEffect, useState, useRef } from "react";
 import ApexCharts from "apexcharts";
 
+const API_URL = "http://localhost:8000";
+const DAY = 24 * 60 * 60;
+
+// Ambil data agregat dari backend, bukan seluruh baris per frame
+async function fetchJson(path, params) {
+  const response = await fetch(`${API_URL}${path}?${new URLSearchParams(params)}`);
+  if (!response.ok) throw new Error("Network response was not ok");
+  return response.json();
+}
+
+function secondsAgo(seconds) {
+  return Math.floor(Date.now() / 1000) - seconds;
+}
+
 export function Chart() {
   const [data, setData] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -13,31 +27,29 @@ export function Chart() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await fetch("/api/person");
-        if (!response.ok) throw new Error("Network response was not ok");
-
-        const result = await response.json();
-        const personCounts = result.map((row) => ({
-          person_count: row.person_count,
-          // Tambahkan atribut lain yang diperlukan
-        }));
-
-        const averagePersonCount = Math.max(
-          ...personCounts.map((row) => row.person_count)
-        );
-
-        setAverage(averagePersonCount);
-        const limitedData = result
-          .filter((row) => row.person_count >= 1)
-          .slice(-5)
-          .sort((a, b) => b.person_count - a.person_count); // Filter untuk mendapatkan hanya entri dengan person_count >= 40
-
-        const personData = limitedData.map((row) => row.person_count);
-        const headData = limitedData.map((row) => row.head_count);
+        // Puncak 7 hari terakhir dan 5 hari terakhir per hari (maksimum per hari)
+        const [summary, daily] = await Promise.all([
+          fetchJson("/api/person/summary", {}),
+          fetchJson("/api/person/rollup", {
+            resolution: "minute",
+            bucket: DAY,
+            start: secondsAgo(5 * DAY),
+            order: "desc",
+            limit: 5,
+          }),
+        ]);
+
+        setAverage(summary.person_max ?? 0);
+        const limitedData = daily.items
+          .filter((row) => row.person_max >= 1)
+          .sort((a, b) => b.person_max - a.person_max);
+
+        const personData = limitedData.map((row) => row.person_max);
+        const headData = limitedData.map((row) => row.head_max);
         const categories = limitedData.map((row) => {
-          const date = new Date(row.created_at);
+          const date = new Date(row.bucket * 1000);
           return date.toLocaleDateString("id-ID", { weekday: "long" }); // Mengambil nama hari dalam Bahasa Indonesia
-        }); // Assuming created_at is the category
+        });
 
         setData({
           categories,
@@ -221,33 +233,11 @@ export function Pie() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await fetch("/api/person");
-        if (!response.ok) {
-          throw new Error("Network response was not ok");
-        }
-
-        const result = await response.json();
-        const personCounts = result.map((row) => row.person_count);
-        const averagePersonCount =
-          personCounts.reduce((sum, count) => sum + count, 0) /
-          personCounts.length;
-
-        setAverage(averagePersonCount);
-
-        const headAndPersonData = result.map((item) => ({
-          head_count: item.head_count, // Ambil 'head_count'
-          person_count: item.person_count, // Ambil 'person_count'
-        }));
-
-        const sortedByHead = [...headAndPersonData].sort(
-          (a, b) => b.head_count - a.head_count
-        );
-        const sortedByPerson = [...headAndPersonData].sort(
-          (a, b) => b.person_count - a.person_count
-        );
-
-        const highestPerson = sortedByPerson[0].person_count;
-        const highestHead = sortedByHead[0].head_count;
+        const summary = await fetchJson("/api/person/summary", {});
+        setAverage(summary.person_avg ?? 0);
+
+        const highestPerson = summary.person_max ?? 0;
+        const highestHead = summary.head_max ?? 0;
 
         setData({ highestPerson, highestHead });
       } catch (err) {
@@ -491,29 +481,25 @@ export function Line() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await fetch("/api/person");
-        if (!response.ok) throw new Error("Network response was not ok");
-
-        const result = await response.json();
-
-        const limitedData = result.slice(0, 20);
-        const personCounts = result.map((row) => row.person_count);
-        const averagePersonCount =
-          personCounts.reduce((sum, count) => sum + count, 0) /
-          personCounts.length;
-
-        setAverage(averagePersonCount);
+        // 20 menit terakhir per menit, ditambah rata-rata 7 hari terakhir
+        const [summary, minutes] = await Promise.all([
+          fetchJson("/api/person/summary", {}),
+          fetchJson("/api/person/rollup", { resolution: "minute", order: "desc", limit: 20 }),
+        ]);
+        const limitedData = minutes.items.reverse();
+
+        setAverage(summary.person_avg ?? 0);
         // Map and format data for chart categories and series
         const categories = limitedData.map((row) => {
-          const date = new Date(row.created_at);
+          const date = new Date(row.bucket * 1000);
           return date.toLocaleTimeString([], {
             hour: "2-digit",
             hour12: false,
             minute: "2-digit",
           });
         });
-        const personData = limitedData.map((row) => row.person_count);
-        const headData = limitedData.map((row) => row.head_count);
+        const personData = limitedData.map((row) => Math.round(row.person_avg));
+        const headData = limitedData.map((row) => Math.round(row.head_avg));
 
         setData({
           categories,
@@ -8,6 +8,7 @@ export function Video() {
   const [file, setFile] = useState(null);
   const [isUploading, setIsUploading] = useState(false);
   const [selectedVideoRef, setSelectedVideoRef] = useState("videoRef1"); // State to switch between refs
+  const [playlists, setPlaylists] = useState(null); // HLS playlists of the last submitted job
   const videoRef1 = useRef(null);
   const videoRef2 = useRef(null);
 
@@ -46,7 +47,7 @@ export function Video() {
       );
 
       if (response.status === 200) {
-        // Process successful upload here if needed
+        setPlaylists(response.data.playlists);
       } else {
         alert("Error: Unable to upload video.");
       }
@@ -62,17 +63,22 @@ export function Video() {
   const loadVideo = (ref) => {
     const video = ref.current;
     const videoSource =
-      ref === videoRef1
-        ? "http://localhost:8000/heatsmap/mapsoutput.m3u8"
-        : "http://localhost:8000/hls_output/output.m3u8"; // Adjust URLs as needed
+      "http://localhost:8000" +
+      (ref === videoRef1 ? playlists.heatmap : playlists.annotated);
 
     if (Hls.isSupported()) {
-      const hls = new Hls();
+      // The playlist appears once the queued job starts, keep retrying until then
+      const hls = new Hls({
+        lowLatencyMode: true,
+        manifestLoadingMaxRetry: 30,
+        manifestLoadingRetryDelay: 2000,
+      });
       hls.loadSource(videoSource);
       hls.attachMedia(video);
       hls.on(Hls.Events.MANIFEST_PARSED, () => {
         video.play();
       });
+      return () => hls.destroy();
     } else if (video.canPlayType("application/vnd.apple.mpegurl")) {
       video.src = videoSource;
       video.addEventListener("loadedmetadata", () => {
@@ -82,11 +88,12 @@ export function Video() {
   };
 
   useEffect(() => {
-    // Load video source when selectedVideoRef changes
+    // Load video source when selectedVideoRef or the submitted job changes
+    if (!playlists) return;
     const selectedRef =
       selectedVideoRef === "videoRef1" ? videoRef1 : videoRef2;
-    loadVideo(selectedRef);
-  }, [selectedVideoRef]);
+    return loadVideo(selectedRef);
+  }, [selectedVideoRef, playlists]);
 
   return (
     <div
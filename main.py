@@ -1,19 +1,26 @@
+import atexit
 import os
+import threading
 import torch
 import cv2
 import supervision as sv
-import sqlite3
 import datetime
 import pytz
-from flask import Flask, request, jsonify, Response, send_from_directory
-from ultralytics import YOLO
+from flask import Flask, request, jsonify, Response, send_from_directory, stream_with_context
 from flasgger import Swagger, swag_from
 from flask_cors import CORS
-from vidgear.gears import VideoGear, WriteGear
-import threading
+import uuid
 import matplotlib.pyplot as plt
 import numpy as np
 from ultralytics.solutions import heatmap
+from service import (DB_PATH, CameraHub, CheckpointStore, CountingStage, DetectionWriter, EncoderStage, FramePipeline,
+                     HeatmapOverlayStage, HeatmapSnapshotStage, HeatmapStore, InferenceBroker, JobScheduler,
+                     ModelRegistry, OverlayRenderer, PreviewHub, PreviewStage, QueueFullError, Stage)
+from service.cache import DetectionCache, file_hash
+from service.database import connect, delete_frames, query_rollup, query_summary
+from service.detection_log import DetectionLog, DetectionLogStage
+from service.heatmaps import KEY_PATTERN
+from service.hls import MIMETYPES, hls_params, prune_job_dirs
 
 app = Flask(__name__)
 swagger = Swagger(app)
@@ -26,182 +33,244 @@ if not os.path.exists(OUTPUT_FOLDER):
 # Mengatur device untuk menggunakan GPU jika tersedia
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
 
-# Inisialisasi model YOLO
-model = YOLO('best.pt')
-
-# Membuat koneksi ke SQLite
-def setup_database():
-    conn = sqlite3.connect('detections.db')
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS person (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-        person_count INTEGER,
-        head_count INTEGER,
-        created_at DATETIME DEFAULT (DATETIME('now', 'localtime'))
-    )''')
-    conn.commit()
-    return conn
-
-# Fungsi untuk mendeteksi objek
-def detect_objects(frame):
-    results = model(frame)[0]
+# Registry model: setiap file weights dimuat dan di-warmup sekali, lalu dipakai bersama oleh semua job
+# MODEL_BACKEND: 'pytorch', 'onnx' atau 'openvino' (weights .pt diekspor sekali ke format tersebut)
+model_registry = ModelRegistry(
+    backend=os.getenv('MODEL_BACKEND', 'pytorch'),
+    device=os.getenv('MODEL_DEVICE', device),
+    imgsz=int(os.getenv('MODEL_IMGSZ', 640)),
+)
+model = model_registry.get(os.getenv('MODEL_WEIGHTS', 'best.pt'))
+
+# Muat dan warmup model di background agar server langsung bisa menerima request, status terlihat di /health
+threading.Thread(target=model.load, name='model-warmup', daemon=True).start()
+
+# Micro-batching inferensi: frame dari job dan kamera yang berjalan bersamaan digabung menjadi satu batch berisi
+# maksimal INFERENCE_BATCH frame, frame tertua menunggu paling lama INFERENCE_MAX_WAIT_MS; 1 = nonaktif.
+# Backend harus menerima batch (pytorch, bukan ekspor onnx/openvino dengan batch tetap 1)
+INFERENCE_BATCH = int(os.getenv('INFERENCE_BATCH', 1))
+detector = model
+if INFERENCE_BATCH > 1:
+    detector = InferenceBroker(model, max_batch=INFERENCE_BATCH,
+                               max_wait=float(os.getenv('INFERENCE_MAX_WAIT_MS', 5)) / 1000)
+    atexit.register(detector.stop)
+
+# Penulis database asinkron: baris per frame di-batch dan di-commit dalam satu transaksi (mode WAL)
+detection_writer = DetectionWriter(
+    DB_PATH,
+    batch_size=int(os.getenv('DB_BATCH_SIZE', 500)),
+    flush_interval=float(os.getenv('DB_FLUSH_MS', 500)) / 1000,
+)
+atexit.register(detection_writer.close)
+
+# Log kolumnar opsional berisi setiap box (frame, track_id, kelas, conf, xyxy) per video/kamera, agar analitik baru
+# (dwell time, zona, arus) bisa dihitung ulang offline tanpa memproses video lagi; DETECTION_LOG=1 untuk mengaktifkan
+detection_log = None
+if os.getenv('DETECTION_LOG', '0') == '1':
+    detection_log = DetectionLog(os.path.abspath(os.getenv('DETECTION_LOG_ROOT', 'detection_log')),
+                                 chunk_rows=int(os.getenv('DETECTION_LOG_CHUNK_ROWS', 65536)))
+    atexit.register(detection_log.close)
+
+# Ambang confidence untuk penghitungan, sama dengan default model(frame) sebelumnya (model.track memakai conf=0.1)
+DETECTION_CONF = 0.25
+
+# Deteksi setiap N frame (atau 'auto' sesuai latensi inferensi vs fps video), frame lain memakai prediksi Kalman tracker
+INFERENCE_STRIDE = os.getenv('INFERENCE_STRIDE', '1')
+INFERENCE_STRIDE = INFERENCE_STRIDE if INFERENCE_STRIDE == 'auto' else int(INFERENCE_STRIDE)
+INFERENCE_MAX_STRIDE = int(os.getenv('INFERENCE_MAX_STRIDE', 8))
+
+# Decode video di thread pipeline ('thread') atau di proses terpisah lewat shared memory ('process')
+VIDEO_DECODE = os.getenv('VIDEO_DECODE', 'thread')
+
+# Jumlah per kelas yang disimpan ke database dan ditampilkan di HUD (kunci packet.data -> nama kelas model)
+COUNT_FIELDS = {'person_count': 'Person', 'head_count': 'Head'}
+
+# Fungsi untuk mengambil deteksi dari hasil tracking untuk anotasi
+def extract_detections(results):
     detections = sv.Detections.from_ultralytics(results)
-    person_count = sum(1 for name in detections.data['class_name'] if name == 'Person')
-    head_count = sum(1 for name in detections.data['class_name'] if name == 'Head')
-    return detections, person_count, head_count
-
-# Fungsi untuk menyimpan hasil deteksi ke database
-def save_detection(cursor, person_count, head_count):
-    cursor.execute('''INSERT INTO person (person_count, head_count) VALUES (?, ?)''', (person_count, head_count))
-    cursor.connection.commit()
-
-# Fungsi untuk menambahkan anotasi pada frame
-def annotate_frame(frame, detections, person_count, head_count):
-    bounding_box_annotator = sv.BoundingBoxAnnotator()
-    label_annotator = sv.LabelAnnotator()
-    annotated_frame = bounding_box_annotator.annotate(scene=frame, detections=detections)
-    annotated_frame = label_annotator.annotate(scene=annotated_frame, detections=detections)
-
-    frame_height, frame_width, _ = frame.shape
-    text = f'Person: {person_count}'
-    text_head = f'Head: {head_count}'
-    
-    text_x = frame_width - 200
-    text_y_person = 30
-    text_y_head = 60
-
-    cv2.putText(annotated_frame, text, (text_x, text_y_person), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-    cv2.putText(annotated_frame, text_head, (text_x, text_y_head), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-    status_text = 'Crowded' if person_count > 15 else 'Uncrowded'
-    text_color = (0, 0, 255) if person_count > 15 else (0, 255, 0)
-
-    text_y_status = text_y_person + 70
-    cv2.putText(annotated_frame, status_text, (text_x, text_y_status), cv2.FONT_HERSHEY_SIMPLEX, 1, text_color, 2)
-
-    return annotated_frame
-
-def heatmaps(video_path):
-    # Initialize heatmap generator and video capture
-    heatmap_obj = heatmap.Heatmap()
-    cap = cv2.VideoCapture(video_path)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-
-    # Output directory
-    output_heatmap_folder = 'output_heatsmap'
-    os.makedirs(output_heatmap_folder, exist_ok=True)
-    output_heatmap_path = os.path.join(output_heatmap_folder, 'mapsoutput.m3u8')
-
-    # Initialize accumulation heatmap matrix
-    heatmap_accumulator = np.zeros((height, width), dtype=np.float32)
-
-    # Parameters for HLS stream
-    heatmap_params = {
-        "-input_framerate": fps,
-        '-s': f'{width}x{height}',
-        "-vcodec": "libx264",
-        "-preset": "ultrafast",
-        "-tune": "zerolatency",
-        "-f": "hls",
-        "-hls_time": "2",
-        "-hls_list_size": "0",
-        "-hls_flags": "append_list",
-        '-hls_segment_filename': os.path.join(output_heatmap_folder, 'segment_%03d.ts'),
-        "-g": str(fps * 2)
-    }
-
-    # WriteGear for HLS output
-    writer_hls2 = WriteGear(output=output_heatmap_path, compression_mode=True, logging=True, **heatmap_params)
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Detect objects and generate per-frame heatmap
-        tracks = model.track(frame, persist=True)
-        frame_heatmap = heatmap_obj.generate_heatmap(frame, tracks)
-
-        # Accumulate heatmap by adding intensities
-        gray_frame_heatmap = cv2.cvtColor(frame_heatmap, cv2.COLOR_BGR2GRAY)
-        heatmap_accumulator += gray_frame_heatmap.astype(np.float32)  # Accumulate over time
-
-        # Write current frame heatmap to HLS stream
-        writer_hls2.write(frame_heatmap)
-
-    # Normalize accumulated heatmap to [0, 255] range
-    normalized_heatmap = cv2.normalize(heatmap_accumulator, None, 0, 255, cv2.NORM_MINMAX)
-    normalized_heatmap = normalized_heatmap.astype(np.uint8)
-
-    # Apply colormap to make heatmap visual (e.g., red for high intensity)
-    final_heatmap_img = cv2.applyColorMap(normalized_heatmap, cv2.COLORMAP_JET)
-
-    # Save the final heatmap image
-    final_heatmap_path = os.path.join(output_heatmap_folder, 'final_heatmap.png')
-    cv2.imwrite(final_heatmap_path, final_heatmap_img)
-
-    # Release resources
-    cap.release()
-    writer_hls2.close()
-
-# Fungsi untuk streaming dan mendeteksi
-def stream_and_detect(video_path):
-    # Database connection setup
-    conn = sqlite3.connect('detections.db')  
-    cursor = conn.cursor()
-
-    # Initialize heatmap object
-    cap = cv2.VideoCapture(video_path)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-
-    # Ensure HLS output folder exists
-    hls_output = 'hls_output'
-    os.makedirs(hls_output, exist_ok=True)
-    hls_output_path = os.path.join(hls_output, 'output.m3u8')
-
-    # HLS output parameters for normal video
-    hls_params = {
-        "-input_framerate": fps,
-        '-s': f'{width}x{height}',
-        "-vcodec": "libx264",
-        "-preset": "ultrafast",
-        "-tune": "zerolatency",
-        "-f": "hls",
-        "-hls_time": "2",
-        "-hls_list_size": "0",
-        "-hls_flags": "append_list",
-        '-hls_segment_filename': os.path.join(hls_output, 'segment_%03d.ts'),
-        "-g": str(fps * 2)
-    }
-
-    # WriteGear for the regular HLS output
-    writer_hls1 = WriteGear(output=hls_output_path, compression_mode=True, logging=True, **hls_params)
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        # Detect objects and update the database
-        detections, person_count, head_count = detect_objects(frame)
-        save_detection(cursor, person_count, head_count)
-        
-        # Annotate the frame with detection info
-        annotated_frame = annotate_frame(frame, detections, person_count, head_count)
-    
-        # Write both normal and heatmap frames to respective HLS outputs
-        writer_hls1.write(annotated_frame)
-
-
-    # Release resources
-    cap.release()
-    writer_hls1.close()
-    conn.close()
+    return detections[detections.confidence >= DETECTION_CONF]
+
+# Encoder HLS: HLS_VCODEC bisa diganti encoder hardware (mis. h264_nvenc, h264_qsv), ENCODER_QUEUE_SIZE frame
+# ditampung antrian encoder agar inferensi tidak menunggu setiap frame
+HLS_VCODEC = os.getenv('HLS_VCODEC', 'libx264')
+ENCODER_QUEUE_SIZE = int(os.getenv('ENCODER_QUEUE_SIZE', 32))
+
+# Output HLS per job: <root>/<job_id>/, playlist live berisi HLS_LIST_SIZE segmen terakhir (0 = simpan semua),
+# segmen lama dihapus otomatis; HLS_LOW_LATENCY=1 memakai segmen fMP4 pendek untuk live wall operator
+HLS_ROOT = os.path.abspath(os.getenv('HLS_ROOT', 'hls_output'))
+HEATMAP_ROOT = os.path.abspath(os.getenv('HEATMAP_ROOT', 'output_heatsmap'))
+HLS_SEGMENT_TIME = float(os.getenv('HLS_SEGMENT_TIME', 2))
+HLS_LIST_SIZE = int(os.getenv('HLS_LIST_SIZE', 6))
+HLS_LOW_LATENCY = os.getenv('HLS_LOW_LATENCY', '0') == '1'
+HLS_KEEP_JOBS = int(os.getenv('HLS_KEEP_JOBS', 20))
+
+# Heatmap diakumulasi pada grid kasar (sel HEATMAP_GRID x HEATMAP_GRID piksel), di-upsample hanya saat dirender
+HEATMAP_GRID = int(os.getenv('HEATMAP_GRID', 8))
+HEATMAP_DECAY = float(os.getenv('HEATMAP_DECAY', 0.99))
+
+# Snapshot heatmap kumulatif per video tiap HEATMAP_SNAPSHOT_INTERVAL detik (.npz), untuk query rentang waktu
+heatmap_store = HeatmapStore(os.path.abspath(os.getenv('HEATMAP_SNAPSHOT_ROOT', 'heatmap_snapshots')))
+HEATMAP_SNAPSHOT_INTERVAL = int(os.getenv('HEATMAP_SNAPSHOT_INTERVAL', 60))
+
+# Checkpoint job tiap CHECKPOINT_INTERVAL frame (frame, tracker, heatmap, segmen HLS), job yang terputus karena
+# server restart dilanjutkan dari checkpoint terakhir
+checkpoint_store = CheckpointStore(os.path.abspath(os.getenv('CHECKPOINT_ROOT', 'job_checkpoints')))
+CHECKPOINT_INTERVAL = int(os.getenv('CHECKPOINT_INTERVAL', 300))
+
+# Cache deteksi per isi file video + model + argumen inferensi: upload ulang video yang sama (mis. untuk mencoba
+# ambang crowd lain) diputar ulang dari cache tanpa inferensi. DETECTION_CACHE=1 untuk mengaktifkan, setiap job
+# lalu meng-hash seluruh file video. Entri yang lebih lama dari DETECTION_CACHE_MAX_DAYS hari sejak terakhir dipakai
+# dihapus, begitu juga entri yang paling lama tidak dipakai selama cache lebih besar dari DETECTION_CACHE_MAX_MB
+DETECTION_CACHE = os.getenv('DETECTION_CACHE', '0') == '1'
+detection_cache = DetectionCache(os.path.abspath(os.getenv('DETECTION_CACHE_ROOT', 'detection_cache')),
+                                 max_bytes=int(os.getenv('DETECTION_CACHE_MAX_MB', 1024)) * 2**20,
+                                 max_age=float(os.getenv('DETECTION_CACHE_MAX_DAYS', 7)) * 86400)
+
+# Parameter HLS yang sama untuk video anotasi dan heatmap
+def job_hls_params(output_folder, info):
+    return hls_params(output_folder, info.fps, vcodec=HLS_VCODEC, segment_time=HLS_SEGMENT_TIME,
+                      list_size=HLS_LIST_SIZE, low_latency=HLS_LOW_LATENCY)
+
+# Stage encoder HLS untuk frame yang disimpan stage sebelumnya di packet.data[key]. Job file memakai drop='block'
+# agar setiap frame masuk ke output; 'oldest'/'newest' membuang frame yang menumpuk dan hanya untuk sumber live,
+# video file yang kehilangan frame menjadi lebih pendek dan timing-nya bergeser
+def hls_encoder(key, output_folder, playlist, drop='block'):
+    os.makedirs(output_folder, exist_ok=True)
+    return EncoderStage(key, os.path.join(output_folder, playlist), lambda info: job_hls_params(output_folder, info),
+                        queue_size=ENCODER_QUEUE_SIZE, drop=drop)
+
+# Preview MJPEG latensi rendah per job: satu encode JPEG per frame dipakai bersama semua penonton
+preview_hub = PreviewHub(quality=int(os.getenv('PREVIEW_JPEG_QUALITY', 80)))
+
+# URL playlist HLS milik sebuah job
+def job_playlists(job_id):
+    return {'annotated': f'/hls_output/{job_id}/output.m3u8', 'heatmap': f'/heatsmap/{job_id}/mapsoutput.m3u8'}
+
+class DetectionStage(Stage):
+    """Convert tracking results to supervision detections for the annotation stage."""
+
+    def process(self, packet):
+        packet.data['detections'] = extract_detections(packet.results)
+
+class PersistenceStage(Stage):
+    """Queue the per-frame person and head counts for the batched SQLite writer."""
+
+    def __init__(self, writer, video_id=None):
+        self.writer = writer
+        self.video_id = video_id
+
+    def process(self, packet):
+        self.writer.write(packet.data['person_count'], packet.data['head_count'], frame_idx=packet.index,
+                          video_id=self.video_id)
+
+class AnnotationStage(Stage):
+    """Annotate frames with boxes and the count/status HUD for the regular HLS output."""
+
+    def open(self, info):
+        # Annotator dibuat sekali per video, bukan setiap frame
+        self.renderer = OverlayRenderer(crowd_threshold=15)
+
+    def process(self, packet):
+        # Salin frame karena annotator supervision menggambar langsung di array input
+        packet.data['annotated'] = self.renderer.render(packet.image.copy(), packet.data['detections'],
+                                                        packet.data['person_count'], packet.data['head_count'])
+
+# Fungsi untuk streaming dan mendeteksi: satu kali decode dan satu kali inferensi per frame
+def stream_and_detect(job):
+    def update_progress(frames_done, info):
+        job.frames_done, job.frames_total = frames_done, info.frames
+        if frames_done % info.fps == 0:  # waktu per stage diperbarui sekali per detik video
+            job.stats = pipeline.stats()
+
+    # Setiap job menulis ke foldernya sendiri, folder job lama dihapus kecuali job yang masih antri, berjalan
+    # atau punya checkpoint untuk dilanjutkan
+    active = {*scheduler.active(), *checkpoint_store.keys()}
+    for root in (HLS_ROOT, HEATMAP_ROOT):
+        prune_job_dirs(root, keep=HLS_KEEP_JOBS, active=active)
+    hls_folder, heatmap_folder = os.path.join(HLS_ROOT, job.id), os.path.join(HEATMAP_ROOT, job.id)
+
+    stages = [
+        CountingStage(model.names, conf=DETECTION_CONF, fields=COUNT_FIELDS),
+        DetectionStage(),
+        PersistenceStage(detection_writer, video_id=job.id),
+        AnnotationStage(),
+        PreviewStage(preview_hub, job.id),
+        hls_encoder('annotated', hls_folder, 'output.m3u8'),
+        HeatmapOverlayStage(heatmap_folder, model.names, decay=HEATMAP_DECAY, grid=HEATMAP_GRID),
+        HeatmapSnapshotStage(heatmap_store, job.id, interval=HEATMAP_SNAPSHOT_INTERVAL, grid=HEATMAP_GRID),
+        hls_encoder('heatmap', heatmap_folder, 'mapsoutput.m3u8'),
+    ]
+    if detection_log:
+        stages.append(DetectionLogStage(detection_log, job.id))
+    def save_checkpoint(state):
+        detection_writer.flush()  # baris sampai frame checkpoint sudah tersimpan sebelum checkpoint ditulis
+        if detection_log:
+            detection_log.flush(job.id)
+        checkpoint_store.save(job.id, {**state, 'video_path': job.video_path})
+
+    # Job yang terputus: hapus baris setelah frame checkpoint karena frame tersebut diproses ulang
+    resume = checkpoint_store.load(job.id)
+    if resume:
+        conn = connect(DB_PATH)
+        try:
+            delete_frames(conn, job.id, resume['frame'])
+        finally:
+            conn.close()
+        if detection_log:
+            detection_log.truncate(job.id, resume['frame'])
+
+    pipeline = FramePipeline(detector, stages, stride=INFERENCE_STRIDE, max_stride=INFERENCE_MAX_STRIDE,
+                             decode=VIDEO_DECODE)
+
+    # Putar ulang deteksi dari cache jika ada, jika tidak rekam deteksi job ini (kecuali job lanjutan, tidak lengkap)
+    replay = record = None
+    if DETECTION_CACHE:
+        key = detection_cache.key(file_hash(job.video_path), model.fingerprint, stride=INFERENCE_STRIDE,
+                                  max_stride=INFERENCE_MAX_STRIDE, **pipeline.predict_args)
+        replay = detection_cache.get(key)
+        if replay is None and not resume:
+            record = detection_cache.recorder(key)
+
+    try:
+        pipeline.run(job.video_path, stop=job.cancel_event, progress=update_progress, checkpoint=save_checkpoint,
+                     checkpoint_interval=CHECKPOINT_INTERVAL, resume=resume, replay=replay, record=record)
+    finally:
+        job.stats = pipeline.stats()
+        checkpoint_store.remove(job.id)  # job selesai, gagal atau dibatalkan tidak dilanjutkan lagi
+    detection_writer.flush()  # job selesai berarti semua baris sudah tersimpan
+
+# Antrian job dengan jumlah worker dan kapasitas antrian yang dapat diatur
+scheduler = JobScheduler(
+    stream_and_detect,
+    workers=int(os.getenv('JOB_WORKERS', 2)),
+    queue_size=int(os.getenv('JOB_QUEUE_SIZE', 8)),
+)
+
+# Masukkan kembali job yang belum selesai saat server berhenti, dengan job_id yang sama
+for job_id in checkpoint_store.keys():
+    checkpoint = checkpoint_store.load(job_id)
+    if checkpoint is None or not os.path.exists(checkpoint['video_path']):
+        checkpoint_store.remove(job_id)
+        continue
+    try:
+        scheduler.submit(checkpoint['video_path'], job_id=job_id)
+    except QueueFullError:
+        break  # sisa checkpoint dilanjutkan setelah restart berikutnya
+
+# Stage per kamera live: hitungan ke database dan snapshot heatmap dengan camera_id sebagai video_id
+def camera_stages(camera_id):
+    stages = [
+        CountingStage(model.names, conf=DETECTION_CONF, fields=COUNT_FIELDS),
+        PersistenceStage(detection_writer, video_id=camera_id),
+        HeatmapSnapshotStage(heatmap_store, camera_id, interval=HEATMAP_SNAPSHOT_INTERVAL, grid=HEATMAP_GRID),
+    ]
+    if detection_log:
+        stages.append(DetectionLogStage(detection_log, camera_id))
+    return stages
+
+# Kamera RTSP didaftarkan saat runtime, frame terbaru semua kamera dideteksi dalam satu batch per tick
+camera_hub = CameraHub(detector, stages=camera_stages, fps=float(os.getenv('CAMERA_FPS', 10)))
+atexit.register(camera_hub.stop)
 
 # Endpoint untuk upload dan streaming video
 @app.route('/process_video/', methods=['POST'])
@@ -217,13 +286,16 @@ def stream_and_detect(video_path):
     ],
     'responses': {
         200: {
-            'description': 'Streaming video berhasil',
+            'description': 'Video masuk antrian, berisi job_id, playlist HLS dan URL preview MJPEG',
             'content': {
-                'image/jpeg': {}
+                'application/json': {}
             }
         },
         400: {
             'description': 'Invalid file type or other error'
+        },
+        429: {
+            'description': 'Job queue is full, retry later'
         }
     }
 })
@@ -235,49 +307,285 @@ def process_video():
     if file.content_type not in ["video/mp4", "video/avi", "video/mov"]:
         return jsonify({"detail": "Invalid file type. Only mp4, avi, or mov allowed."}), 400
 
-    video_path = os.path.join(OUTPUT_FOLDER, f"temp_{file.filename}")
+    video_path = os.path.join(OUTPUT_FOLDER, f"temp_{uuid.uuid4().hex[:8]}_{file.filename}")
     file.save(video_path)
 
-    # Menjalankan thread untuk streaming dan deteksi
-    stream_thread = threading.Thread(target=stream_and_detect, args=(video_path,))
-    heatmap_thread = threading.Thread(target=heatmaps, args=(video_path,))
-    stream_thread.start()
-    heatmap_thread.start()
+    # Masukkan ke antrian job, tolak dengan 429 jika antrian penuh
+    try:
+        job = scheduler.submit(video_path)
+    except QueueFullError as e:
+        os.remove(video_path)
+        return jsonify({"detail": str(e)}), 429, {'Retry-After': '30'}
 
-    return jsonify({"detail": "Video is being processed and streamed."}), 200
+    return jsonify({"detail": "Video is being processed and streamed.", "job_id": job.id,
+                    "playlists": job_playlists(job.id), "preview": f"/preview/{job.id}"}), 200
 
-# Endpoint untuk mengakses video HLS
-@app.route('/hls_output/<path:filename>')
-def serve_hls(filename):
-    # Tentukan file path
-    file_path = 'D:/7. Project Mandiri/Python/Yolov11/hls_output'
-
-    # Tentukan MIME type berdasarkan file extension
+# Endpoint untuk status job
+@app.route('/jobs/<job_id>', methods=['GET'])
+@swag_from({
+    'parameters': [{'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}],
+    'responses': {
+        200: {'description': 'Status dan progress job'},
+        404: {'description': 'Job not found'}
+    }
+})
+def job_status(job_id):
+    job = scheduler.get(job_id)
+    if job is None:
+        return jsonify({"detail": "Job not found"}), 404
+    return jsonify({**job.to_dict(), "playlists": job_playlists(job.id), "preview": f"/preview/{job.id}"}), 200
+
+# Endpoint untuk progress job
+@app.route('/jobs/<job_id>/progress', methods=['GET'])
+@swag_from({
+    'parameters': [{'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}],
+    'responses': {
+        200: {'description': 'Jumlah frame yang sudah diproses'},
+        404: {'description': 'Job not found'}
+    }
+})
+def job_progress(job_id):
+    job = scheduler.get(job_id)
+    if job is None:
+        return jsonify({"detail": "Job not found"}), 404
+    return jsonify({"job_id": job.id, "status": job.status, **job.progress()}), 200
+
+# Endpoint untuk membatalkan job
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+@swag_from({
+    'parameters': [{'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}],
+    'responses': {
+        200: {'description': 'Pembatalan job diminta'},
+        404: {'description': 'Job not found'}
+    }
+})
+def cancel_job(job_id):
+    job = scheduler.cancel(job_id)
+    if job is None:
+        return jsonify({"detail": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+# Endpoint untuk ringkasan antrian job
+@app.route('/jobs', methods=['GET'])
+def job_stats():
+    return jsonify(scheduler.stats()), 200
+
+# Endpoint untuk mendaftarkan kamera live (RTSP/RTMP/HTTP)
+@app.route('/cameras', methods=['POST'])
+@swag_from({
+    'parameters': [{
+        'name': 'body', 'in': 'body', 'required': True,
+        'schema': {'type': 'object', 'properties': {
+            'url': {'type': 'string', 'description': 'URL stream, misalnya rtsp://host/stream'},
+            'camera_id': {'type': 'string', 'description': 'Opsional, dibuat otomatis jika kosong'},
+            'vid_stride': {'type': 'integer', 'default': 1}
+        }}
+    }],
+    'responses': {
+        201: {'description': 'Kamera terdaftar'},
+        400: {'description': 'Invalid parameter'},
+        409: {'description': 'Camera already registered'}
+    }
+})
+def register_camera():
+    body = request.get_json(silent=True) or {}
+    camera_id = str(body.get('camera_id') or uuid.uuid4().hex[:8])
+    if not body.get('url'):
+        return jsonify({"detail": "url is required"}), 400
+    if not KEY_PATTERN.match(camera_id):
+        return jsonify({"detail": "camera_id may only contain letters, digits, '_', '-' and '.'"}), 400
+    try:
+        vid_stride = int(body.get('vid_stride', 1))
+    except (TypeError, ValueError):
+        return jsonify({"detail": "vid_stride must be an integer"}), 400
+    try:
+        stream = camera_hub.register(camera_id, body['url'], vid_stride=vid_stride)
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 409
+    camera_hub.start()
+    return jsonify(stream.status()), 201
+
+# Endpoint untuk menghapus kamera live
+@app.route('/cameras/<camera_id>', methods=['DELETE'])
+@swag_from({
+    'parameters': [{'name': 'camera_id', 'in': 'path', 'type': 'string', 'required': True}],
+    'responses': {
+        200: {'description': 'Kamera dihapus'},
+        404: {'description': 'Camera not found'}
+    }
+})
+def unregister_camera(camera_id):
+    try:
+        camera_hub.unregister(camera_id)
+    except KeyError:
+        return jsonify({"detail": "Camera not found"}), 404
+    return jsonify({"detail": "Camera removed", "camera_id": camera_id}), 200
+
+# Endpoint status kamera: koneksi, reconnect, frame diproses/dilewati per kamera dan waktu per tick
+@app.route('/cameras', methods=['GET'])
+def camera_status():
+    return jsonify(camera_hub.status()), 200
+
+# Endpoint kesehatan: status model (waktu load, warmup) dan antrian job
+@app.route('/health', methods=['GET'])
+@swag_from({
+    'responses': {
+        200: {'description': 'Semua model siap (sudah dimuat dan di-warmup)'},
+        503: {'description': 'Model masih dimuat atau gagal dimuat'}
+    }
+})
+def health():
+    models = model_registry.status()
+    ready = all(m['state'] == 'ready' for m in models)
+    body = {'status': 'ok' if ready else 'unavailable', 'models': models, 'jobs': scheduler.stats()}
+    if detector is not model:
+        body['inference_broker'] = detector.stats()
+    return jsonify(body), 200 if ready else 503
+
+# Mengubah parameter waktu (UNIX timestamp atau ISO 8601, waktu lokal jika tanpa zona) menjadi UNIX timestamp
+def parse_time(value):
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+# Endpoint data dashboard per detik/menit dari tabel rollup
+@app.route('/api/person/rollup', methods=['GET'])
+@swag_from({
+    'parameters': [
+        {'name': 'resolution', 'in': 'query', 'type': 'string', 'enum': ['second', 'minute'], 'default': 'minute'},
+        {'name': 'bucket', 'in': 'query', 'type': 'integer', 'description': 'Ukuran bucket dalam detik'},
+        {'name': 'start', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'end', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'video_id', 'in': 'query', 'type': 'string'},
+        {'name': 'limit', 'in': 'query', 'type': 'integer', 'default': 500},
+        {'name': 'order', 'in': 'query', 'type': 'string', 'enum': ['asc', 'desc'], 'default': 'asc'}
+    ],
+    'responses': {
+        200: {'description': 'Min/avg/max person dan head per bucket, beserta cursor halaman berikutnya'},
+        400: {'description': 'Invalid parameter'}
+    }
+})
+def person_rollup():
+    args = request.args
+    try:
+        end = parse_time(args.get('end'))
+        start = parse_time(args.get('start'))
+        if start is None and end is None:  # default 24 jam terakhir
+            end = datetime.datetime.now().timestamp()
+            start = end - 86400
+        limit = min(max(int(args.get('limit', 500)), 1), 5000)
+        order = args.get('order', 'asc')
+        conn = connect(DB_PATH)
+        try:
+            items, cursor = query_rollup(conn, args.get('resolution', 'minute'), args.get('bucket', type=int), start,
+                                         end, args.get('video_id'), limit, order)
+        finally:
+            conn.close()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+
+    for item in items:
+        item['time'] = datetime.datetime.fromtimestamp(item['bucket']).isoformat()
+    next_page = None if cursor is None else {('start' if order == 'asc' else 'end'): cursor}
+    return jsonify({"items": items, "next": next_page}), 200
+
+# Endpoint ringkasan dashboard (jumlah frame, min/avg/max) untuk rentang waktu
+@app.route('/api/person/summary', methods=['GET'])
+@swag_from({
+    'parameters': [
+        {'name': 'start', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'end', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'video_id', 'in': 'query', 'type': 'string'}
+    ],
+    'responses': {
+        200: {'description': 'Ringkasan person dan head, default 7 hari terakhir'},
+        400: {'description': 'Invalid parameter'}
+    }
+})
+def person_summary():
+    args = request.args
+    try:
+        end = parse_time(args.get('end'))
+        start = parse_time(args.get('start'))
+        if start is None and end is None:  # default 7 hari terakhir
+            end = datetime.datetime.now().timestamp()
+            start = end - 7 * 86400
+        conn = connect(DB_PATH)
+        try:
+            summary = query_summary(conn, start, end, args.get('video_id'))
+        finally:
+            conn.close()
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    return jsonify(summary), 200
+
+# Endpoint heatmap untuk rentang waktu sembarang, dijumlahkan dari snapshot tanpa memproses ulang video
+@app.route('/api/heatmap', methods=['GET'])
+@swag_from({
+    'parameters': [
+        {'name': 'video_id', 'in': 'query', 'type': 'string', 'required': True},
+        {'name': 'start', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'end', 'in': 'query', 'type': 'string', 'description': 'UNIX timestamp atau ISO 8601'},
+        {'name': 'format', 'in': 'query', 'type': 'string', 'enum': ['png', 'json'], 'default': 'png'}
+    ],
+    'responses': {
+        200: {'description': 'Heatmap PNG, atau grid heatmap dan metadata sebagai JSON'},
+        400: {'description': 'Invalid parameter'},
+        404: {'description': 'Tidak ada snapshot dalam rentang waktu'}
+    }
+})
+def heatmap_window():
+    args = request.args
+    try:
+        if not args.get('video_id'):
+            raise ValueError("video_id is required")
+        heat, meta = heatmap_store.query(args['video_id'], parse_time(args.get('start')), parse_time(args.get('end')))
+    except ValueError as e:
+        return jsonify({"detail": str(e)}), 400
+    if heat is None:
+        return jsonify({"detail": "No heatmap snapshots in this time range"}), 404
+
+    if args.get('format') == 'json':
+        return jsonify({**meta, "heat": heat.round(3).tolist()}), 200
+    image = heatmap.HeatmapAccumulator(meta['shape'], grid=meta['grid']).render(cv2.COLORMAP_JET, heat=heat)
+    return Response(cv2.imencode('.png', image)[1].tobytes(), mimetype='image/png')
+
+# Menyajikan playlist dan segmen HLS dengan MIME type yang tepat, playlist live tidak boleh di-cache
+def serve_hls_file(root, filename):
+    response = send_from_directory(root, filename, mimetype=MIMETYPES.get(os.path.splitext(filename)[1]))
     if filename.endswith('.m3u8'):
-        mimetype = 'application/vnd.apple.mpegurl'
-    elif filename.endswith('.ts'):
-        mimetype = 'video/mp2t'
-    else:
-        mimetype = None
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
-    # Sajikan file dengan MIME type yang tepat
-    return send_from_directory(file_path, filename, mimetype=mimetype)
+# Endpoint untuk mengakses video HLS anotasi: /hls_output/<job_id>/output.m3u8
+@app.route('/hls_output/<path:filename>')
+def serve_hls(filename):
+    return serve_hls_file(HLS_ROOT, filename)
 
+# Endpoint untuk mengakses video HLS heatmap: /heatsmap/<job_id>/mapsoutput.m3u8 dan final_heatmap.png
 @app.route('/heatsmap/<path:filename>')
 def serve_heatsmap(filename):
-    # Tentukan file path
-    file_path = 'D:/7. Project Mandiri/Python/Yolov11/output_heatsmap'
+    return serve_hls_file(HEATMAP_ROOT, filename)
 
-    # Tentukan MIME type berdasarkan file extension
-    if filename.endswith('.m3u8'):
-        mimetype = 'application/vnd.apple.mpegurl'
-    elif filename.endswith('.ts'):
-        mimetype = 'video/mp2t'
-    else:
-        mimetype = None
-
-    # Sajikan file dengan MIME type yang tepat
-    return send_from_directory(file_path, filename, mimetype=mimetype)
+# Endpoint preview MJPEG: frame anotasi terbaru tanpa latensi segmen HLS, klien lambat melewatkan frame
+@app.route('/preview/<job_id>', methods=['GET'])
+@swag_from({
+    'parameters': [{'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}],
+    'responses': {
+        200: {'description': 'Stream multipart/x-mixed-replace berisi frame JPEG, berakhir saat job selesai',
+              'content': {'multipart/x-mixed-replace': {}}},
+        404: {'description': 'No running job with this ID'}
+    }
+})
+def preview(job_id):
+    channel = preview_hub.get(job_id)
+    if channel is None:
+        return jsonify({"detail": "No running job with this ID"}), 404
+    return Response(stream_with_context(channel.stream()), mimetype='multipart/x-mixed-replace; boundary=frame',
+                    headers={'Cache-Control': 'no-cache'})
 
 # Menjalankan server Flask
 if __name__ == '__main__':
@@ -0,0 +1,63 @@
+"""
+Building blocks for the video detection service in `main.py`.
+
+Names are imported from their submodule on first access, so `service.edge` can be used on machines without torch.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_MODULES = {
+    "DB_PATH": "database",
+    "CachedDetections": "cache",
+    "CameraHub": "cameras",
+    "CameraStream": "cameras",
+    "CheckpointStore": "checkpoints",
+    "ClassCounter": "counting",
+    "CountingStage": "counting",
+    "DetectionCache": "cache",
+    "DetectionLog": "detection_log",
+    "DetectionLogStage": "detection_log",
+    "DetectionRecorder": "cache",
+    "DetectionWriter": "database",
+    "EdgeDetector": "edge",
+    "EdgeResults": "edge",
+    "EncoderStage": "encoder",
+    "FrameEncoder": "encoder",
+    "FramePacket": "pipeline",
+    "FramePipeline": "pipeline",
+    "FrameTracker": "tracking",
+    "HeatmapOverlayStage": "heatmaps",
+    "HeatmapSnapshotStage": "heatmaps",
+    "HeatmapStore": "heatmaps",
+    "InferenceBroker": "broker",
+    "InferenceCadence": "tracking",
+    "Job": "jobs",
+    "JobScheduler": "jobs",
+    "ModelHandle": "models",
+    "ModelRegistry": "models",
+    "OverlayRenderer": "overlay",
+    "PreviewChannel": "preview",
+    "PreviewHub": "preview",
+    "PreviewStage": "preview",
+    "QueueFullError": "jobs",
+    "Stage": "pipeline",
+    "VideoInfo": "pipeline",
+    "setup_database": "database",
+}
+
+__all__ = tuple(_MODULES)
+
+
+def __getattr__(name):
+    """Import public names from their submodule on first access."""
+    if name in _MODULES:
+        value = getattr(importlib.import_module(f".{_MODULES[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Return the module attributes including the lazily imported public names."""
+    return sorted(set(globals()) | set(__all__))
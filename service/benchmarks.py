@@ -0,0 +1,488 @@
+"""
+Micro-benchmarks for the service stages.
+
+Usage:
+    $ python -m service.benchmarks
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import supervision as sv
+import torch
+
+from ultralytics.solutions.heatmap import HeatmapAccumulator
+from ultralytics.utils import LOGGER
+from ultralytics.utils.ops import non_max_suppression
+
+from .database import DetectionWriter
+from .detection_log import DetectionLog
+from .overlay import BoxAnnotator, OverlayRenderer
+
+
+def benchmark_db_writer(frames=10000, batch_size=500, flush_interval=0.5):
+    """
+    Compare one INSERT and commit per frame with the batched `DetectionWriter` for a video of `frames` frames.
+
+    Returns:
+        (dict): Total seconds and per-frame milliseconds for both writers, and the time the pipeline thread spends in
+            `DetectionWriter.write` per frame.
+    """
+    rows = [(i % 40, i % 25) for i in range(frames)]
+    with tempfile.TemporaryDirectory() as d:
+        # Former behaviour: default journal mode, one commit (and fsync) per frame
+        conn = sqlite3.connect(os.path.join(d, "per_frame.db"))
+        cursor = conn.cursor()
+        cursor.execute(
+            "CREATE TABLE person (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "timestamp DATETIME DEFAULT CURRENT_TIMESTAMP, person_count INTEGER, head_count INTEGER, "
+            "created_at DATETIME DEFAULT (DATETIME('now', 'localtime')))"
+        )
+        t0 = time.perf_counter()
+        for person_count, head_count in rows:
+            cursor.execute("INSERT INTO person (person_count, head_count) VALUES (?, ?)", (person_count, head_count))
+            conn.commit()
+        per_frame = time.perf_counter() - t0
+        conn.close()
+
+        writer = DetectionWriter(os.path.join(d, "batched.db"), batch_size=batch_size, flush_interval=flush_interval)
+        t0 = time.perf_counter()
+        for i, (person_count, head_count) in enumerate(rows):
+            writer.write(person_count, head_count, frame_idx=i, video_id="benchmark")
+        enqueue = time.perf_counter() - t0
+        writer.close()
+        batched = time.perf_counter() - t0
+        assert writer.rows_written == frames
+
+    results = {
+        "per_frame_s": per_frame,
+        "batched_s": batched,
+        "per_frame_ms": per_frame * 1e3 / frames,
+        "batched_ms": batched * 1e3 / frames,
+        "enqueue_ms": enqueue * 1e3 / frames,
+    }
+    LOGGER.info(
+        f"DB writer, {frames} frames: per-frame commit {per_frame:.2f}s ({results['per_frame_ms']:.3f} ms/frame), "
+        f"batched {batched:.2f}s ({results['batched_ms']:.3f} ms/frame, {results['enqueue_ms']:.4f} ms/frame in "
+        f"pipeline thread), {per_frame / batched:.1f}x faster"
+    )
+    return results
+
+
+def benchmark_overlay(people=(10, 100, 300), frames=50, imgsz=(1080, 1920)):
+    """
+    Compare per-frame annotator construction and `putText` HUD drawing with `OverlayRenderer` for crowd sizes.
+
+    Returns:
+        (dict): Milliseconds per frame for both renderers, keyed by number of detections.
+    """
+    rng = np.random.default_rng(0)
+    h, w = imgsz
+    frame = rng.integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+    def former(image, detections, person_count, head_count):
+        """Annotation as previously done in `main.annotate_frame`."""
+        image = BoxAnnotator().annotate(scene=image, detections=detections)
+        image = sv.LabelAnnotator().annotate(scene=image, detections=detections)
+        color = (0, 0, 255) if person_count > 15 else (0, 255, 0)
+        cv2.putText(image, f"Person: {person_count}", (w - 200, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        cv2.putText(image, f"Head: {head_count}", (w - 200, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        status = "Crowded" if person_count > 15 else "Uncrowded"
+        cv2.putText(image, status, (w - 200, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
+        return image
+
+    results = {}
+    for n in people:
+        xy = rng.uniform(0, (w - 80, h - 160), (n, 2))
+        xyxy = np.concatenate([xy, xy + rng.uniform((30, 60), (80, 160), (n, 2))], 1)
+        class_id = rng.integers(0, 2, n)
+        detections = sv.Detections(
+            xyxy=xyxy, class_id=class_id, data={"class_name": np.where(class_id == 0, "Person", "Head")}
+        )
+        counts = int((class_id == 0).sum()), int((class_id == 1).sum())
+        renderer = OverlayRenderer()
+        times = []
+        for fn in (former, renderer.render):
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                fn(frame.copy(), detections, *counts)
+            times.append((time.perf_counter() - t0) * 1e3 / frames)
+        results[n] = {"former_ms": times[0], "renderer_ms": times[1]}
+        LOGGER.info(
+            f"Overlay, {n} detections on {w}x{h}: per-frame annotators {times[0]:.2f} ms/frame, "
+            f"OverlayRenderer {times[1]:.2f} ms/frame, {times[0] / times[1]:.1f}x faster"
+        )
+    return results
+
+
+def benchmark_heatmap(people=(10, 50, 200), frames=30, imgsz=(1080, 1920)):
+    """
+    Compare full-frame circle masks and full-frame decay with `HeatmapAccumulator` sprite stamping and lazy decay.
+
+    Returns:
+        (dict): Milliseconds per frame for both implementations, keyed by number of boxes.
+    """
+    rng = np.random.default_rng(0)
+    h, w = imgsz
+
+    def former(heatmap, boxes):
+        """Accumulation as previously done in `Heatmap.generate_heatmap`."""
+        heatmap *= 0.99
+        for box in boxes:
+            center = (int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2))
+            radius = min(int(box[2]) - int(box[0]), int(box[3]) - int(box[1])) // 2
+            y, x = np.ogrid[0 : heatmap.shape[0], 0 : heatmap.shape[1]]
+            mask = (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2
+            heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += (
+                2 * mask[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])]
+            )
+
+    def accumulate(accumulator, boxes):
+        """Accumulation with the sprite accumulator."""
+        accumulator.step()
+        accumulator.add(boxes)
+
+    results = {}
+    for n in people:
+        batches = []
+        for _ in range(frames):
+            xy = rng.uniform(0, (w - 80, h - 160), (n, 2))
+            batches.append(np.concatenate([xy, xy + rng.uniform((30, 60), (80, 160), (n, 2))], 1))
+        times = []
+        for fn, state in ((former, np.zeros(imgsz, dtype=np.float32)), (accumulate, HeatmapAccumulator(imgsz))):
+            t0 = time.perf_counter()
+            for boxes in batches:
+                fn(state, boxes)
+            times.append((time.perf_counter() - t0) * 1e3 / frames)
+        results[n] = {"former_ms": times[0], "accumulator_ms": times[1]}
+        LOGGER.info(
+            f"Heatmap, {n} boxes on {w}x{h}: full-frame masks {times[0]:.2f} ms/frame, "
+            f"HeatmapAccumulator {times[1]:.2f} ms/frame, {times[0] / times[1]:.1f}x faster"
+        )
+    return results
+
+
+def benchmark_detection_log(frames=10000, boxes=50, chunk_rows=65536):
+    """
+    Measure the per-frame cost of logging `boxes` tracked boxes per frame with `DetectionLog` and its read throughput.
+
+    Returns:
+        (dict): Milliseconds per frame in the pipeline thread and in total, and rows per second read back.
+    """
+    rng = np.random.default_rng(0)
+    xy = rng.uniform(0, 1800, (boxes, 2)).astype(np.float32)
+    xyxy, conf = np.concatenate([xy, xy + 80], 1), rng.uniform(0.1, 1, boxes).astype(np.float32)
+    cls, track_id = rng.integers(0, 2, boxes), np.arange(boxes)
+    with tempfile.TemporaryDirectory() as d:
+        log = DetectionLog(d, chunk_rows=chunk_rows)
+        t0 = time.perf_counter()
+        for i in range(frames):
+            log.write("benchmark", i, xyxy, conf, cls, track_id=track_id, ts=1_700_000_000 + i / 30)
+        enqueue = time.perf_counter() - t0
+        log.close()
+        total = time.perf_counter() - t0
+        assert log.rows_written == frames * boxes
+
+        t0 = time.perf_counter()
+        rows = sum(len(chunk["frame"]) for chunk in log.iter_chunks("benchmark"))
+        read = time.perf_counter() - t0
+        size = sum(e.stat().st_size for e in os.scandir(os.path.join(d, "benchmark")))
+
+    results = {"enqueue_ms": enqueue * 1e3 / frames, "total_ms": total * 1e3 / frames, "read_rows_s": rows / read}
+    LOGGER.info(
+        f"Detection log, {frames} frames x {boxes} boxes: {results['enqueue_ms']:.4f} ms/frame in pipeline thread, "
+        f"{results['total_ms']:.3f} ms/frame written, {size / rows:.0f} bytes/row, "
+        f"read {results['read_rows_s'] / 1e6:.1f}M rows/s"
+    )
+    return results
+
+
+def benchmark_nms(batch_sizes=(1, 2, 4, 8, 16, 32, 64), nc=80, anchors=8400, objects=30, runs=10, device="cpu"):
+    """
+    Compare per-image NMS with batched NMS (`non_max_suppression(batched=True)`) on synthetic YOLO output.
+
+    Every image has `objects` objects with 10 overlapping candidate boxes each, the other anchors score below the
+    confidence threshold, as in real detector output.
+
+    Returns:
+        (dict): Milliseconds per call for both implementations, keyed by batch size.
+    """
+    g = torch.Generator().manual_seed(0)
+    results = {}
+    for bs in batch_sizes:
+        p = torch.rand(bs, 4 + nc, anchors, generator=g)
+        p[:, :4] *= torch.tensor([640.0, 640.0, 100.0, 100.0])[:, None]
+        p[:, 4:] *= 0.1
+        for b in range(bs):
+            idx = torch.randperm(anchors, generator=g)[: objects * 10].view(objects, 10)
+            center = torch.rand(4, objects, 1, generator=g) * torch.tensor([640.0, 640.0, 100.0, 100.0])[:, None, None]
+            p[b, :4, idx] = center + torch.randn(4, objects, 10, generator=g) * 4
+            p[b, 4 + torch.randint(0, nc, (objects, 1), generator=g), idx] = torch.rand(objects, 10, generator=g) + 0.3
+        p = p.to(device)
+        times = []
+        for batched in (False, True):
+            non_max_suppression(p, batched=batched, in_place=False)  # warmup
+            t0 = time.perf_counter()
+            for _ in range(runs):
+                non_max_suppression(p, batched=batched, in_place=False)
+            times.append((time.perf_counter() - t0) * 1e3 / runs)
+        results[bs] = {"loop_ms": times[0], "batched_ms": times[1]}
+        LOGGER.info(
+            f"NMS, batch {bs} x {objects * 10} candidates, {nc} classes on {device}: per-image loop {times[0]:.2f} ms, "
+            f"batched {times[1]:.2f} ms, {times[0] / times[1]:.2f}x"
+        )
+    return results
+
+
+def make_onnx_detector(path, names=None, imgsz=640, stride=8, seed=0):
+    """
+    Write a small random ONNX model with the input, output and metadata layout of an exported YOLO detect model.
+
+    The model average-pools the image to a `stride` grid and maps every cell to one xywh box and class scores with a
+    1x1 convolution, class `i` scoring high on cells where RGB channel `i % 3` is bright. It runs in milliseconds but
+    gives `AutoBackend` and `EdgeDetector` the same input as a real export: (1, 3, imgsz, imgsz) float32 images in,
+    (1, 4 + nc, anchors) predictions out.
+
+    Returns:
+        (str): `path`.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    names = names or {0: "person", 1: "head"}
+    nc, g = len(names), imgsz // stride
+    rng = np.random.default_rng(seed)
+    weight = rng.normal(0, 1, (4 + nc, 3, 1, 1)).astype(np.float32)
+    weight[4:] = 0
+    weight[4 + np.arange(nc), np.arange(nc) % 3] = 6  # class i scores high where RGB channel i % 3 is bright
+    bias = np.concatenate([np.zeros(4), np.full(nc, -4.0)]).astype(np.float32)
+    scale = np.array([stride, stride, imgsz / 4, imgsz / 4] + [1] * nc, dtype=np.float32).reshape(1, -1, 1, 1)
+    offset = np.zeros((1, 4 + nc, g, g), dtype=np.float32)
+    offset[0, 0], offset[0, 1] = np.meshgrid(np.arange(g) * stride, np.arange(g) * stride)  # cell x, y
+    initializers = [
+        numpy_helper.from_array(array, name)
+        for name, array in (
+            ("weight", weight),
+            ("bias", bias),
+            ("scale", scale),
+            ("offset", offset),
+            ("shape", np.array([1, 4 + nc, g * g], dtype=np.int64)),
+        )
+    ]
+    nodes = [
+        helper.make_node("AveragePool", ["images"], ["pooled"], kernel_shape=[stride] * 2, strides=[stride] * 2),
+        helper.make_node("Conv", ["pooled", "weight", "bias"], ["conv"]),
+        helper.make_node("Sigmoid", ["conv"], ["sigmoid"]),
+        helper.make_node("Mul", ["sigmoid", "scale"], ["scaled"]),
+        helper.make_node("Add", ["scaled", "offset"], ["grid"]),
+        helper.make_node("Reshape", ["grid", "shape"], ["output0"]),
+    ]
+    graph = helper.make_graph(
+        nodes,
+        "detector",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, imgsz, imgsz])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, [1, 4 + nc, g * g])],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 12)], ir_version=8)
+    metadata = {"stride": 32, "task": "detect", "batch": 1, "imgsz": [imgsz, imgsz], "names": names}
+    for k, v in metadata.items():
+        model.metadata_props.add(key=k, value=str(v))
+    onnx.save(model, path)
+    return path
+
+
+def benchmark_preprocess(batch_sizes=(1, 4), imgsz=(1080, 1920), frames=100):
+    """
+    Compare the former `BasePredictor.preprocess` (letterbox, stack, transpose, float, divide) with the fused one.
+
+    Returns:
+        (dict): Milliseconds per image for both implementations, keyed by batch size.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO("yolo11n.yaml")
+    model.predict(np.zeros((64, 64, 3), dtype=np.uint8), imgsz=640, verbose=False)  # creates the predictor
+    predictor = model.predictor
+
+    def former(images):
+        """Preprocessing as previously done in `BasePredictor.preprocess`."""
+        im = np.stack(predictor.pre_transform(images))
+        im = np.ascontiguousarray(im[..., ::-1].transpose((0, 3, 1, 2)))
+        im = torch.from_numpy(im).to(predictor.device)
+        im = im.half() if predictor.model.fp16 else im.float()
+        im /= 255
+        return im
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for bs in batch_sizes:
+        images = [rng.integers(0, 255, (*imgsz, 3), dtype=np.uint8) for _ in range(bs)]
+        assert torch.equal(former(images), predictor.preprocess(images))
+        times = []
+        for fn in (former, predictor.preprocess):
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                fn(images)
+            times.append((time.perf_counter() - t0) * 1e3 / frames / bs)
+        results[bs] = {"former_ms": times[0], "fused_ms": times[1]}
+        LOGGER.info(
+            f"Preprocess, batch {bs} x {imgsz[1]}x{imgsz[0]}: former {times[0]:.2f} ms/image, "
+            f"fused {times[1]:.2f} ms/image, {times[0] / times[1]:.2f}x faster"
+        )
+    return results
+
+
+def benchmark_infer_frame(frames=300, imgsz=64):
+    """
+    Compare the per-call Python overhead of `YOLO.predict` on one frame with `predictor.infer_frame`.
+
+    The overhead is the wall time of a call minus the preprocess, inference and postprocess time in `Results.speed`,
+    a small `imgsz` keeps the measurement from drowning in model time.
+
+    Returns:
+        (dict): Wall and overhead milliseconds per call for both paths.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO("yolo11n.yaml")
+    frame = np.random.default_rng(0).integers(0, 255, (imgsz, imgsz, 3), dtype=np.uint8)
+    model.predict(frame, imgsz=imgsz, verbose=False)  # creates and warms up the predictor
+    paths = {
+        "predict": lambda: model.predict(frame, imgsz=imgsz, verbose=False)[0],
+        "infer_frame": lambda: model.predictor.infer_frame(frame),
+    }
+    results = {}
+    for name, fn in paths.items():
+        wall = inner = 0.0
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            r = fn()
+            wall += time.perf_counter() - t0
+            inner += sum(r.speed.values()) / 1e3
+        results[name] = {"wall_ms": wall * 1e3 / frames, "overhead_ms": (wall - inner) * 1e3 / frames}
+    LOGGER.info(
+        f"Single-frame calls at imgsz={imgsz}: YOLO.predict overhead {results['predict']['overhead_ms']:.3f} ms/call, "
+        f"infer_frame overhead {results['infer_frame']['overhead_ms']:.3f} ms/call"
+    )
+    return results
+
+
+def benchmark_broker(callers=8, frames=40, imgsz=320, batches=(1, 4, 8), max_wait=0.005):
+    """
+    Measure throughput and latency of `callers` threads predicting frames through an `InferenceBroker`.
+
+    Every caller predicts `frames` frames one after another, as a pipeline does, for every `max_batch` in `batches`.
+    A `max_batch` of 1 runs every frame on its own and is the baseline of concurrent callers sharing one model.
+
+    Returns:
+        (dict): Frames per second, mean batch size and p50/p99 latency in milliseconds per `max_batch`.
+    """
+    import threading
+
+    from .broker import InferenceBroker
+    from .models import ModelHandle
+
+    handle = ModelHandle("yolo11n.yaml", device="cpu", imgsz=imgsz)
+    handle.load()
+    images = np.random.default_rng(0).integers(0, 255, (callers, 720, 1280, 3), dtype=np.uint8)
+    results = {}
+    for max_batch in batches:
+        broker = InferenceBroker(handle, max_batch=max_batch, max_wait=max_wait)
+        broker(images[0], verbose=False)  # warms up the batch path
+
+        def caller(image):
+            for _ in range(frames):
+                broker(image, verbose=False)
+
+        threads = [threading.Thread(target=caller, args=(image,)) for image in images]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+        broker.stop()
+        stats = broker.stats()
+        r = results[max_batch] = {"fps": callers * frames / elapsed}
+        r.update((k, stats[k]) for k in ("mean_batch", "p50_ms", "p99_ms"))
+        LOGGER.info(
+            f"Broker, {callers} callers, max_batch {max_batch}: {r['fps']:.1f} frames/s, mean batch {r['mean_batch']}, "
+            f"latency p50 {r['p50_ms']:.1f} ms, p99 {r['p99_ms']:.1f} ms"
+        )
+    return results
+
+
+# Cold start of one process: import, load, first and steady-state inference, peak RSS
+_COLD_START = """
+import json, resource, sys, time
+t0 = time.perf_counter()
+{imports}
+t1 = time.perf_counter()
+model = {load}
+image = __import__("cv2").imread(sys.argv[2])
+model(image{args})
+t2 = time.perf_counter()
+for _ in range({frames}):
+    model(image{args})
+t3 = time.perf_counter()
+try:  # ru_maxrss includes the RSS of the parent at fork time on Linux
+    rss = int(next(l.split()[1] for l in open("/proc/self/status") if l.startswith("VmHWM"))) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"import_s": t1 - t0, "first_s": t2 - t0, "ms": (t3 - t2) * 1e3 / {frames}, "rss_mb": rss}}))
+"""
+
+
+def benchmark_edge(weights=None, image=None, imgsz=640, frames=20):
+    """
+    Compare cold start, per-frame time and peak memory of `YOLO(onnx).predict` and the torch-free `EdgeDetector`.
+
+    Each path runs in a fresh interpreter. Without `weights` a random model from `make_onnx_detector` is used, which
+    measures the framework overhead rather than the network.
+
+    Returns:
+        (dict): 'ultralytics' and 'edge' dicts with import and first-result seconds, ms per frame and peak RSS in MB.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    variants = {
+        "ultralytics": ("from ultralytics import YOLO", "YOLO(sys.argv[1], task='detect')", f", imgsz={imgsz}"),
+        "edge": ("from service.edge import EdgeDetector", "EdgeDetector(sys.argv[1])", ""),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as d:
+        weights = weights or make_onnx_detector(os.path.join(d, "detector.onnx"), imgsz=imgsz)
+        if image is None:
+            image = os.path.join(d, "frame.jpg")
+            cv2.imwrite(image, np.random.default_rng(0).integers(0, 255, (1080, 1920, 3), dtype=np.uint8))
+        for name, (imports, load, args) in variants.items():
+            args += ", verbose=False" * bool(args)
+            code = _COLD_START.format(imports=imports, load=load, args=args, frames=frames)
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, (root, os.environ.get("PYTHONPATH"))))}
+            out = subprocess.run([sys.executable, "-c", code, weights, image], capture_output=True, text=True, env=env)
+            results[name] = json.loads(out.stdout.strip().splitlines()[-1])
+    for name, r in results.items():
+        LOGGER.info(
+            f"Cold start {name}: import {r['import_s']:.2f}s, first result {r['first_s']:.2f}s, "
+            f"{r['ms']:.2f} ms/frame, peak RSS {r['rss_mb']:.0f} MB"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_db_writer()
+    benchmark_overlay()
+    benchmark_heatmap()
+    benchmark_detection_log()
+    benchmark_nms()
+    benchmark_preprocess()
+    benchmark_infer_frame()
+    benchmark_broker()
+    benchmark_edge()
@@ -0,0 +1,176 @@
+"""Dynamic micro-batching of concurrent single-frame predictions into one batched model call."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from ultralytics.utils import LOGGER
+
+
+class _Request:
+    """One frame waiting in `InferenceBroker`: the frame, its predict arguments, its future and its arrival time."""
+
+    __slots__ = ("frame", "args", "future", "arrival")
+
+    def __init__(self, frame, args):
+        self.frame = frame
+        self.args = args
+        self.future = Future()
+        self.arrival = time.perf_counter()
+
+
+class InferenceBroker:
+    """
+    Collects single-frame predictions of concurrent callers into micro-batches that run as one `model.predict` call.
+
+    A batch is dispatched when `max_batch` frames with the same key are waiting or when its oldest frame has waited
+    `max_wait` seconds, so a lone caller pays at most `max_wait` of extra latency while many callers share one batched
+    forward pass. Frames are only batched with frames of the same shape and predict arguments, which gives every frame
+    the same letterbox and thresholds, and therefore the same boxes, as a call of its own. The batch runs on a worker
+    thread started on the first submit and its `Results` are returned to the callers through futures.
+
+    The broker has the `predict` interface of `ModelHandle`, so it can replace the model of `FrameTracker`,
+    `FramePipeline` and `CameraHub`. The model backend must accept batches (PyTorch weights or a dynamic export).
+
+    Attributes:
+        model (ModelHandle | YOLO): Detection model, may be shared with callers that do not use the broker.
+        max_batch (int): Maximum frames per batch.
+        max_wait (float): Seconds the oldest waiting frame may wait for more frames.
+        batches (int): Batches run.
+        frames (int): Frames predicted.
+    """
+
+    def __init__(self, model, max_batch=8, max_wait=0.005):
+        """Initialize an idle broker, the worker thread starts with the first submitted frame."""
+        if max_batch < 1:
+            raise ValueError(f"Invalid max_batch={max_batch}, it must be at least 1")
+        self.model = model
+        self.max_batch = int(max_batch)
+        self.max_wait = float(max_wait)
+        self.batches = 0
+        self.frames = 0
+        self._latency = deque(maxlen=1000)  # seconds from submit to result of the latest frames
+        self._pending = {}  # batch key -> list of waiting requests, oldest first
+        self._cond = threading.Condition()  # reentrant, `submit` calls `start` under it
+        self._stop = False
+        self._running = False  # cleared by the worker under the lock when it exits, so a submit never gets stranded
+        self._thread = None
+
+    @property
+    def names(self):
+        """Class names of the model."""
+        return self.model.names
+
+    @property
+    def fingerprint(self):
+        """Detection cache key of the model."""
+        return self.model.fingerprint
+
+    def start(self):
+        """Start the worker thread if it is not running."""
+        with self._cond:
+            if not self._running:
+                self._stop, self._running = False, True
+                self._thread = threading.Thread(target=self._run, name="inference-broker", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Run the waiting frames without waiting for more and stop the worker thread."""
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, frame, **kwargs):
+        """
+        Queue a frame for the next batch.
+
+        Args:
+            frame (np.ndarray): (h, w, 3) BGR image, must not be modified until the future is done.
+            **kwargs (Any): Keyword arguments for `model.predict`.
+
+        Returns:
+            (Future): Future of the `Results` of the frame.
+        """
+        request = _Request(frame, kwargs)
+        key = (frame.shape, frame.dtype.str, repr(sorted(kwargs.items())))
+        with self._cond:
+            self.start()
+            queue = self._pending.setdefault(key, [])
+            queue.append(request)
+            if (len(self._pending) == 1 and len(queue) == 1) or len(queue) == self.max_batch:
+                self._cond.notify()  # new oldest frame or full batch, the worker has to look again
+        return request.future
+
+    def predict(self, source, **kwargs):
+        """
+        Predict a frame or a list of frames through the batches and return the list of `Results`.
+
+        Other sources (paths, streams, tensors) are passed directly to `model.predict`.
+        """
+        if isinstance(source, np.ndarray):
+            return [self.submit(source, **kwargs).result()]
+        if isinstance(source, list) and source and all(isinstance(x, np.ndarray) for x in source):
+            return [f.result() for f in [self.submit(x, **kwargs) for x in source]]
+        return self.model.predict(source, **kwargs)
+
+    __call__ = predict
+
+    def stats(self):
+        """Return the batch count, mean batch size and the p50 and p99 submit-to-result latency in milliseconds."""
+        latency = np.array(self._latency) * 1e3
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1e3,
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch": round(self.frames / max(self.batches, 1), 2),
+            "p50_ms": round(float(np.percentile(latency, 50)), 3) if len(latency) else None,
+            "p99_ms": round(float(np.percentile(latency, 99)), 3) if len(latency) else None,
+        }
+
+    def _next_batch(self):
+        """Wait until a batch is full or its oldest frame is due and remove it, None once stopped and drained."""
+        with self._cond:
+            while True:
+                if not self._pending:
+                    if self._stop:
+                        self._running = False
+                        return None
+                    self._cond.wait()
+                    continue
+                full = [item for item in self._pending.items() if len(item[1]) >= self.max_batch]
+                key, queue = full[0] if full else min(self._pending.items(), key=lambda item: item[1][0].arrival)
+                remaining = queue[0].arrival + self.max_wait - time.perf_counter()
+                if len(queue) >= self.max_batch or remaining <= 0 or self._stop:
+                    batch = queue[: self.max_batch]
+                    del queue[: self.max_batch]
+                    if not queue:
+                        del self._pending[key]
+                    return batch
+                self._cond.wait(remaining)
+
+    def _run(self):
+        """Worker loop: run the batches until stopped."""
+        while (batch := self._next_batch()) is not None:
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.model.predict([r.frame for r in batch], **batch[0].args)
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ Batch of {len(batch)} frames failed: {e}")
+                for r in batch:
+                    r.future.set_exception(e)
+                continue
+            t = time.perf_counter()
+            self.batches += 1
+            self.frames += len(batch)
+            self._latency.extend(t - r.arrival for r in batch)
+            for r, result in zip(batch, results):
+                r.future.set_result(result)
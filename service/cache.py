@@ -0,0 +1,188 @@
+"""Content-addressed cache of per-frame detections, so re-processing a known video replays them without inference."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from ultralytics.engine.results import Results
+from ultralytics.utils import LOGGER
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of the content of `path`, read in `chunk_size` byte chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class CachedDetections:
+    """
+    Detections of one video read from a cache entry, all arrays memory-mapped.
+
+    Boxes of all frames are stored column by column and frame `i` owns rows `offsets[i]:offsets[i + 1]`, so a frame is
+    three array slices and opening an entry reads no box data until it is used.
+
+    Attributes:
+        xyxy (np.ndarray): (N, 4) float32 boxes of all frames.
+        conf (np.ndarray): (N,) float32 confidences.
+        cls (np.ndarray): (N,) uint16 class IDs.
+        offsets (np.ndarray): (frames + 1,) int64 row offset of every frame.
+        detected (np.ndarray): (frames,) bool, False where the detector did not run (inference stride).
+        names (dict): Class ID to name map of the model.
+    """
+
+    COLUMNS = ("xyxy", "conf", "cls", "offsets", "detected")
+
+    def __init__(self, folder):
+        """Open the cache entry in `folder`."""
+        for column in self.COLUMNS:
+            setattr(self, column, np.load(os.path.join(folder, f"{column}.npy"), mmap_mode="r"))
+        with open(os.path.join(folder, "meta.json")) as f:
+            self.names = {int(k): v for k, v in json.load(f)["names"].items()}
+
+    def __len__(self):
+        """Return the number of frames."""
+        return len(self.detected)
+
+    def results(self, index, frame, path=""):
+        """Return the detector `Results` of frame `index` on the decoded `frame`, None if the detector did not run."""
+        if index >= len(self) or not self.detected[index]:
+            return None
+        i, j = self.offsets[index], self.offsets[index + 1]
+        boxes = np.concatenate([self.xyxy[i:j], self.conf[i:j, None], self.cls[i:j, None]], axis=1)
+        return Results(frame, path=path, names=self.names, boxes=torch.from_numpy(boxes))
+
+
+class DetectionRecorder:
+    """
+    Collects the detections of one run and writes them as a cache entry with `commit`.
+
+    Attributes:
+        cache (DetectionCache): Cache the entry is written to.
+        key (str): Entry key.
+    """
+
+    def __init__(self, cache, key):
+        """Initialize an empty recording for `key`."""
+        self.cache = cache
+        self.key = key
+        self.names = None
+        self._boxes = []
+        self._detected = []
+
+    def add(self, results):
+        """Record the detector `Results` of the next frame, None if the detector did not run on it."""
+        if results is None:
+            self._detected.append(False)
+            self._boxes.append(np.zeros((0, 6), dtype=np.float32))
+            return
+        self.names = results.names
+        self._detected.append(True)
+        self._boxes.append(results.boxes.data.cpu().numpy()[:, [0, 1, 2, 3, -2, -1]].astype(np.float32))
+
+    def commit(self):
+        """Write the recorded frames as the cache entry, replacing an existing entry atomically."""
+        boxes = np.concatenate(self._boxes) if self._boxes else np.zeros((0, 6), dtype=np.float32)
+        columns = {
+            "xyxy": np.ascontiguousarray(boxes[:, :4]),
+            "conf": np.ascontiguousarray(boxes[:, 4]),
+            "cls": boxes[:, 5].astype(np.uint16),
+            "offsets": np.cumsum([0] + [len(b) for b in self._boxes], dtype=np.int64),
+            "detected": np.asarray(self._detected, dtype=bool),
+        }
+        os.makedirs(self.cache.root, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self.cache.root, suffix=".tmp")
+        for column, array in columns.items():
+            np.save(os.path.join(tmp, f"{column}.npy"), array)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"names": self.names or {}, "frames": len(self._detected), "boxes": len(boxes)}, f)
+        folder = self.cache.folder(self.key)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.replace(tmp, folder)
+        LOGGER.info(f"Cached {len(boxes)} detections of {len(self._detected)} frames as {self.key}")
+        self.cache.prune(keep=(self.key,))
+        return folder
+
+
+class DetectionCache:
+    """
+    Directory of detection cache entries keyed by video content, model and inference arguments.
+
+    The key is the SHA-256 of the video file hash, the model fingerprint and the JSON of the inference arguments that
+    change which boxes the detector returns (image size, confidence, inference stride, ...). Thresholds and drawing
+    options applied after detection are not part of the key, so changing them replays the same entry.
+
+    Entries older than `max_age` seconds are deleted, and the least recently used entries are deleted while the cache
+    is larger than `max_bytes`. Both run after every commit, reading an entry marks it as used.
+
+    Layout:
+        <root>/<key>/ with one `.npy` file per `CachedDetections.COLUMNS` and `meta.json` (class names, counts).
+
+    Attributes:
+        root (str): Cache directory.
+        max_bytes (int | None): Size limit of all entries, None for no limit.
+        max_age (float | None): Seconds since last use after which an entry is deleted, None for no limit.
+    """
+
+    def __init__(self, root, max_bytes=None, max_age=None):
+        """Initialize the cache in `root`, created on the first commit."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def key(video_hash, model_hash, **args):
+        """Return the entry key of a video and model content hash and the inference arguments."""
+        payload = json.dumps({"video": video_hash, "model": model_hash, "args": args}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def folder(self, key):
+        """Return the directory of entry `key`."""
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """Return the `CachedDetections` of `key`, None if it is not cached or unreadable."""
+        folder = self.folder(key)
+        if not os.path.isdir(folder):
+            return None
+        try:
+            entry = CachedDetections(folder)
+        except (OSError, ValueError, KeyError) as e:
+            LOGGER.warning(f"WARNING ⚠️ Ignoring unreadable detection cache entry {folder}: {e}")
+            return None
+        os.utime(folder)  # last use, for `prune`
+        return entry
+
+    def recorder(self, key):
+        """Return a `DetectionRecorder` that writes entry `key`."""
+        return DetectionRecorder(self, key)
+
+    def prune(self, keep=()):
+        """Delete entries beyond `max_age` and least recently used entries beyond `max_bytes`, except `keep`."""
+        if not os.path.isdir(self.root) or (self.max_bytes is None and self.max_age is None):
+            return 0
+        entries = []  # (last use, bytes, path), newest first
+        for e in os.scandir(self.root):
+            if e.is_dir() and not e.name.endswith(".tmp"):
+                size = sum(f.stat().st_size for f in os.scandir(e.path) if f.is_file())
+                entries.append((e.stat().st_mtime, size, e))
+        entries.sort(key=lambda x: x[0], reverse=True)
+        total, deleted, now = 0, 0, time.time()
+        for mtime, size, e in entries:
+            total += size
+            expired = self.max_age is not None and now - mtime > self.max_age
+            if e.name not in keep and (expired or (self.max_bytes is not None and total > self.max_bytes)):
+                shutil.rmtree(e.path, ignore_errors=True)
+                total -= size
+                deleted += 1
+        if deleted:
+            LOGGER.info(f"Pruned {deleted} detection cache entries from {self.root}")
+        return deleted
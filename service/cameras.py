@@ -0,0 +1,290 @@
+"""Live camera ingestion: cameras registered at runtime, reconnected with backoff and detected in one batch per tick."""
+
+import math
+import threading
+import time
+
+import cv2
+
+from ultralytics.data.loaders import resolve_stream_source
+from ultralytics.utils import LOGGER
+
+from .pipeline import FramePacket, VideoInfo
+from .tracking import FrameTracker
+
+
+class CameraStream:
+    """
+    One live source read on a background thread that keeps only the latest frame.
+
+    Frames are read like `LoadStreams.update` (grab every frame, retrieve every `vid_stride`-th), but a lost or
+    unreachable source does not end the stream: the capture is reopened after a delay that doubles with every failed
+    attempt up to `max_backoff` and resets once frames arrive again.
+
+    Attributes:
+        camera_id (str): Camera ID.
+        source (str): Stream URL, file path or webcam index as given.
+        vid_stride (int): Frames read per retrieved frame.
+        state (str): 'connecting', 'online', 'offline' (waiting to reconnect) or 'stopped'.
+        fps (float): Frame rate reported by the source, 30 if unknown.
+        shape (tuple | None): Shape of the latest frame.
+        frames_read (int): Frames retrieved since the stream started.
+        reconnects (int): Times the source was lost or could not be opened.
+        error (str | None): Reason of the last reconnect.
+    """
+
+    def __init__(self, camera_id, source, vid_stride=1, backoff=1.0, max_backoff=30.0):
+        """Initialize the stream, `start` opens the source on a background thread."""
+        self.camera_id = camera_id
+        self.source = source
+        self.vid_stride = max(int(vid_stride), 1)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = "connecting"
+        self.fps = 30.0
+        self.shape = None
+        self.frames_read = 0
+        self.reconnects = 0
+        self.error = None
+        self._frame = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"camera-{camera_id}", daemon=True)
+
+    def start(self):
+        """Start reading the source."""
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop reading and release the source."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self.state = "stopped"
+
+    def read(self):
+        """Return (frames_read, frame) of the latest frame, frame is None before the first one."""
+        with self._lock:
+            return self.frames_read, self._frame
+
+    def status(self):
+        """Return a JSON-serializable status dict."""
+        return {
+            "camera_id": self.camera_id,
+            "source": self.source,
+            "state": self.state,
+            "fps": self.fps,
+            "shape": self.shape,
+            "frames_read": self.frames_read,
+            "reconnects": self.reconnects,
+            "error": self.error,
+        }
+
+    def _run(self):
+        """Reader thread: (re)open the source and keep the latest frame until stopped."""
+        delay = self.backoff
+        while not self._stop.is_set():
+            self.state = "connecting"
+            cap = cv2.VideoCapture(resolve_stream_source(str(self.source)))
+            try:
+                if cap.isOpened():
+                    fps = cap.get(cv2.CAP_PROP_FPS)  # warning: may return 0 or nan
+                    self.fps = max((fps if math.isfinite(fps) else 0) % 100, 0) or 30.0  # 30 FPS fallback
+                    if self._read(cap):
+                        delay = self.backoff  # the source delivered frames, start over with the shortest delay
+                    self.error = "stream ended or lost"
+                else:
+                    self.error = "failed to open source"
+            finally:
+                cap.release()
+            if self._stop.is_set():
+                break
+            self.state = "offline"
+            self.reconnects += 1
+            LOGGER.warning(f"WARNING ⚠️ Camera '{self.camera_id}': {self.error}, reconnecting in {delay:.1f}s")
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _read(self, cap):
+        """Read frames from an open capture until it fails or the stream is stopped, return True if any arrived."""
+        n, received = 0, False
+        while not self._stop.is_set():
+            if not cap.grab():
+                break
+            n += 1
+            if n % self.vid_stride:
+                continue
+            success, im = cap.retrieve()
+            if not success or im is None:
+                break
+            with self._lock:
+                self._frame = im
+                self.frames_read += 1
+            self.shape, self.state, received = im.shape, "online", True
+        return received
+
+
+class _Camera:
+    """Per-camera processing state owned by `CameraHub`: stream, tracker, stages and the last processed frame."""
+
+    def __init__(self, stream, stages):
+        self.stream = stream
+        self.stages = stages
+        self.tracker = None
+        self.opened = []
+        self.last = 0  # `frames_read` of the last processed frame
+        self.frames = 0
+        self.skipped = 0
+
+
+class CameraHub:
+    """
+    Ingests many live cameras into one model with a single batched `model.predict` call per tick.
+
+    Every tick, the newest frame of each camera is detected in one batch and the results are tracked and processed per
+    camera. Every camera has its own `FrameTracker` and its own pipeline stages (e.g. counting and persistence with the
+    camera ID as `video_id`), created by the `stages` factory on registration. Cameras whose reader is slower than
+    the tick are skipped until a new frame arrives; frames that arrive faster than the tick are dropped and counted.
+
+    Attributes:
+        model (ModelHandle | YOLO): Detection model, shared with other pipelines.
+        stages (callable): Called with a camera ID and returns the list of `Stage` objects for that camera.
+        tracker (str): Tracker configuration YAML.
+        fps (float): Ticks per second.
+        predict_args (dict): Extra keyword arguments for `model.predict`.
+        ticks (int): Ticks that ran the model.
+        timings (dict): Seconds spent in 'inference' and 'stages' over all ticks.
+    """
+
+    def __init__(self, model, stages=None, tracker="bytetrack.yaml", fps=10, **predict_args):
+        """Initialize an empty hub, `start` runs the tick loop on a background thread."""
+        self.model = model
+        self.stages = stages or (lambda camera_id: [])
+        self.tracker = tracker
+        self.fps = fps
+        self.predict_args = predict_args
+        self.ticks = 0
+        self.timings = {"inference": 0.0, "stages": 0.0}
+        self._batched = 0
+        self._cameras = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, camera_id, source, vid_stride=1, **kwargs):
+        """Start ingesting `source` as `camera_id` and return its `CameraStream`, kwargs are passed to the stream."""
+        with self._lock:
+            if camera_id in self._cameras:
+                raise ValueError(f"Camera '{camera_id}' is already registered")
+            stream = CameraStream(camera_id, source, vid_stride=vid_stride, **kwargs).start()
+            self._cameras[camera_id] = _Camera(stream, list(self.stages(camera_id)))
+        LOGGER.info(f"Registered camera '{camera_id}' ({source})")
+        return stream
+
+    def unregister(self, camera_id):
+        """Stop ingesting `camera_id` and close its stages, raise KeyError if it is not registered."""
+        with self._lock:  # waits for a running tick, so stages are never closed while processing
+            camera = self._cameras.pop(camera_id)
+            self._close(camera)
+        camera.stream.stop()
+        LOGGER.info(f"Unregistered camera '{camera_id}' after {camera.frames} frames")
+
+    def start(self):
+        """Start the tick loop if it is not running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="camera-hub", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the tick loop and unregister all cameras."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        for camera_id in list(self._cameras):
+            self.unregister(camera_id)
+
+    def tick(self):
+        """Detect the newest frame of every camera with a new frame in one batch, return the number of frames."""
+        with self._lock:
+            batch = []
+            for camera_id, camera in self._cameras.items():
+                seq, frame = camera.stream.read()
+                if frame is not None and seq != camera.last:
+                    camera.skipped += seq - camera.last - 1
+                    camera.last = seq
+                    batch.append((camera_id, camera, frame))
+        if not batch:
+            return 0
+
+        # The lock is not held during inference, so status, register and unregister do not wait for the model
+        t0 = time.perf_counter()
+        predict_args = {"conf": 0.1, "verbose": False, **self.predict_args}  # same defaults as FrameTracker
+        results = self.model.predict([frame for _, _, frame in batch], **predict_args)
+        t1 = time.perf_counter()
+        with self._lock:  # unregister closes stages under the lock, so they are never closed while processing
+            for (camera_id, camera, frame), result in zip(batch, results):
+                if self._cameras.get(camera_id) is not camera:  # unregistered during inference
+                    continue
+                if camera.tracker is None:
+                    self._open(camera, frame)
+                camera.tracker.last = result
+                packet = FramePacket(index=camera.frames, image=frame, results=camera.tracker.update(result, frame))
+                for stage in camera.stages:
+                    stage.process(packet)
+                camera.frames += 1
+            self.timings["inference"] += t1 - t0
+            self.timings["stages"] += time.perf_counter() - t1
+            self.ticks += 1
+            self._batched += len(batch)
+            return len(batch)
+
+    def status(self):
+        """Return the hub statistics and the status of every camera."""
+        with self._lock:
+            cameras = [
+                {**c.stream.status(), "frames_processed": c.frames, "frames_skipped": c.skipped}
+                for c in self._cameras.values()
+            ]
+        n = max(self.ticks, 1)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "fps": self.fps,
+            "ticks": self.ticks,
+            "mean_batch": round(self._batched / n, 2),
+            "ms_per_tick": {k: round(v * 1e3 / n, 3) for k, v in self.timings.items()},
+            "cameras": cameras,
+        }
+
+    def _open(self, camera, frame):
+        """Create the tracker and open the stages of a camera on its first processed frame."""
+        camera.tracker = FrameTracker(self.model, self.tracker, frame_rate=math.ceil(self.fps), **self.predict_args)
+        h, w = frame.shape[:2]
+        info = VideoInfo(path=str(camera.stream.source), width=w, height=h, fps=math.ceil(self.fps), frames=0)
+        for stage in camera.stages:
+            stage.open(info)
+            camera.opened.append(stage)
+
+    @staticmethod
+    def _close(camera):
+        """Close the opened stages of a camera, logging instead of raising so the other cameras keep running."""
+        for stage in reversed(camera.opened):
+            try:
+                stage.close()
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ Closing {stage.name} of camera '{camera.stream.camera_id}' failed: {e}")
+        camera.opened.clear()
+
+    def _run(self):
+        """Tick loop: run `tick` every 1 / fps seconds until stopped."""
+        period = 1 / self.fps
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                LOGGER.warning(f"WARNING ⚠️ Camera tick failed: {e}")
+            next_tick = max(next_tick + period, time.perf_counter())  # never try to catch up on missed ticks
+            self._stop.wait(max(next_tick - time.perf_counter(), 0))
@@ -0,0 +1,70 @@
+"""Job checkpoints on disk, so a restarted service resumes interrupted videos instead of processing them again."""
+
+import os
+import pickle
+import tempfile
+
+from ultralytics.utils import LOGGER
+
+from .heatmaps import KEY_PATTERN
+
+
+class CheckpointStore:
+    """
+    Directory of job checkpoints: one pickle file per job holding the latest `FramePipeline.state`.
+
+    A checkpoint is written atomically, so after a crash the file is either the previous or the new checkpoint and
+    never a partial one. It is removed once the job ends, so the checkpoints left on startup are exactly the jobs the
+    previous process did not finish.
+
+    Layout:
+        <root>/<job id>.ckpt with the pipeline state dict plus any fields added by the caller, e.g. the video path.
+
+    Attributes:
+        root (str): Store directory.
+    """
+
+    def __init__(self, root):
+        """Initialize the store in `root`, created on the first save."""
+        self.root = root
+
+    def save(self, key, state):
+        """Pickle `state` as the checkpoint of job `key` and return its path, replacing the previous checkpoint."""
+        path = self._path(key)
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+
+    def load(self, key):
+        """Return the checkpoint of job `key`, None if there is none or it cannot be read."""
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:  # written by an older version or a damaged file, the job starts over
+            LOGGER.warning(f"WARNING ⚠️ Ignoring unreadable checkpoint {path}: {e}")
+            return None
+
+    def remove(self, key):
+        """Delete the checkpoint of job `key` if it exists."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self):
+        """Return the sorted IDs of the jobs that have a checkpoint."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.root) if name.endswith(".ckpt"))
+
+    def _path(self, key):
+        """Return the checkpoint path of `key`, rejecting keys that are not plain names."""
+        if not KEY_PATTERN.match(str(key)):
+            raise ValueError(f"Invalid checkpoint key '{key}'")
+        return os.path.join(self.root, f"{key}.ckpt")
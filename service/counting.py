@@ -0,0 +1,69 @@
+"""Per-class object counting on integer class-ID arrays."""
+
+import numpy as np
+
+from .pipeline import Stage
+
+
+class ClassCounter:
+    """
+    Counts detections per class with `np.bincount` instead of comparing class-name strings per detection.
+
+    The class-name to ID map is resolved once from the model's `names`, and every call returns the full count vector,
+    so counting more classes costs nothing extra.
+
+    Attributes:
+        names (dict): Class ID to name map of the model.
+        ids (dict): Class name to ID map.
+        conf (float): Minimum confidence of a counted detection.
+    """
+
+    def __init__(self, names, conf=0.0):
+        """Initialize from the model's `names` (dict or list) and a confidence threshold."""
+        self.names = dict(enumerate(names)) if isinstance(names, (list, tuple)) else dict(names)
+        self.ids = {name: i for i, name in self.names.items()}
+        self.conf = conf
+        self._minlength = max(self.names, default=-1) + 1
+
+    def counts(self, class_ids, confidence=None):
+        """Return the per-class count vector of integer `class_ids`, optionally filtered by `confidence`."""
+        class_ids = np.asarray(class_ids, dtype=np.int64)
+        if confidence is not None and self.conf:
+            class_ids = class_ids[np.asarray(confidence) >= self.conf]
+        return np.bincount(class_ids, minlength=self._minlength)
+
+    def __call__(self, results):
+        """Return the per-class count vector of a `Results` or `sv.Detections` object."""
+        if hasattr(results, "boxes"):  # ultralytics Results or EdgeResults
+            boxes = results.boxes.cpu().numpy()
+            return self.counts(boxes.cls, boxes.conf)
+        if results.class_id is None:
+            return np.zeros(self._minlength, dtype=np.int64)
+        return self.counts(results.class_id, results.confidence)
+
+    def get(self, counts, name):
+        """Return the count of class `name` from a count vector, 0 if the model has no such class."""
+        i = self.ids.get(name)
+        return int(counts[i]) if i is not None else 0
+
+
+class CountingStage(Stage):
+    """
+    Pipeline stage that stores the per-class count vector and named counts in `packet.data`.
+
+    Attributes:
+        counter (ClassCounter): Counter resolved from the model's class names.
+        fields (dict): `packet.data` key to class name, e.g. {'person_count': 'Person'}.
+    """
+
+    def __init__(self, names, conf=0.0, fields=None):
+        """Initialize with the model's `names`, a confidence threshold and the named counts to expose."""
+        self.counter = ClassCounter(names, conf=conf)
+        self.fields = fields or {}
+
+    def process(self, packet):
+        """Count the detections of `packet.results`."""
+        counts = self.counter(packet.results)
+        packet.data["counts"] = counts
+        for key, name in self.fields.items():
+            packet.data[key] = self.counter.get(counts, name)
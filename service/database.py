@@ -0,0 +1,346 @@
+"""SQLite storage for per-frame detection counts and their per-second / per-minute rollups."""
+
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from ultralytics.utils import LOGGER
+
+DB_PATH = "detections.db"
+
+# Columns added after the first release of the `person` table, migrated in place by `setup_database`
+PERSON_MIGRATIONS = {
+    "frame_idx": "INTEGER",
+    "video_id": "TEXT",
+}
+
+# Rollup tables keyed by (video_id, bucket start as UNIX time), maintained in the same transaction as the raw rows
+ROLLUPS = {
+    "second": ("person_rollup_1s", 1),
+    "minute": ("person_rollup_1m", 60),
+}
+
+
+def connect(db_path=DB_PATH):
+    """Open a connection in WAL mode so readers (the dashboard API) never block the detection writer."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # fsync on checkpoint instead of on every commit, safe with WAL
+    return conn
+
+
+def setup_database(db_path=DB_PATH):
+    """Create or migrate the `person` table and return an open connection."""
+    conn = connect(db_path)
+    conn.execute("""CREATE TABLE IF NOT EXISTS person (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        person_count INTEGER,
+        head_count INTEGER,
+        created_at DATETIME DEFAULT (DATETIME('now', 'localtime'))
+    )""")
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(person)")}
+    for name, kind in PERSON_MIGRATIONS.items():
+        if name not in columns:
+            conn.execute(f"ALTER TABLE person ADD COLUMN {name} {kind}")
+    conn.execute("CREATE INDEX IF NOT EXISTS person_video_frame ON person (video_id, frame_idx)")
+    for table, seconds in ROLLUPS.values():
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+        conn.execute(f"""CREATE TABLE IF NOT EXISTS {table} (
+            video_id TEXT NOT NULL DEFAULT '',
+            bucket INTEGER NOT NULL,
+            frames INTEGER NOT NULL,
+            person_min INTEGER, person_max INTEGER, person_sum INTEGER,
+            head_min INTEGER, head_max INTEGER, head_sum INTEGER,
+            PRIMARY KEY (video_id, bucket)
+        ) WITHOUT ROWID""")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_bucket ON {table} (bucket)")
+        if not exists:  # backfill rows written before the rollup table existed, missing counts are taken as 0
+            conn.execute(f"""INSERT INTO {table}
+                SELECT COALESCE(video_id, ''), CAST(strftime('%s', timestamp) AS INTEGER) / {seconds} * {seconds},
+                       COUNT(*), MIN(p), MAX(p), SUM(p), MIN(h), MAX(h), SUM(h)
+                FROM (SELECT video_id, timestamp, COALESCE(person_count, 0) AS p, COALESCE(head_count, 0) AS h
+                      FROM person WHERE timestamp IS NOT NULL)
+                GROUP BY 1, 2""")
+    conn.commit()
+    return conn
+
+
+def update_rollups(conn, rows):
+    """Merge `(person_count, head_count, frame_idx, video_id, ts)` rows into the rollup tables, caller commits."""
+    for table, seconds in ROLLUPS.values():
+        buckets = defaultdict(lambda: [0, None, None, 0, None, None, 0])
+        for person, head, _, video_id, ts in rows:
+            person, head = person or 0, head or 0
+            b = buckets[(video_id or "", int(ts) // seconds * seconds)]
+            b[0] += 1
+            b[1] = person if b[1] is None else min(b[1], person)
+            b[2] = person if b[2] is None else max(b[2], person)
+            b[3] += person
+            b[4] = head if b[4] is None else min(b[4], head)
+            b[5] = head if b[5] is None else max(b[5], head)
+            b[6] += head
+        conn.executemany(
+            f"""INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (video_id, bucket) DO UPDATE SET
+                frames = frames + excluded.frames,
+                person_min = MIN(person_min, excluded.person_min),
+                person_max = MAX(person_max, excluded.person_max),
+                person_sum = person_sum + excluded.person_sum,
+                head_min = MIN(head_min, excluded.head_min),
+                head_max = MAX(head_max, excluded.head_max),
+                head_sum = head_sum + excluded.head_sum""",
+            [(*key, *value) for key, value in buckets.items()],
+        )
+
+
+def delete_frames(conn, video_id, start):
+    """
+    Delete the rows of `video_id` from frame `start` on and rebuild the rollup buckets they were counted in.
+
+    Used when a job resumes from a checkpoint: frames processed after the checkpoint are processed again, so their rows
+    would otherwise be counted twice. Min and max cannot be taken back from a rollup, so the affected buckets are
+    recomputed from the remaining raw rows.
+
+    Returns:
+        (int): Number of deleted rows.
+    """
+    with conn:
+        rows = conn.execute(
+            "SELECT DISTINCT CAST(strftime('%s', timestamp) AS INTEGER) FROM person "
+            "WHERE video_id = ? AND frame_idx >= ? AND timestamp IS NOT NULL",
+            (video_id, start),
+        )
+        times = [t for (t,) in rows]
+        deleted = conn.execute("DELETE FROM person WHERE video_id = ? AND frame_idx >= ?", (video_id, start)).rowcount
+        for table, seconds in ROLLUPS.values():
+            for bucket in sorted({t // seconds * seconds for t in times}):
+                conn.execute(f"DELETE FROM {table} WHERE video_id = ? AND bucket = ?", (video_id, bucket))
+                conn.execute(
+                    f"""INSERT INTO {table}
+                    SELECT video_id, :bucket, COUNT(*), MIN(p), MAX(p), SUM(p), MIN(h), MAX(h), SUM(h)
+                    FROM (SELECT video_id, COALESCE(person_count, 0) AS p, COALESCE(head_count, 0) AS h FROM person
+                          WHERE video_id = :video_id
+                          AND CAST(strftime('%s', timestamp) AS INTEGER) BETWEEN :bucket AND :bucket + :seconds - 1)
+                    GROUP BY video_id""",
+                    {"video_id": video_id, "bucket": bucket, "seconds": seconds},
+                )
+    return deleted
+
+
+def _range_filter(start, end, video_id, bucket):
+    """Build the WHERE clause and parameters selecting rollup rows in [start, end), `start` floored to `bucket`."""
+    where, params = [], {}
+    if start is not None:
+        where.append("bucket >= :start")
+        params["start"] = int(start) // bucket * bucket
+    if end is not None:
+        where.append("bucket < :end")
+        params["end"] = int(end)
+    if video_id is not None:
+        where.append("video_id = :video_id")
+        params["video_id"] = video_id
+    return ("WHERE " + " AND ".join(where)) if where else "", params
+
+
+def query_rollup(conn, resolution="minute", bucket=None, start=None, end=None, video_id=None, limit=500, order="asc"):
+    """
+    Return time-bucketed min/avg/max person and head counts from a rollup table.
+
+    The query only touches rollup rows inside [start, end), so its cost depends on the requested range and `limit`,
+    not on the number of frames ever stored.
+
+    Args:
+        resolution (str): Rollup table to read, 'second' or 'minute'.
+        bucket (int, optional): Bucket size in seconds, a multiple of the resolution. Defaults to the resolution.
+        start (float, optional): Inclusive range start as UNIX time.
+        end (float, optional): Exclusive range end as UNIX time.
+        video_id (str, optional): Restrict to one video, otherwise buckets are aggregated over all videos.
+        limit (int): Maximum number of buckets returned.
+        order (str): 'asc' or 'desc' by bucket start.
+
+    Returns:
+        (tuple): List of bucket dicts and the `start` (asc) or `end` (desc) of the next page, None on the last page.
+    """
+    if resolution not in ROLLUPS:
+        raise ValueError(f"Invalid resolution '{resolution}', valid values are {list(ROLLUPS)}")
+    if order not in {"asc", "desc"}:
+        raise ValueError(f"Invalid order '{order}', valid values are ['asc', 'desc']")
+    table, seconds = ROLLUPS[resolution]
+    bucket = int(bucket or seconds)
+    if bucket <= 0 or bucket % seconds:
+        raise ValueError(f"bucket={bucket} must be a positive multiple of {seconds}s for resolution '{resolution}'")
+
+    where, params = _range_filter(start, end, video_id, bucket)
+    rows = conn.execute(
+        f"""SELECT bucket / :b * :b AS t, SUM(frames),
+                   MIN(person_min), SUM(person_sum) * 1.0 / SUM(frames), MAX(person_max),
+                   MIN(head_min), SUM(head_sum) * 1.0 / SUM(frames), MAX(head_max)
+            FROM {table} {where}
+            GROUP BY t ORDER BY t {order} LIMIT :limit""",
+        {**params, "b": bucket, "limit": int(limit) + 1},
+    ).fetchall()
+
+    cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        cursor = rows[-1][0] + bucket if order == "asc" else rows[-1][0]
+    keys = ("bucket", "frames", "person_min", "person_avg", "person_max", "head_min", "head_avg", "head_max")
+    return [dict(zip(keys, row)) for row in rows], cursor
+
+
+def query_summary(conn, start=None, end=None, video_id=None):
+    """Return frame count and min/avg/max person and head counts over [start, end) from the per-minute rollup."""
+    table, seconds = ROLLUPS["minute"]
+    where, params = _range_filter(start, end, video_id, seconds)
+    row = conn.execute(
+        f"""SELECT COALESCE(SUM(frames), 0),
+                   MIN(person_min), SUM(person_sum) * 1.0 / SUM(frames), MAX(person_max),
+                   MIN(head_min), SUM(head_sum) * 1.0 / SUM(frames), MAX(head_max)
+            FROM {table} {where}""",
+        params,
+    ).fetchone()
+    keys = ("frames", "person_min", "person_avg", "person_max", "head_min", "head_avg", "head_max")
+    return dict(zip(keys, row))
+
+
+class DetectionWriter:
+    """
+    Asynchronous, batched writer for per-frame detection counts.
+
+    Rows are queued by the pipeline threads and inserted by a single writer thread with `executemany` in one
+    transaction, either when `batch_size` rows are buffered or `flush_interval` seconds after the first buffered row,
+    whichever comes first. This replaces one INSERT and one commit (and fsync) per frame. The rollup tables are updated
+    in the same transaction, so they never disagree with the raw rows.
+
+    Attributes:
+        db_path (str): SQLite database path.
+        batch_size (int): Maximum number of rows per transaction.
+        flush_interval (float): Maximum time in seconds a row waits in the buffer.
+        rows_written (int): Total rows committed.
+    """
+
+    INSERT = (
+        "INSERT INTO person (person_count, head_count, frame_idx, video_id, timestamp, created_at) "
+        "VALUES (?, ?, ?, ?, DATETIME(?, 'unixepoch'), DATETIME(?, 'unixepoch', 'localtime'))"
+    )
+    POLL = 0.1  # seconds between liveness checks of the writer thread while a caller waits
+
+    def __init__(self, db_path=DB_PATH, batch_size=500, flush_interval=0.5, max_pending=10000):
+        """Initialize the writer and start its thread, `write` blocks once `max_pending` rows are waiting."""
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._error = None  # exception that stopped the writer thread
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="detection-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def write(self, person_count, head_count, frame_idx=None, video_id=None, ts=None):
+        """Queue one frame's counts, `ts` is a UNIX timestamp and defaults to now."""
+        self._put((person_count, head_count, frame_idx, video_id, ts or time.time()))
+
+    def flush(self, timeout=None):
+        """Block until every row queued before this call is committed, return False if `timeout` seconds passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        if not self._put(done, deadline):
+            return False
+        while not done.wait(self.POLL if deadline is None else min(max(deadline - time.monotonic(), 0), self.POLL)):
+            self._check_open()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        if self._error is not None:
+            raise RuntimeError(f"DetectionWriter thread stopped: {self._error}") from self._error
+        return True
+
+    def close(self):
+        """Flush all pending rows and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=self.POLL)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+
+    def _put(self, item, deadline=None):
+        """Queue `item` in bounded waits that raise if the writer thread stops, return False once `deadline` passed."""
+        while True:
+            self._check_open()
+            try:
+                self._queue.put(item, timeout=self.POLL)
+                return True
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+
+    def _check_open(self):
+        """Raise RuntimeError if the writer is closed or its thread stopped, nothing would drain the queue."""
+        if self._closed:
+            raise RuntimeError("DetectionWriter is closed")
+        if not self._thread.is_alive():
+            raise RuntimeError(f"DetectionWriter thread stopped: {self._error}") from self._error
+
+    def _run(self):
+        """Writer thread: collect rows into batches and commit them."""
+        try:
+            conn = setup_database(self.db_path)
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        rows, waiters, deadline = [], [], None
+        try:
+            while True:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ...  # flush interval elapsed
+
+                if isinstance(item, tuple):
+                    rows.append(item)
+                    deadline = deadline or time.monotonic() + self.flush_interval
+                    if len(rows) < self.batch_size:
+                        continue
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+
+                if rows:
+                    self._commit(conn, rows)
+                    rows, deadline = [], None
+                for event in waiters:
+                    event.set()
+                waiters.clear()
+                if item is None:
+                    return
+        except Exception as e:
+            self._error = e
+            LOGGER.warning(f"WARNING ⚠️ Detection writer stopped: {e}")
+        finally:
+            conn.close()
+            for event in waiters:  # do not leave flush() callers waiting on a dead thread
+                event.set()
+
+    def _commit(self, conn, rows):
+        """Insert `rows` in a single transaction."""
+        try:
+            with conn:
+                conn.executemany(self.INSERT, [(p, h, i, v, ts, ts) for p, h, i, v, ts in rows])
+                update_rollups(conn, rows)
+            self.rows_written += len(rows)
+        except sqlite3.Error as e:
+            LOGGER.warning(f"WARNING ⚠️ Failed to write {len(rows)} detection rows: {e}")
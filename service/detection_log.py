@@ -0,0 +1,326 @@
+"""Append-only columnar log of every tracked box, so analytics can be recomputed offline without reprocessing video."""
+
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from ultralytics.utils import LOGGER
+
+from .heatmaps import KEY_PATTERN
+from .pipeline import Stage
+
+# Column name -> dtype of a log chunk, `xyxy` has 4 values per row
+COLUMNS = {
+    "frame": np.int64,
+    "ts": np.float64,
+    "track_id": np.int32,
+    "cls": np.uint16,
+    "conf": np.float32,
+    "xyxy": np.float32,
+}
+
+
+class _Chunk:
+    """Rows of one video buffered by the log writer thread until they are written as a chunk."""
+
+    def __init__(self):
+        self.frames = []  # (frame index, timestamp, number of rows) per written frame
+        self.columns = {"track_id": [], "cls": [], "conf": [], "xyxy": []}
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def append(self, frame_idx, ts, xyxy, conf, cls, track_id):
+        """Buffer the boxes of one frame."""
+        n = len(xyxy)
+        self.frames.append((frame_idx, ts, n))
+        self.columns["xyxy"].append(np.asarray(xyxy, dtype=np.float32).reshape(n, 4))
+        self.columns["conf"].append(np.asarray(conf, dtype=np.float32))
+        self.columns["cls"].append(np.asarray(cls).astype(np.uint16))
+        track_id = np.full(n, -1) if track_id is None else track_id  # -1 marks untracked boxes
+        self.columns["track_id"].append(np.asarray(track_id, dtype=np.int32))
+        self.rows += n
+
+    def arrays(self):
+        """Return the buffered rows as one array per `COLUMNS` entry."""
+        index, ts, counts = (np.asarray(c) for c in zip(*self.frames))
+        arrays = {"frame": np.repeat(index, counts).astype(np.int64), "ts": np.repeat(ts, counts).astype(np.float64)}
+        for name, parts in self.columns.items():
+            arrays[name] = np.concatenate(parts).astype(COLUMNS[name], copy=False)
+        return arrays
+
+
+class DetectionLog:
+    """
+    Append-only log of every box (frame, timestamp, track ID, class, confidence, xyxy) in columnar numpy chunks.
+
+    Boxes are queued by the pipelines and buffered per video by a single writer thread, which writes a chunk once
+    `chunk_rows` rows are buffered or `flush_interval` seconds after its first row, whichever comes first. Writing a
+    frame is one queue put, so logging keeps up with any frame rate the detector reaches. Every chunk is an
+    uncompressed `.npz` of equal-length columns and is listed in a small SQLite index by video, frame range and time
+    range, so an analytics job reads exactly the chunks of a video and time window at disk speed.
+
+    Layout:
+        <root>/<video_id>/<first timestamp in us>_<first frame>.npz with the `COLUMNS` arrays, and <root>/index.db.
+
+    Attributes:
+        root (str): Log directory.
+        chunk_rows (int): Rows per chunk.
+        flush_interval (float): Maximum time in seconds a row is buffered before its chunk is written.
+        rows_written (int): Rows written to chunks.
+    """
+
+    def __init__(self, root, chunk_rows=65536, flush_interval=60.0, max_pending=10000):
+        """Initialize the log and start its writer thread, `write` blocks once `max_pending` frames are waiting."""
+        self.root = root
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self._error = None  # exception that stopped the writer thread
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="detection-log", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def write(self, video_id, frame_idx, xyxy, conf, cls, track_id=None, ts=None):
+        """Queue the boxes of one frame, `track_id` is None for untracked boxes and `ts` defaults to now."""
+        self._check_open()
+        self._folder(video_id)  # reject invalid IDs in the caller, not in the writer thread
+        self._queue.put(("rows", video_id, frame_idx, ts or time.time(), xyxy, conf, cls, track_id))
+
+    def flush(self, video_id=None, timeout=None):
+        """Write the buffered rows of `video_id` (all videos if None) as chunks and block until they are indexed."""
+        return self._request("flush", video_id, timeout=timeout)
+
+    def truncate(self, video_id, frame_idx, timeout=None):
+        """Delete the rows of `video_id` from frame `frame_idx` on, e.g. before a job resumes from a checkpoint."""
+        return self._request("truncate", video_id, frame_idx, timeout=timeout)
+
+    def close(self):
+        """Write all buffered rows and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def chunks(self, video_id, start=None, end=None):
+        """Return the index rows (path, frame_start, frame_end, t_start, t_end, rows) of `video_id` in [start, end)."""
+        where, params = ["video_id = :video_id"], {"video_id": video_id}
+        if start is not None:
+            where.append("t_end >= :start")
+            params["start"] = start
+        if end is not None:
+            where.append("t_start < :end")
+            params["end"] = end
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"""SELECT path, frame_start, frame_end, t_start, t_end, rows FROM chunks
+                WHERE {" AND ".join(where)} ORDER BY t_start, frame_start""",
+                params,
+            ).fetchall()
+        finally:
+            conn.close()
+        keys = ("path", "frame_start", "frame_end", "t_start", "t_end", "rows")
+        return [{**dict(zip(keys, row)), "path": os.path.join(self.root, row[0])} for row in rows]
+
+    def iter_chunks(self, video_id, start=None, end=None):
+        """Yield the rows of `video_id` with timestamps in [start, end) chunk by chunk, as dicts of column arrays."""
+        for chunk in self.chunks(video_id, start, end):
+            with np.load(chunk["path"]) as f:
+                arrays = {name: f[name] for name in COLUMNS}
+            if (start is not None and chunk["t_start"] < start) or (end is not None and chunk["t_end"] >= end):
+                keep = np.ones(len(arrays["ts"]), dtype=bool)
+                if start is not None:
+                    keep &= arrays["ts"] >= start
+                if end is not None:
+                    keep &= arrays["ts"] < end
+                arrays = {name: a[keep] for name, a in arrays.items()}
+            yield arrays
+
+    def read(self, video_id, start=None, end=None):
+        """Return all rows of `video_id` with timestamps in [start, end) as one dict of column arrays."""
+        parts = list(self.iter_chunks(video_id, start, end))
+        if not parts:
+            return {name: np.zeros((0, 4) if name == "xyxy" else 0, dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.concatenate([p[name] for p in parts]) for name in COLUMNS}
+
+    def _check_open(self):
+        """Raise RuntimeError if the log is closed or its thread stopped, nothing would drain the queue."""
+        if self._closed:
+            raise RuntimeError("DetectionLog is closed")
+        if not self._thread.is_alive():
+            raise RuntimeError(f"DetectionLog thread stopped: {self._error}")
+
+    def _request(self, *item, timeout=None):
+        """Queue a command for the writer thread and wait until it is done."""
+        self._check_open()
+        done = threading.Event()
+        self._queue.put((*item, done))
+        finished = done.wait(timeout)
+        if self._error is not None:
+            raise RuntimeError(f"DetectionLog thread stopped: {self._error}") from self._error
+        return finished
+
+    def _connect(self):
+        """Open the chunk index, created if needed."""
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.root, "index.db"))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS chunks (
+            video_id TEXT NOT NULL,
+            path TEXT NOT NULL,
+            frame_start INTEGER, frame_end INTEGER,
+            t_start REAL, t_end REAL,
+            rows INTEGER,
+            PRIMARY KEY (video_id, path)
+        )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS chunks_time ON chunks (video_id, t_start)")
+        return conn
+
+    def _folder(self, video_id):
+        """Return the chunk directory of `video_id`, rejecting IDs that are not plain names."""
+        if not KEY_PATTERN.match(str(video_id)):
+            raise ValueError(f"Invalid video ID '{video_id}'")
+        return os.path.join(self.root, str(video_id))
+
+    def _run(self):
+        """Writer thread: buffer rows per video and write them as chunks."""
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._error = e
+            return
+        finally:
+            self._ready.set()
+        buffers, done = {}, None
+        try:
+            while True:
+                deadline = min((b.started + self.flush_interval for b in buffers.values()), default=None)
+                try:
+                    item = self._queue.get(timeout=None if deadline is None else max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = ...  # flush interval of the oldest buffer elapsed
+
+                if item is None:
+                    for video_id in list(buffers):
+                        self._write_chunk(conn, video_id, buffers.pop(video_id))
+                    return
+                if item is ...:
+                    now = time.monotonic()
+                    for video_id in [v for v, b in buffers.items() if now - b.started >= self.flush_interval]:
+                        self._write_chunk(conn, video_id, buffers.pop(video_id))
+                elif item[0] == "rows":
+                    _, video_id, *row = item
+                    buffer = buffers.setdefault(video_id, _Chunk())
+                    buffer.append(*row)
+                    if buffer.rows >= self.chunk_rows:
+                        self._write_chunk(conn, video_id, buffers.pop(video_id))
+                elif item[0] == "flush":
+                    _, video_id, done = item
+                    for v in [video_id] if video_id is not None else list(buffers):
+                        if v in buffers:
+                            self._write_chunk(conn, v, buffers.pop(v))
+                    done.set()
+                else:  # truncate
+                    _, video_id, frame_idx, done = item
+                    buffers.pop(video_id, None)
+                    self._truncate(conn, video_id, frame_idx)
+                    done.set()
+        except Exception as e:
+            self._error = e
+            LOGGER.warning(f"WARNING ⚠️ Detection log stopped: {e}")
+        finally:
+            conn.close()
+            if done is not None:  # do not leave the caller of the failed command waiting
+                done.set()
+
+    def _write_chunk(self, conn, video_id, buffer):
+        """Write one buffered chunk atomically and add it to the index."""
+        if not buffer.rows:  # frames without boxes need no chunk
+            return
+        try:
+            arrays = buffer.arrays()
+            (frame_start, t_start, _), (frame_end, t_end, _) = buffer.frames[0], buffer.frames[-1]
+            folder = self._folder(video_id)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"{int(t_start * 1e6)}_{frame_start}.npz")
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:  # readers never see a partial chunk
+                np.savez(f, **arrays)
+            os.replace(tmp, path)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (video_id, os.path.relpath(path, self.root), frame_start, frame_end, t_start, t_end, buffer.rows),
+                )
+            self.rows_written += buffer.rows
+        except (OSError, sqlite3.Error) as e:
+            LOGGER.warning(f"WARNING ⚠️ Failed to write {buffer.rows} detection log rows of '{video_id}': {e}")
+
+    def _truncate(self, conn, video_id, frame_idx):
+        """Delete or shorten the chunks of `video_id` that hold frames from `frame_idx` on."""
+        try:
+            rows = conn.execute(
+                "SELECT path, frame_start FROM chunks WHERE video_id = ? AND frame_end >= ?", (video_id, frame_idx)
+            ).fetchall()
+            for relpath, frame_start in rows:
+                path = os.path.join(self.root, relpath)
+                with conn:
+                    if frame_start >= frame_idx or not os.path.exists(path):  # a lost chunk is dropped from the index
+                        conn.execute("DELETE FROM chunks WHERE video_id = ? AND path = ?", (video_id, relpath))
+                        if os.path.exists(path):
+                            os.remove(path)
+                        continue
+                    with np.load(path) as f:
+                        keep = f["frame"] < frame_idx
+                        arrays = {name: f[name][keep] for name in COLUMNS}
+                    np.savez(path[:-4] + ".tmp.npz", **arrays)
+                    os.replace(path[:-4] + ".tmp.npz", path)
+                    conn.execute(
+                        "UPDATE chunks SET frame_end = ?, t_end = ?, rows = ? WHERE video_id = ? AND path = ?",
+                        (frame_idx - 1, float(arrays["ts"].max(initial=0)), int(keep.sum()), video_id, relpath),
+                    )
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            LOGGER.warning(f"WARNING ⚠️ Failed to truncate the detection log of '{video_id}' at frame {frame_idx}: {e}")
+
+
+class DetectionLogStage(Stage):
+    """
+    Pipeline stage that writes every tracked box of a frame to a `DetectionLog`.
+
+    Attributes:
+        log (DetectionLog): Detection log.
+        video_id (str): Video or camera ID the boxes are logged under.
+    """
+
+    def __init__(self, log, video_id):
+        """Initialize the stage for one video."""
+        self.log = log
+        self.video_id = video_id
+
+    def process(self, packet):
+        """Queue the boxes of the frame."""
+        boxes = packet.results.boxes
+        track_id = boxes.id.cpu().numpy() if boxes.is_track else None
+        self.log.write(
+            self.video_id,
+            packet.index,
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy(),
+            track_id=track_id,
+        )
+
+    def close(self):
+        """Write the buffered rows of the video, so they can be read as soon as the video is done."""
+        self.log.flush(self.video_id)
@@ -0,0 +1,310 @@
+"""
+Torch-free detection with exported ONNX models for CPU-only edge boxes.
+
+Only NumPy, OpenCV and ONNX Runtime are imported, neither torch nor torchvision nor `ultralytics`, so a process that
+only detects starts in a fraction of the time and memory of `YOLO(...).predict`. Letterboxing, normalization, NMS and
+box scaling reproduce `DetectionPredictor` step by step, so `EdgeDetector` returns the same boxes as the ultralytics
+predictor on the same ONNX model.
+
+Usage:
+    $ python -m service.edge best.onnx video.mp4
+"""
+
+import ast
+import time
+
+import cv2
+import numpy as np
+
+
+def letterbox(image, new_shape=(640, 640), color=(114, 114, 114)):
+    """
+    Resize `image` keeping its aspect ratio and pad it to `new_shape` (height, width), as `LetterBox(auto=False)`.
+
+    Returns:
+        (np.ndarray): The resized and padded image.
+    """
+    shape = image.shape[:2]
+    r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+    new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+    dw, dh = (new_shape[1] - new_unpad[0]) / 2, (new_shape[0] - new_unpad[1]) / 2
+    if shape[::-1] != new_unpad:
+        image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+
+
+def xywh2xyxy(x):
+    """Convert (N, 4) center-xywh boxes to xyxy."""
+    y = np.empty_like(x)
+    dw, dh = x[..., 2] / 2, x[..., 3] / 2
+    y[..., 0], y[..., 1] = x[..., 0] - dw, x[..., 1] - dh
+    y[..., 2], y[..., 3] = x[..., 0] + dw, x[..., 1] + dh
+    return y
+
+
+def nms(boxes, scores, iou_thres, max_det=None):
+    """
+    Greedy NMS with the semantics of `torchvision.ops.nms`, stopping once `max_det` boxes are kept.
+
+    Returns:
+        (np.ndarray): Indices of the kept boxes, by decreasing score.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind="stable")  # ties keep their input order like the torchvision kernel
+    keep = []
+    while order.size and len(keep) != max_det:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.maximum(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0)
+        h = np.maximum(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter)
+        order = rest[iou.astype(np.float64) <= iou_thres]  # compared in float64 like the torchvision kernel
+    return np.asarray(keep, dtype=np.int64)
+
+
+def non_max_suppression(
+    prediction, conf_thres=0.25, iou_thres=0.45, classes=None, agnostic=False, max_det=300, max_nms=30000, max_wh=7680
+):
+    """
+    NumPy version of `ultralytics.utils.ops.non_max_suppression` for detect models, best class per box.
+
+    Args:
+        prediction (np.ndarray): (batch_size, 4 + nc, num_boxes) model output with xywh boxes.
+
+    Returns:
+        (List[np.ndarray]): (n, 6) float32 detections (x1, y1, x2, y2, conf, cls) per image.
+    """
+    output = []
+    for x in prediction.transpose(0, 2, 1):  # (num_boxes, 4 + nc)
+        scores = x[:, 4:]
+        j = scores.argmax(1)
+        conf = scores[np.arange(len(x)), j]
+        keep = conf > conf_thres
+        x = np.concatenate((xywh2xyxy(x[keep, :4]), conf[keep, None], j[keep, None].astype(np.float32)), 1)
+        if classes is not None:
+            x = x[(x[:, 5:6] == np.asarray(classes)).any(1)]
+        if len(x) > max_nms:  # excess boxes
+            x = x[np.argsort(-x[:, 4], kind="stable")[:max_nms]]
+        c = x[:, 5:6] * (0 if agnostic else max_wh)  # classes
+        output.append(x[nms(x[:, :4] + c, x[:, 4], iou_thres, max_det)])
+    return output
+
+
+def scale_boxes(img1_shape, boxes, img0_shape):
+    """Rescale xyxy `boxes` in place from the letterboxed `img1_shape` to the original `img0_shape` and clip them."""
+    gain = min(img1_shape[0] / img0_shape[0], img1_shape[1] / img0_shape[1])
+    pad = (
+        round((img1_shape[1] - img0_shape[1] * gain) / 2 - 0.1),
+        round((img1_shape[0] - img0_shape[0] * gain) / 2 - 0.1),
+    )
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, img0_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, img0_shape[0])
+    return boxes
+
+
+class EdgeBoxes:
+    """
+    NumPy detection boxes with the attributes of `ultralytics.engine.results.Boxes` used by the service.
+
+    `cpu` and `numpy` return the boxes themselves, so code written for ultralytics `Results`, e.g.
+    `results.boxes.cpu().numpy()` in `ClassCounter`, works unchanged.
+
+    Attributes:
+        data (np.ndarray): (n, 6) float32 detections (x1, y1, x2, y2, conf, cls).
+        orig_shape (tuple): Original image shape (height, width).
+    """
+
+    is_track = False
+    id = None
+
+    def __init__(self, data, orig_shape):
+        """Initialize the boxes from (n, 6) detections."""
+        self.data = data
+        self.orig_shape = orig_shape
+
+    def __len__(self):
+        """Return the number of boxes."""
+        return len(self.data)
+
+    def __getitem__(self, idx):
+        """Return the boxes at `idx`."""
+        return EdgeBoxes(self.data[idx], self.orig_shape)
+
+    def cpu(self):
+        """Return the boxes, they are always in host memory."""
+        return self
+
+    numpy = cpu
+
+    @property
+    def xyxy(self):
+        """(n, 4) boxes in xyxy pixels."""
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        """(n,) confidences."""
+        return self.data[:, -2]
+
+    @property
+    def cls(self):
+        """(n,) class IDs as floats."""
+        return self.data[:, -1]
+
+    @property
+    def xywh(self):
+        """(n, 4) boxes in center-xywh pixels."""
+        xy = (self.data[:, :2] + self.data[:, 2:4]) / 2
+        return np.concatenate((xy, self.data[:, 2:4] - self.data[:, :2]), 1)
+
+
+class EdgeResults:
+    """
+    Detections of one image, a NumPy counterpart of `ultralytics.engine.results.Results` for detect models.
+
+    Attributes:
+        orig_img (np.ndarray): Original BGR image.
+        orig_shape (tuple): Original image shape (height, width).
+        boxes (EdgeBoxes): Detected boxes.
+        names (dict): Class ID to name map of the model.
+        path (str): Image path or source name.
+        speed (dict): Milliseconds per image of 'preprocess', 'inference' and 'postprocess'.
+    """
+
+    def __init__(self, orig_img, path, names, boxes):
+        """Initialize the results of `orig_img` from (n, 6) detections."""
+        self.orig_img = orig_img
+        self.orig_shape = orig_img.shape[:2]
+        self.boxes = EdgeBoxes(boxes, self.orig_shape)
+        self.names = names
+        self.path = path
+        self.speed = {"preprocess": None, "inference": None, "postprocess": None}
+
+    def __len__(self):
+        """Return the number of detections."""
+        return len(self.boxes)
+
+    def counts(self):
+        """Return the number of detections per class name."""
+        ids, n = np.unique(self.boxes.cls.astype(int), return_counts=True)
+        return {self.names.get(i, str(i)): int(k) for i, k in zip(ids.tolist(), n.tolist())}
+
+
+class EdgeDetector:
+    """
+    Detect model exported to ONNX, run with ONNX Runtime and NumPy pre- and postprocessing only.
+
+    Class names and the input size are read from the metadata that `YOLO.export` writes into the ONNX file. Models
+    exported with a fixed batch size of 1 are run one image at a time, `dynamic=True` exports in a single batch.
+
+    Attributes:
+        weights (str): Path of the `.onnx` model.
+        names (dict): Class ID to name map.
+        imgsz (tuple): Input (height, width).
+        conf (float): Confidence threshold.
+        iou (float): NMS IoU threshold.
+        classes (list | None): Class IDs to keep, all if None.
+        agnostic_nms (bool): Class-agnostic NMS.
+        max_det (int): Maximum detections per image.
+    """
+
+    def __init__(self, weights, conf=0.25, iou=0.7, classes=None, agnostic_nms=False, max_det=300, threads=0):
+        """Load `weights` into a CPU ONNX Runtime session, `threads` 0 lets ONNX Runtime choose."""
+        import onnxruntime  # the only heavy dependency, kept next to its use like in AutoBackend
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.weights = str(weights)
+        self.session = onnxruntime.InferenceSession(
+            self.weights, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if metadata.get("task", "detect") != "detect":
+            raise ValueError(f"'{weights}' is a {metadata['task']} model, only detect models are supported")
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+        imgsz = ast.literal_eval(metadata.get("imgsz", "[640, 640]"))
+        self.imgsz = (imgsz, imgsz) if isinstance(imgsz, int) else tuple(imgsz)
+        self.conf = conf
+        self.iou = iou
+        self.classes = classes
+        self.agnostic_nms = agnostic_nms
+        self.max_det = max_det
+        inputs = self.session.get_inputs()[0]
+        self.input_name = inputs.name
+        self.dtype = np.float16 if inputs.type == "tensor(float16)" else np.float32
+        self.dynamic = not isinstance(inputs.shape[0], int)
+        self.output_name = self.session.get_outputs()[0].name
+
+    def preprocess(self, images):
+        """Letterbox BGR `images` and return the (n, 3, h, w) RGB 0-1 input batch."""
+        batch = np.stack([letterbox(im, self.imgsz) for im in images])
+        batch = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW
+        return (batch.astype(np.float32) / 255).astype(self.dtype, copy=False)
+
+    def inference(self, batch):
+        """Run the model on a preprocessed batch and return its (n, 4 + nc, num_boxes) float32 output."""
+        if self.dynamic:
+            return self.session.run([self.output_name], {self.input_name: batch})[0].astype(np.float32, copy=False)
+        outputs = [self.session.run([self.output_name], {self.input_name: im[None]})[0] for im in batch]
+        return np.concatenate(outputs).astype(np.float32, copy=False)
+
+    def postprocess(self, preds, batch, images, paths):
+        """Apply NMS, scale the boxes to the original images and return one `EdgeResults` per image."""
+        preds = non_max_suppression(
+            preds, self.conf, self.iou, classes=self.classes, agnostic=self.agnostic_nms, max_det=self.max_det
+        )
+        results = []
+        for pred, image, path in zip(preds, images, paths):
+            pred[:, :4] = scale_boxes(batch.shape[2:], pred[:, :4], image.shape)
+            results.append(EdgeResults(image, path=path, names=self.names, boxes=pred))
+        return results
+
+    def predict(self, source):
+        """Detect one BGR image or a list of them and return the list of `EdgeResults`."""
+        images = source if isinstance(source, (list, tuple)) else [source]
+        paths = [f"image{i}.jpg" for i in range(len(images))]
+        t0 = time.perf_counter()
+        batch = self.preprocess(images)
+        t1 = time.perf_counter()
+        preds = self.inference(batch)
+        t2 = time.perf_counter()
+        results = self.postprocess(preds, batch, images, paths)
+        t3 = time.perf_counter()
+        speed = {"preprocess": t1 - t0, "inference": t2 - t1, "postprocess": t3 - t2}
+        for r in results:
+            r.speed = {k: v * 1e3 / len(images) for k, v in speed.items()}
+        return results
+
+    __call__ = predict
+
+
+def main(weights, source, **kwargs):
+    """Count the detections per class in every frame of the video or image `source` and log the totals."""
+    t0 = time.perf_counter()
+    detector = EdgeDetector(weights, **kwargs)
+    cap = cv2.VideoCapture(source)
+    frames, totals = 0, {}
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        for name, n in detector(frame)[0].counts().items():
+            totals[name] = totals.get(name, 0) + n
+        frames += 1
+    cap.release()
+    elapsed = time.perf_counter() - t0
+    print(f"{frames} frames in {elapsed:.2f}s ({frames / max(elapsed, 1e-9):.1f} FPS), detections per class {totals}")
+    return totals
+
+
+if __name__ == "__main__":
+    import sys
+
+    main(*sys.argv[1:3])
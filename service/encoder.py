@@ -0,0 +1,211 @@
+"""Video encoding decoupled from inference: a bounded frame queue feeding a persistent ffmpeg subprocess."""
+
+import queue
+import shutil
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from ultralytics.utils import LOGGER
+
+from .hls import playlist_segments, resume_hls
+from .pipeline import Stage
+
+DROP_POLICIES = {"oldest", "newest", "block"}
+
+
+def ffmpeg_command(output, width, height, fps, params=None, ffmpeg="ffmpeg"):
+    """
+    Build an ffmpeg command line that reads raw BGR frames of the given size from stdin and encodes them to `output`.
+
+    Args:
+        output (str): Output file or playlist path.
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        fps (float): Input frame rate.
+        params (dict, optional): Output options, e.g. {'-vcodec': 'libx264', '-f': 'hls'}.
+        ffmpeg (str): ffmpeg executable.
+
+    Returns:
+        (list): Command line for `subprocess.Popen`.
+    """
+    cmd = [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-vcodec", "rawvideo", "-pix_fmt", "bgr24"]
+    cmd += ["-s", f"{width}x{height}", "-framerate", str(fps), "-i", "-"]
+    for key, value in (params or {}).items():
+        cmd += [key, str(value)]
+    return [*cmd, output]
+
+
+class FrameEncoder:
+    """
+    Persistent encoder subprocess fed raw frames through its stdin pipe by a dedicated writer thread.
+
+    `write` only enqueues the frame, so a slow encoder never stalls the caller; once `queue_size` frames are waiting
+    the drop policy applies: 'block' waits for room (lossless, the encoder then throttles the pipeline), 'oldest'
+    discards the oldest queued frame and 'newest' the incoming frame. Dropping suits live sources only, a file job
+    that drops frames produces a shorter output with the wrong timing. Frames are written to the pipe
+    from their own buffer without a `tobytes()` copy, so callers must not modify a frame after passing it in.
+
+    Attributes:
+        cmd (list): Encoder command line, raw frames are written to its stdin.
+        drop (str): Drop policy, one of `DROP_POLICIES`.
+        frames_written (int): Frames handed to the encoder.
+        frames_dropped (int): Frames discarded by the drop policy.
+        encode_time (float): Seconds the writer thread spent blocked on the pipe, i.e. waiting for the encoder.
+    """
+
+    def __init__(self, cmd, queue_size=32, drop="block"):
+        """Start the encoder process and its writer thread."""
+        if drop not in DROP_POLICIES:
+            raise ValueError(f"Invalid drop policy '{drop}', valid values are {sorted(DROP_POLICIES)}")
+        if shutil.which(cmd[0]) is None:
+            raise FileNotFoundError(f"Encoder executable '{cmd[0]}' not found")
+        self.cmd = cmd
+        self.drop = drop
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.encode_time = 0.0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._error = None
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self._thread = threading.Thread(target=self._run, name="frame-encoder", daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        """Queue a frame for encoding and return False if a frame was dropped to make room or the frame itself."""
+        if self._closed:
+            raise RuntimeError("FrameEncoder is closed")
+        if self._error:
+            raise RuntimeError(f"Encoder failed: {self._error}")
+        if self.drop == "block":
+            self._queue.put(frame)
+            return True
+        try:
+            self._queue.put_nowait(frame)
+            return True
+        except queue.Full:
+            pass
+        self.frames_dropped += 1
+        if self.drop == "newest":
+            return False
+        try:
+            self._queue.get_nowait()  # 'oldest': make room for the new frame
+        except queue.Empty:
+            pass
+        self._queue.put(frame)
+        return False
+
+    def close(self):
+        """Encode the queued frames, close the pipe and wait for the encoder to exit."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._process.wait()
+
+    def stats(self):
+        """Return written and dropped frame counts, queue depth and seconds spent waiting for the encoder."""
+        return {
+            "frames_written": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "queued": self._queue.qsize(),
+            "encode_s": self.encode_time,
+        }
+
+    def _run(self):
+        """Writer thread: move frames from the queue to the encoder's stdin."""
+        pipe = self._process.stdin
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                if self._error:
+                    continue  # keep draining so `write` never blocks on a dead encoder
+                t0 = time.perf_counter()
+                try:
+                    pipe.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+                except (BrokenPipeError, OSError) as e:
+                    self._error = str(e)
+                    LOGGER.warning(f"WARNING ⚠️ Encoder '{self.cmd[-1]}' stopped accepting frames: {e}")
+                    continue
+                self.encode_time += time.perf_counter() - t0
+                self.frames_written += 1
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+class EncoderStage(Stage):
+    """
+    Pipeline stage that encodes the frame an earlier stage stored in `packet.data[key]` with a `FrameEncoder`.
+
+    For HLS outputs the checkpoint state is the number of the next segment. A resumed job appends to the playlist from
+    that segment on, so the frames of the segment that was still being encoded at the checkpoint are missing from it.
+
+    Attributes:
+        key (str): `packet.data` key of the frame to encode.
+        output (str): Output file or playlist path.
+        params (callable): Called with the `VideoInfo` and returns the ffmpeg output options.
+        queue_size (int): Frames buffered before the drop policy applies.
+        drop (str): Drop policy of the encoder.
+    """
+
+    def __init__(self, key, output, params, queue_size=32, drop="block", ffmpeg="ffmpeg"):
+        """Initialize the stage, the encoder is started by `open` once the frame size is known."""
+        self.key = key
+        self.output = output
+        self.params = params
+        self.queue_size = queue_size
+        self.drop = drop
+        self.ffmpeg = ffmpeg
+        self.encoder = None
+        self.resume = None  # first segment number of a resumed HLS output
+
+    @property
+    def name(self):
+        """Stage name used in pipeline timings."""
+        return f"encode:{self.key}"
+
+    def open(self, info):
+        """Start the encoder for the frame size and rate of the video."""
+        params = self.params(info)
+        if self.resume is not None:
+            params = resume_hls(self.output, self.resume, params)
+        cmd = ffmpeg_command(self.output, info.width, info.height, info.fps, params, ffmpeg=self.ffmpeg)
+        self.encoder = FrameEncoder(cmd, queue_size=self.queue_size, drop=self.drop)
+
+    def process(self, packet):
+        """Queue the frame for encoding."""
+        self.encoder.write(packet.data[self.key])
+
+    def close(self):
+        """Flush and stop the encoder."""
+        if self.encoder is not None:
+            self.encoder.close()
+            s = self.encoder.stats()
+            LOGGER.info(
+                f"Encoded {s['frames_written']} frames to {self.output} ({s['frames_dropped']} dropped), "
+                f"{s['encode_s'] * 1e3 / max(s['frames_written'], 1):.2f} ms/frame waiting for the encoder"
+            )
+
+    def stats(self):
+        """Return the encoder statistics."""
+        return self.encoder.stats() if self.encoder else {}
+
+    def state(self):
+        """Return the number of the next HLS segment, None for other outputs."""
+        if not self.output.endswith(".m3u8"):
+            return None
+        segments = playlist_segments(self.output)
+        return {"segment": max(segments) + 1 if segments else 0}
+
+    def restore(self, state):
+        """Make `open` start an encoder that appends to the playlist from the checkpointed segment on."""
+        self.resume = state["segment"]
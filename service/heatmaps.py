@@ -0,0 +1,266 @@
+"""Per-frame heatmap overlays, periodic compressed snapshots and heatmaps summed over arbitrary time windows."""
+
+import os
+import re
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from ultralytics.solutions.heatmap import Heatmap, HeatmapAccumulator
+from ultralytics.utils import LOGGER
+
+from .pipeline import Stage
+
+KEY_PATTERN = re.compile(r"^[\w.-]+$")  # keys become directory names
+
+
+class HeatmapStore:
+    """
+    Directory of heatmap snapshots: one compressed `.npz` file per key (video or camera) and time bucket.
+
+    Each snapshot holds the cumulative, undecayed heat of one bucket on the accumulator's coarse grid, so a heatmap of
+    any time window is the sum of the snapshots in it and never needs the video to be processed again. File names are
+    the bucket start as UNIX seconds, so queries select snapshots from the directory listing without opening files.
+
+    Layout:
+        <root>/<key>/<bucket start>.npz with arrays `heat`, `shape` (frame height, width), `grid`, `frames`, `end`.
+
+    Attributes:
+        root (str): Store directory.
+    """
+
+    def __init__(self, root):
+        """Initialize the store in `root`, created on the first save."""
+        self.root = root
+
+    def save(self, key, start, end, heat, shape, grid, frames):
+        """
+        Write one snapshot atomically and return its path.
+
+        Args:
+            key (str): Video or camera ID.
+            start (int): Bucket start as UNIX seconds.
+            end (float): UNIX time of the last frame in the bucket.
+            heat (np.ndarray): Accumulated heat grid of the bucket.
+            shape (tuple): Frame (height, width) the grid covers.
+            grid (int): Grid cell size in pixels.
+            frames (int): Frames accumulated into the snapshot.
+
+        Returns:
+            (str): Path of the snapshot file.
+        """
+        folder = self._folder(key)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{int(start)}.npz")
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:  # readers never see a partial snapshot
+            heat = heat.astype(np.float32, copy=False)
+            np.savez_compressed(f, heat=heat, shape=np.asarray(shape[:2]), grid=grid, frames=frames, end=end)
+        os.replace(tmp, path)
+        return path
+
+    def keys(self):
+        """Return the sorted keys that have snapshots."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(e.name for e in os.scandir(self.root) if e.is_dir())
+
+    def snapshots(self, key, start=None, end=None):
+        """Return the sorted bucket starts of `key` in [start, end), both UNIX seconds and optional."""
+        folder = self._folder(key)
+        if not os.path.isdir(folder):
+            return []
+        buckets = sorted(int(name[:-4]) for name in os.listdir(folder) if name.endswith(".npz") and name[:-4].isdigit())
+        return [b for b in buckets if (start is None or b >= start) and (end is None or b < end)]
+
+    def query(self, key, start=None, end=None):
+        """
+        Sum the snapshots of `key` whose bucket starts in [start, end).
+
+        Args:
+            key (str): Video or camera ID.
+            start (float, optional): Window start as UNIX seconds, open if None.
+            end (float, optional): Window end as UNIX seconds, open if None.
+
+        Returns:
+            heat (np.ndarray | None): Summed heat grid, None if there is no snapshot in the window.
+            meta (dict): 'shape', 'grid', 'frames', 'snapshots' and the covered 'start' and 'end'.
+        """
+        heat, meta = None, {"shape": None, "grid": None, "frames": 0, "snapshots": 0, "start": None, "end": None}
+        for bucket in self.snapshots(key, start, end):
+            with np.load(os.path.join(self._folder(key), f"{bucket}.npz")) as snapshot:
+                shape, grid = tuple(int(s) for s in snapshot["shape"]), int(snapshot["grid"])
+                if heat is None:
+                    heat = snapshot["heat"].astype(np.float32)
+                    meta.update(shape=shape, grid=grid, start=bucket)
+                elif (shape, grid) != (meta["shape"], meta["grid"]):
+                    raise ValueError(
+                        f"Snapshot {bucket} of '{key}' has shape {shape} and grid {grid}, "
+                        f"expected {meta['shape']} and {meta['grid']}"
+                    )
+                else:
+                    heat += snapshot["heat"]
+                meta["frames"] += int(snapshot["frames"])
+                meta["snapshots"] += 1
+                meta["end"] = float(snapshot["end"])
+        return heat, meta
+
+    def discard(self, key, start=None):
+        """Delete the snapshots of `key` whose bucket starts at or after `start`, all of them if None."""
+        for bucket in self.snapshots(key, start):
+            os.remove(os.path.join(self._folder(key), f"{bucket}.npz"))
+
+    def render(self, key, start=None, end=None, colormap=cv2.COLORMAP_JET):
+        """Return the BGR image of the heatmap of `key` in [start, end), None if there is no snapshot in the window."""
+        heat, meta = self.query(key, start, end)
+        if heat is None:
+            return None
+        return HeatmapAccumulator(meta["shape"], grid=meta["grid"]).render(colormap, heat=heat)
+
+    def _folder(self, key):
+        """Return the directory of `key`, rejecting keys that are not plain names."""
+        if not KEY_PATTERN.match(str(key)):
+            raise ValueError(f"Invalid heatmap key '{key}'")
+        return os.path.join(self.root, str(key))
+
+
+class HeatmapSnapshotStage(Stage):
+    """
+    Pipeline stage that accumulates an undecayed coarse-grid heatmap and saves it to a `HeatmapStore` per time bucket.
+
+    Buckets are aligned to multiples of `interval` seconds of the wall clock, like the per-minute count rollups, so
+    heatmaps and counts of the same window line up. A snapshot is written when a frame falls into the next bucket and
+    for the last, partial bucket when the pipeline closes.
+
+    Attributes:
+        store (HeatmapStore): Snapshot store.
+        key (str): Video or camera ID the snapshots are saved under.
+        interval (int): Bucket length in seconds.
+        grid (int): Grid cell size in pixels.
+        kernel (str): Accumulator kernel, 'circle', 'gaussian' or 'rect'.
+        snapshots (int): Snapshots written so far.
+    """
+
+    def __init__(self, store, key, interval=60, grid=8, kernel="circle", clock=time.time):
+        """Initialize the stage, the accumulator is created by `open` once the frame size is known."""
+        if int(interval) < 1:
+            raise ValueError(f"Invalid snapshot interval {interval}, must be at least 1 second")
+        self.store = store
+        self.key = key
+        self.interval = int(interval)
+        self.grid = grid
+        self.kernel = kernel
+        self.clock = clock
+        self.snapshots = 0
+        self.accumulator = None
+        self._bucket = None
+        self._frames = 0
+        self._last = None
+
+    def open(self, info):
+        """Create the accumulator for the frame size of the video, unless a checkpoint restored it."""
+        if self.accumulator is None:
+            shape = (info.height, info.width)
+            self.accumulator = HeatmapAccumulator(shape, kernel=self.kernel, decay=1, grid=self.grid)
+
+    def process(self, packet):
+        """Add the boxes of the frame, saving the previous bucket first when a new one starts."""
+        now = self.clock()
+        bucket = int(now // self.interval * self.interval)
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+        self.accumulator.add(packet.results.boxes.xyxy.cpu().numpy())
+        self._frames += 1
+        self._last = now
+
+    def flush(self):
+        """Save the current bucket if it has frames and start an empty one."""
+        if not self._frames:
+            return
+        acc = self.accumulator
+        self.store.save(self.key, self._bucket, self._last, acc.heat, acc.shape, acc.grid, self._frames)
+        self.accumulator.heat[:] = 0
+        self._frames = 0
+        self.snapshots += 1
+
+    def close(self):
+        """Save the last, partial bucket."""
+        if self.accumulator is not None:
+            self.flush()
+            LOGGER.info(f"Saved {self.snapshots} heatmap snapshots of '{self.key}' to {self.store.root}")
+
+    def stats(self):
+        """Return the number of snapshots written."""
+        return {"snapshots": self.snapshots}
+
+    def state(self):
+        """Return the accumulator and bucket of the unsaved, partial bucket."""
+        return {
+            "accumulator": self.accumulator,
+            "bucket": self._bucket,
+            "frames": self._frames,
+            "last": self._last,
+            "snapshots": self.snapshots,
+        }
+
+    def restore(self, state):
+        """Continue the checkpointed partial bucket and delete the snapshots saved after the checkpoint."""
+        self.accumulator = state["accumulator"]
+        self._bucket, self._frames, self._last = state["bucket"], state["frames"], state["last"]
+        self.snapshots = state["snapshots"]
+        # Later buckets hold frames that are processed again, the partial bucket itself is overwritten by `flush`
+        self.store.discard(self.key, None if self._bucket is None else self._bucket + 1)
+
+
+class HeatmapOverlayStage(Stage):
+    """
+    Pipeline stage that stores the decaying heatmap overlay of every frame in `packet.data['heatmap']` and writes the
+    cumulative heatmap of the whole video to `final_heatmap.png` when it closes.
+
+    Attributes:
+        output_folder (str): Directory of `final_heatmap.png`.
+        names (dict): Class names of the model.
+        decay (float): Per-frame decay of the overlay heatmap.
+        grid (int): Grid cell size in pixels of both heatmaps.
+    """
+
+    def __init__(self, output_folder, names, decay=0.99, grid=8):
+        """Initialize the stage, the heatmaps are created by `open` once the frame size is known."""
+        self.output_folder = output_folder
+        self.names = names
+        self.decay = decay
+        self.grid = grid
+        self.heatmap = None
+        self.total = None
+        self.restored = None
+
+    def open(self, info):
+        """Create the overlay heatmap and the cumulative accumulator, continuing a restored checkpoint."""
+        os.makedirs(self.output_folder, exist_ok=True)
+        self.heatmap = Heatmap(names=self.names, decay_factor=self.decay, grid=self.grid)
+        # Cumulative (undecayed) heat for the final PNG, on the same coarse grid
+        self.total = HeatmapAccumulator((info.height, info.width), decay=1, grid=self.grid)
+        if self.restored:
+            self.heatmap.accumulator, self.total = self.restored["decayed"], self.restored["total"]
+            self.heatmap.initialized = True  # otherwise the first frame replaces the restored accumulator
+
+    def process(self, packet):
+        """Render the overlay of the frame and add its boxes to the cumulative heatmap."""
+        packet.data["heatmap"] = self.heatmap.generate_heatmap(packet.image, [packet.results])
+        self.total.add(packet.results.boxes.xyxy.cpu().numpy())
+
+    def close(self):
+        """Write the cumulative heatmap, upsampled and colormapped once at the end of the job."""
+        if self.total is not None:
+            cv2.imwrite(os.path.join(self.output_folder, "final_heatmap.png"), self.total.render(cv2.COLORMAP_JET))
+
+    def state(self):
+        """Return the decayed and the cumulative accumulator."""
+        return {"decayed": self.heatmap.accumulator, "total": self.total}
+
+    def restore(self, state):
+        """Continue both heatmaps from a checkpoint when the stage opens."""
+        self.restored = state
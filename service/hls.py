@@ -0,0 +1,122 @@
+"""HLS output options and per-job output directories for live streams of processed videos."""
+
+import os
+import re
+import shutil
+
+# MIME types of playlist and segment files served to players
+MIMETYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+
+SEGMENT_PATTERN = re.compile(r"segment_(\d+)\.(?:ts|m4s)")  # names written by `hls_params`
+
+
+def hls_params(output_folder, fps, vcodec="libx264", segment_time=2.0, list_size=6, low_latency=False):
+    """
+    Return ffmpeg output options for an HLS stream in `output_folder`.
+
+    With `list_size > 0` the playlist is a rolling live window of the last `list_size` segments and older segments are
+    deleted from disk; `list_size=0` keeps every segment (VOD-style playlist). Low-latency mode uses short fMP4
+    segments so players can start and stay closer to the live edge. ffmpeg's HLS muxer does not write LL-HLS partial
+    segments (EXT-X-PART), so this is the nearest low-latency setup it supports.
+
+    Args:
+        output_folder (str): Directory of the playlist and its segments.
+        fps (int): Frame rate of the encoded video.
+        vcodec (str): Video encoder, e.g. 'libx264' or a hardware encoder such as 'h264_nvenc'.
+        segment_time (float): Target segment duration in seconds.
+        list_size (int): Segments kept in the playlist and on disk, 0 keeps all.
+        low_latency (bool): Use sub-second fMP4 segments.
+
+    Returns:
+        (dict): ffmpeg output options.
+    """
+    if low_latency:
+        segment_time = min(segment_time, 0.5)
+    gop = max(round(fps * segment_time), 1)  # a keyframe starts every segment, so segments are cut on time
+    params = {"-vcodec": vcodec, "-pix_fmt": "yuv420p", "-g": gop, "-keyint_min": gop}
+    if vcodec == "libx264":
+        params.update({"-preset": "ultrafast", "-tune": "zerolatency", "-sc_threshold": 0})
+
+    flags = ["independent_segments", "temp_file"]  # temp_file: players never read a half-written playlist
+    if list_size:
+        flags.append("delete_segments")
+    params.update({"-f": "hls", "-hls_time": segment_time, "-hls_list_size": list_size})
+    if low_latency:
+        flags.append("program_date_time")
+        params.update({"-hls_segment_type": "fmp4", "-hls_fmp4_init_filename": "init.mp4"})
+        segment = "segment_%05d.m4s"
+    else:
+        segment = "segment_%05d.ts"
+    params.update({"-hls_flags": "+".join(flags), "-hls_segment_filename": os.path.join(output_folder, segment)})
+    return params
+
+
+def playlist_segments(playlist):
+    """Return the segment numbers listed in `playlist` in order, an empty list if it does not exist yet."""
+    if not os.path.isfile(playlist):
+        return []
+    with open(playlist) as f:
+        return [int(m.group(1)) for line in f if (m := SEGMENT_PATTERN.search(line)) and not line.startswith("#")]
+
+
+def resume_hls(playlist, segment, params):
+    """
+    Prepare `playlist` to continue with `segment` and return ffmpeg output options that append to it.
+
+    Segments from `segment` on were written after the checkpoint the job resumes from, so they are removed from the
+    playlist together with their tags and an end-of-list tag; the new encoder appends its segments after an
+    EXT-X-DISCONTINUITY and numbers them from `segment`, overwriting the stale segment files.
+
+    Args:
+        playlist (str): Playlist path.
+        segment (int): Number of the first segment the resumed job writes.
+        params (dict): ffmpeg output options from `hls_params`.
+
+    Returns:
+        (dict): `params` with the append options added.
+    """
+    if os.path.isfile(playlist):
+        with open(playlist) as f:
+            lines = f.read().splitlines()
+        kept, pending, body = [], [], False
+        for line in lines:
+            if line.startswith("#EXT-X-ENDLIST"):
+                continue
+            body = body or line.startswith(("#EXTINF", "#EXT-X-DISCONTINUITY"))
+            if not body:
+                kept.append(line)  # playlist header
+                continue
+            pending.append(line)  # segment tags up to and including the segment URI
+            if not line.startswith("#") and line.strip():
+                m = SEGMENT_PATTERN.search(line)
+                if m is None or int(m.group(1)) < segment:
+                    kept.extend(pending)
+                pending = []
+        tmp = f"{playlist}.tmp"
+        with open(tmp, "w") as f:
+            f.write("\n".join(kept) + "\n")
+        os.replace(tmp, playlist)
+    flags = [f for f in params.get("-hls_flags", "").split("+") if f]
+    return {**params, "-hls_flags": "+".join([*flags, "append_list", "discont_start"]), "-start_number": segment}
+
+
+def prune_job_dirs(root, keep, active=()):
+    """
+    Delete all but the `keep` most recently modified job directories in `root`, return the number deleted.
+
+    Directories named in `active` (job IDs that are queued, running or waiting to resume) are never deleted and do not
+    count towards `keep`.
+    """
+    if not os.path.isdir(root):
+        return 0
+    active = set(active)
+    dirs = [e for e in os.scandir(root) if e.is_dir() and e.name not in active]
+    dirs.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in dirs[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return max(len(dirs) - keep, 0)
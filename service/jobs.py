@@ -0,0 +1,176 @@
+"""Bounded job queue and worker pool for uploaded videos."""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from ultralytics.utils import LOGGER
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class QueueFullError(Exception):
+    """Raised by `JobScheduler.submit` when the queue is at capacity, mapped to HTTP 429 by the service."""
+
+
+class Job:
+    """
+    A single video processing job.
+
+    Attributes:
+        id (str): Unique job ID returned to the client.
+        video_path (str): Path of the uploaded video.
+        status (str): One of 'queued', 'running', 'done', 'failed' or 'cancelled'.
+        frames_done (int): Frames processed so far.
+        frames_total (int): Frames in the video, 0 until the video is opened or if unknown.
+        error (str | None): Error message of a failed job.
+        stats (dict): Per-stage timings and stage statistics reported by the handler.
+        cancel_event (threading.Event): Set to request cancellation.
+    """
+
+    def __init__(self, video_path, job_id=None):
+        """Initialize a queued job for `video_path`, with a new ID unless `job_id` is given (e.g. a resumed job)."""
+        self.id = job_id or uuid.uuid4().hex
+        self.video_path = video_path
+        self.status = QUEUED
+        self.frames_done = 0
+        self.frames_total = 0
+        self.error = None
+        self.stats = {}
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        """Whether the job reached a final state."""
+        return self.status in {DONE, FAILED, CANCELLED}
+
+    def progress(self):
+        """Return the progress of the job as a JSON-serializable dict."""
+        percent = round(100 * self.frames_done / self.frames_total, 1) if self.frames_total else None
+        if self.status == DONE:
+            percent = 100.0
+        return {"frames_done": self.frames_done, "frames_total": self.frames_total, "percent": percent}
+
+    def to_dict(self):
+        """Return the status of the job as a JSON-serializable dict."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": self.progress(),
+            "error": self.error,
+            "stats": self.stats,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobScheduler:
+    """
+    Fixed pool of worker threads consuming a bounded FIFO of jobs.
+
+    Uploads are admitted only while the queue has room, so a burst of requests is answered with backpressure instead
+    of spawning one thread per upload that all compete for the GIL and the model.
+
+    Attributes:
+        handler (callable): Called as `handler(job)` on a worker thread, processes the job and updates its progress.
+        workers (int): Number of worker threads.
+        history (int): Number of finished jobs kept for status queries.
+    """
+
+    def __init__(self, handler, workers=2, queue_size=8, history=100):
+        """Initialize the scheduler and start `workers` daemon worker threads."""
+        self.handler = handler
+        self.workers = max(int(workers), 1)
+        self.history = history
+        self.jobs = OrderedDict()  # job_id -> Job, insertion ordered for pruning
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, video_path, job_id=None):
+        """Queue a job for `video_path` and return it, raise `QueueFullError` if the queue is at capacity."""
+        job = Job(video_path, job_id=job_id)
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"Job queue is full ({self._queue.maxsize} jobs waiting)") from None
+            self.jobs[job.id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id):
+        """Return the job with `job_id` or None."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def active(self):
+        """Return the IDs of the queued and running jobs."""
+        with self._lock:
+            return [job_id for job_id, job in self.jobs.items() if not job.finished]
+
+    def cancel(self, job_id):
+        """Request cancellation of a job, return the job or None if it does not exist."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                job.status, job.finished_at = CANCELLED, time.time()
+            job.cancel_event.set()
+        return job
+
+    def stats(self):
+        """Return queue depth and capacity and the number of jobs per status."""
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self._queue.qsize(), "capacity": self._queue.maxsize, **counts}
+
+    def shutdown(self, cancel=True):
+        """Stop the workers, optionally cancelling queued and running jobs first."""
+        if cancel:
+            for job_id in list(self.jobs):
+                self.cancel(job_id)
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=5)
+
+    def _worker(self):
+        """Worker loop, runs jobs until a None sentinel is received."""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                with self._lock:
+                    if job.status != QUEUED:  # cancelled while waiting
+                        continue
+                    job.status, job.started_at = RUNNING, time.time()
+                try:
+                    self.handler(job)
+                    job.status = CANCELLED if job.cancel_event.is_set() else DONE
+                except Exception as e:
+                    LOGGER.warning(f"WARNING ⚠️ Job {job.id} failed: {e}")
+                    job.status, job.error = FAILED, str(e)
+                job.finished_at = time.time()
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond `history`, must be called with the lock held."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - self.history, 0)]:
+            del self.jobs[job_id]
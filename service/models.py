@@ -0,0 +1,187 @@
+"""Process-wide registry of lazily loaded, warmed-up detection models shared by all pipelines."""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ultralytics import YOLO
+from ultralytics.utils import LOGGER
+
+from .cache import file_hash
+
+# Predict arguments that need the full `YOLO.predict` path (logging, saving, display), see `ModelHandle.predict`
+FULL_PREDICT_ARGS = ("verbose", "save", "save_txt", "save_crop", "show", "visualize", "embed")
+
+# Backend name -> export format of the `.pt` weights, the exported model is loaded through AutoBackend
+BACKENDS = {
+    "pytorch": None,
+    "onnx": "onnx",
+    "openvino": "openvino",
+}
+
+
+class ModelHandle:
+    """
+    Thread-safe handle to one model, loaded and warmed up on first use.
+
+    All pipelines and stages share the handle instead of constructing their own `YOLO` object. Inference is serialized
+    with a lock, which also covers the first call that creates the predictor and is not thread-safe in `Model`.
+
+    Attributes:
+        weights (str): Path of the `.pt` weights or of an already exported model.
+        backend (str): One of `BACKENDS`, `.pt` weights are exported once and the export is reused afterwards.
+        device (str | None): Inference device passed to every predict call, e.g. 'cpu' or 'cuda:0'.
+        imgsz (int): Inference and warmup image size.
+        state (str): 'unloaded', 'loading', 'ready' or 'failed'.
+        load_time (float | None): Seconds spent loading (and exporting) the model.
+        warmup_time (float | None): Seconds spent on the warmup inference.
+        error (str | None): Last load error.
+    """
+
+    def __init__(self, weights, backend="pytorch", device=None, imgsz=640, task=None):
+        """Initialize the handle without loading anything."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}', valid values are {list(BACKENDS)}")
+        self.weights = str(weights)
+        self.backend = backend
+        self.device = device
+        self.imgsz = imgsz
+        self.task = task
+        self.state = "unloaded"
+        self.load_time = None
+        self.warmup_time = None
+        self.error = None
+        self._model = None
+        self._fingerprint = None
+        self._frame_args = None  # predict arguments the predictor is set up with, if frames may use infer_batch
+        self._lock = threading.RLock()
+
+    def load(self):
+        """Load and warm up the model if needed and return the underlying `YOLO` object."""
+        with self._lock:
+            if self._model is not None:
+                return self._model
+            self.state, self.error = "loading", None
+            try:
+                t0 = time.perf_counter()
+                model = YOLO(self._resolve(), task=self.task)
+                t1 = time.perf_counter()
+                # First predict builds the predictor and its AutoBackend on `device` and runs AutoBackend.warmup()
+                image = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+                model.predict(image, **self._predict_args(verbose=False))
+                t2 = time.perf_counter()
+            except Exception as e:
+                self.state, self.error = "failed", str(e)
+                raise
+            self._model, self.state = model, "ready"
+            self.load_time, self.warmup_time = t1 - t0, t2 - t1
+            LOGGER.info(
+                f"Loaded {self.weights} ({self.backend}, device={self.device or 'auto'}) in {self.load_time:.2f}s, "
+                f"warmup {self.warmup_time:.2f}s"
+            )
+            return model
+
+    @property
+    def names(self):
+        """Class names of the model, loads the model if needed."""
+        return self.load().names
+
+    @property
+    def fingerprint(self):
+        """SHA-256 of the weights content, backend and image size, the detection cache key of the model."""
+        if self._fingerprint is None:
+            weights = file_hash(self.weights) if Path(self.weights).is_file() else self.weights
+            self._fingerprint = hashlib.sha256(f"{weights}:{self.backend}:{self.imgsz}".encode()).hexdigest()
+        return self._fingerprint
+
+    def predict(self, source, **kwargs):
+        """
+        Run `YOLO.predict` on `source` under the handle lock and return the list of `Results`.
+
+        A frame or a list of frames predicted with the same arguments as the previous call goes through
+        `predictor.infer_batch`, which skips the per-call argument, source and profiler setup of `YOLO.predict` and
+        returns the same results.
+        """
+        model = self.load()
+        args = self._predict_args(**kwargs)
+        with self._lock:
+            if args == self._frame_args:
+                if isinstance(source, np.ndarray):
+                    return model.predictor.infer_batch([source])
+                if isinstance(source, list) and source and all(isinstance(x, np.ndarray) for x in source):
+                    return model.predictor.infer_batch(source)
+            results = model.predict(source, **args)
+            full = any(getattr(model.predictor.args, k, False) for k in FULL_PREDICT_ARGS)
+            self._frame_args = None if full else args
+            return results
+
+    __call__ = predict
+
+    def status(self):
+        """Return a JSON-serializable status dict for the health endpoint."""
+        return {
+            "weights": self.weights,
+            "backend": self.backend,
+            "device": self.device,
+            "state": self.state,
+            "load_time": self.load_time,
+            "warmup_time": self.warmup_time,
+            "warmed_up": self.warmup_time is not None,
+            "error": self.error,
+        }
+
+    def _predict_args(self, **kwargs):
+        """Merge the handle's device and image size into predict keyword arguments."""
+        return {"device": self.device, "imgsz": self.imgsz, **kwargs}
+
+    def _resolve(self):
+        """Return the model file to load for the configured backend, exporting `.pt` weights once if needed."""
+        path = Path(self.weights)
+        fmt = BACKENDS[self.backend]
+        if fmt is None or path.suffix != ".pt":
+            return str(path)
+        # Exports have a fixed input size, so the size is part of the name and every size is exported once
+        name = f"{path.stem}_{self.imgsz}.onnx" if fmt == "onnx" else f"{path.stem}_{self.imgsz}_{fmt}_model"
+        target = path.with_name(name)
+        if not target.exists():
+            LOGGER.info(f"Exporting {path} to {fmt} at imgsz={self.imgsz} for the '{self.backend}' backend...")
+            exported = YOLO(str(path)).export(format=fmt, imgsz=self.imgsz, device=self.device)
+            os.replace(exported, target)
+        return str(target)
+
+
+class ModelRegistry:
+    """
+    One `ModelHandle` per (weights, backend, device, imgsz), so each model is loaded and warmed up once per process.
+
+    Attributes:
+        backend (str): Default backend for `get`.
+        device (str | None): Default device for `get`.
+        imgsz (int): Default inference image size for `get`.
+    """
+
+    def __init__(self, backend="pytorch", device=None, imgsz=640):
+        """Initialize an empty registry with default backend, device and image size."""
+        self.backend = backend
+        self.device = device
+        self.imgsz = imgsz
+        self._handles = {}
+        self._lock = threading.Lock()
+
+    def get(self, weights, backend=None, device=None, imgsz=None, task=None):
+        """Return the shared handle for `weights`, created on first request and loaded on first use."""
+        key = (str(weights), backend or self.backend, device or self.device, imgsz or self.imgsz)
+        with self._lock:
+            if key not in self._handles:
+                self._handles[key] = ModelHandle(*key, task=task)
+            return self._handles[key]
+
+    def status(self):
+        """Return the status of every registered model."""
+        with self._lock:
+            handles = list(self._handles.values())
+        return [h.status() for h in handles]
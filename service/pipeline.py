@@ -0,0 +1,262 @@
+"""
+Single-pass frame pipeline.
+
+Every uploaded video is decoded once and tracked once with its own tracker; the resulting `Results` object is handed
+to a list of stages (counting, persistence, annotation/HLS, heatmap, ...) in order, so adding an output never costs
+another decode or another forward pass.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+
+import cv2
+
+from ultralytics.data.loaders import SharedMemoryDecoder
+from ultralytics.utils import LOGGER
+
+from .tracking import FrameTracker, InferenceCadence
+
+
+@dataclass
+class VideoInfo:
+    """Properties of the source video, passed to every stage before the first frame."""
+
+    path: str
+    width: int
+    height: int
+    fps: int
+    frames: int
+
+
+@dataclass
+class FramePacket:
+    """
+    One decoded frame travelling through the pipeline.
+
+    Attributes:
+        index (int): Zero-based frame index in the source video.
+        image (np.ndarray): Decoded BGR frame. Stages that draw on it must work on a copy.
+        results (Results): Detection results with track IDs for this frame.
+        detected (bool): False if detection was skipped and `results` holds the Kalman-predicted tracks.
+        data (dict): Values produced by earlier stages for later ones, e.g. detections and counts.
+    """
+
+    index: int
+    image: object
+    results: object
+    detected: bool = True
+    data: dict = field(default_factory=dict)
+
+
+class Stage:
+    """
+    Base class for a pipeline stage. Subclasses override `process` and optionally `open`, `close` and `stats`.
+
+    The stage `name` keys its entry in `FramePipeline.timings` and in checkpoints; it defaults to the class name.
+    Stages that accumulate state over frames override `state` and `restore`, so a job resumed from a checkpoint
+    continues with the state it had at the checkpointed frame.
+    """
+
+    @property
+    def name(self):
+        """Stage name used in pipeline timings."""
+        return type(self).__name__
+
+    def open(self, info):
+        """Called once with the `VideoInfo` of the source before the first frame."""
+
+    def process(self, packet):
+        """Consume one `FramePacket`."""
+        raise NotImplementedError
+
+    def close(self):
+        """Called once after the last frame, also when processing stops with an error."""
+
+    def stats(self):
+        """Return a JSON-serializable dict of stage-specific statistics, reported by `FramePipeline.stats`."""
+        return {}
+
+    def state(self):
+        """Return the picklable state of the stage for a checkpoint, None if it keeps no state across frames."""
+        return None
+
+    def restore(self, state):
+        """Called before `open` with the checkpointed `state` when a job resumes, `open` keeps the restored state."""
+
+
+class FramePipeline:
+    """
+    Decode a video once, detect and track once per frame and fan the results out to all stages.
+
+    Attributes:
+        model (YOLO): Detection model, may be shared with other pipelines.
+        stages (list): Stages called in order for every frame.
+        tracker (str): Tracker configuration YAML, a new tracker is created for every `run`.
+        stride (int | str): Run the detector on every `stride`-th frame, or 'auto' to derive it from the latency.
+        max_stride (int): Upper bound of the adaptive stride.
+        decode (str): 'thread' decodes in the pipeline thread, 'process' in a separate process that hands frames over
+            through shared memory (`SharedMemoryDecoder`), so decoding runs in parallel with inference.
+        predict_args (dict): Extra keyword arguments for `model.predict`.
+        timings (dict): Seconds spent in 'decode', 'inference' and every stage during the current or last `run`.
+        frames (int): Frames processed by the current or last `run`.
+    """
+
+    def __init__(
+        self, model, stages, tracker="bytetrack.yaml", stride=1, max_stride=8, decode="thread", **predict_args
+    ):
+        """Initialize the pipeline with a model, its stages and optional tracker, cadence, decoder and predict args."""
+        if decode not in {"thread", "process"}:
+            raise ValueError(f"Invalid decode '{decode}', valid values are ['thread', 'process']")
+        self.model = model
+        self.stages = list(stages)
+        self.tracker = tracker
+        self.stride = stride
+        self.max_stride = max_stride
+        self.decode = decode
+        self.predict_args = predict_args
+        self.timings = {}
+        self.frames = 0
+
+    def run(
+        self,
+        video_path,
+        stop=None,
+        progress=None,
+        checkpoint=None,
+        checkpoint_interval=300,
+        resume=None,
+        replay=None,
+        record=None,
+    ):
+        """
+        Process `video_path` and return the number of frames processed.
+
+        Args:
+            video_path (str): Path of the video to process.
+            stop (threading.Event, optional): Processing ends after the current frame once this event is set.
+            progress (callable, optional): Called as `progress(frames_done, info)` after every frame.
+            checkpoint (callable, optional): Called as `checkpoint(state)` every `checkpoint_interval` frames with the
+                pipeline state (see `state`), which references live objects and must be saved before it returns.
+            checkpoint_interval (int): Frames between checkpoints.
+            resume (dict, optional): State of a checkpoint of the same video and stages. Decoding seeks to its frame
+                and the tracker, cadence and stage states are restored instead of starting from the first frame.
+            replay (CachedDetections, optional): Detections of an earlier run of the same video and inference
+                arguments, used instead of running the detector. Frames the detector skipped then are skipped again.
+            record (DetectionRecorder, optional): Records the detections of every frame and commits them to the
+                detection cache when the whole video was processed.
+        """
+        start = resume["frame"] if resume else 0
+        info, read, release = self._open(video_path, start=start)
+
+        track = FrameTracker(self.model, self.tracker, frame_rate=info.fps, **self.predict_args)
+        cadence = InferenceCadence(self.stride, fps=info.fps, max_stride=self.max_stride)
+        if resume:
+            track.restore(resume["tracker"])
+            cadence = resume["cadence"]
+        timings = self.timings = {"decode": 0.0, "inference": 0.0, **{stage.name: 0.0 for stage in self.stages}}
+        opened = []
+        self.frames = start
+        try:
+            for stage in self.stages:
+                if resume and resume["stages"].get(stage.name) is not None:
+                    stage.restore(resume["stages"][stage.name])
+                stage.open(info)
+                opened.append(stage)
+            if resume:
+                LOGGER.info(f"Resuming {video_path} from frame {start}")
+
+            while stop is None or not stop.is_set():
+                t0 = time.perf_counter()
+                ret, frame = read()
+                t1 = time.perf_counter()
+                timings["decode"] += t1 - t0
+                if not ret:
+                    break
+                cached = replay.results(self.frames, frame, video_path) if replay is not None else None
+                if cached is not None:  # detections of an earlier run, no inference
+                    track.last = cached
+                    packet = FramePacket(index=self.frames, image=frame, results=track.update(cached, frame))
+                elif replay is None and cadence.due():
+                    packet = FramePacket(index=self.frames, image=frame, results=track(frame))
+                    cadence.record(time.perf_counter() - t1)
+                else:
+                    packet = FramePacket(index=self.frames, image=frame, results=track.predict(frame), detected=False)
+                if record is not None:
+                    record.add(track.last if packet.detected else None)
+                t0 = time.perf_counter()
+                timings["inference"] += t0 - t1
+                for stage in self.stages:
+                    stage.process(packet)
+                    t1 = time.perf_counter()
+                    timings[stage.name] += t1 - t0
+                    t0 = t1
+                self.frames += 1
+                if progress:
+                    progress(self.frames, info)
+                if checkpoint and self.frames % checkpoint_interval == 0:
+                    checkpoint(self.state(track, cadence))
+        finally:
+            release()
+            for stage in reversed(opened):
+                stage.close()
+        if record is not None and (stop is None or not stop.is_set()):
+            record.commit()  # only complete runs are cached
+        LOGGER.info(f"Processed {self.frames} frames of {video_path}, ms/frame: {self.stats()['ms_per_frame']}")
+        return self.frames
+
+    def state(self, track, cadence):
+        """
+        Return the state needed to resume the current `run` after the last processed frame.
+
+        Returns:
+            (dict): 'frame' (index of the next frame), 'tracker' (`FrameTracker.state`), 'cadence'
+                (`InferenceCadence`) and 'stages' (stage name to `Stage.state`).
+        """
+        return {
+            "frame": self.frames,
+            "tracker": track.state(),
+            "cadence": cadence,
+            "stages": {stage.name: stage.state() for stage in self.stages},
+        }
+
+    def _open(self, video_path, start=0):
+        """Open `video_path` at frame `start` with the configured decoder, return its `VideoInfo`, read and release."""
+        if self.decode == "process":
+            try:
+                decoder = SharedMemoryDecoder(video_path, start=start)
+            except ConnectionError as e:
+                raise FileNotFoundError(f"Failed to open video {video_path}") from e
+            h, w = decoder.shape[:2]
+            frames = decoder.frames if math.isfinite(decoder.frames) else 0
+            info = VideoInfo(path=video_path, width=w, height=h, fps=int(decoder.fps) or 30, frames=frames)
+
+            def read():
+                """Return (success, frame) like `cv2.VideoCapture.read`, frame is a shared-memory view."""
+                frame = decoder.read()
+                return frame is not None, frame
+
+            return info, read, decoder.close
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Failed to open video {video_path}")
+        info = VideoInfo(
+            path=video_path,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            fps=int(cap.get(cv2.CAP_PROP_FPS)) or 30,
+            frames=int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+        )
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        return info, cap.read, cap.release
+
+    def stats(self):
+        """Return per-frame milliseconds of decode, inference and every stage, plus stage statistics."""
+        n = max(self.frames, 1)
+        stats = {"frames": self.frames, "ms_per_frame": {k: round(v * 1e3 / n, 3) for k, v in self.timings.items()}}
+        for stage in self.stages:
+            if stage_stats := stage.stats():
+                stats[stage.name] = stage_stats
+        return stats
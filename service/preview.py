@@ -0,0 +1,170 @@
+"""Low-latency MJPEG preview of processed frames, one shared JPEG encode per frame for any number of viewers."""
+
+import threading
+
+import cv2
+
+from .pipeline import Stage
+
+
+class PreviewChannel:
+    """
+    Latest-frame broadcast of one job to any number of viewers.
+
+    `publish` only stores a reference to the frame and wakes the viewers, so a channel nobody watches costs nothing.
+    The first viewer that asks for a new frame encodes it to JPEG and every other viewer reuses those bytes, so N
+    viewers cost one encode per frame. Each viewer always gets the newest frame once it is ready for the next one, so a
+    slow client skips frames instead of falling behind or slowing down the pipeline and the other viewers.
+
+    Attributes:
+        quality (int): JPEG quality, 0-100.
+        closed (bool): Whether the job ended, viewers finish after the last frame.
+        frames (int): Frames published.
+        encodes (int): JPEG encodes, at most one per published frame.
+        viewers (int): Connected viewers.
+    """
+
+    def __init__(self, quality=80):
+        """Initialize an empty channel."""
+        self.quality = int(quality)
+        self.closed = False
+        self.frames = 0
+        self.encodes = 0
+        self.viewers = 0
+        self._frame = None
+        self._jpeg, self._jpeg_seq = None, 0
+        self._cond = threading.Condition()
+        self._encode_lock = threading.Lock()
+
+    def publish(self, frame):
+        """Make `frame` the latest frame, it must not be modified afterwards."""
+        with self._cond:
+            self._frame = frame
+            self.frames += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """End the channel, viewers receive the last frame and then stop."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def get(self, after=0, timeout=None):
+        """
+        Wait for a frame newer than sequence number `after` and return it as JPEG.
+
+        Returns:
+            (tuple | None): (sequence number, JPEG bytes), JPEG None if `timeout` elapsed or encoding failed; None
+                once the channel is closed and its last frame was returned.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.frames > after or self.closed, timeout):
+                return after, None
+            if self.frames <= after:
+                return None
+            seq, frame = self.frames, self._frame
+        with self._encode_lock:  # viewers asking for the same frame wait for one encode
+            if self._jpeg_seq < seq:
+                ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if not ok:
+                    return seq, None
+                self._jpeg, self._jpeg_seq = jpeg.tobytes(), seq
+                self.encodes += 1
+            return self._jpeg_seq, self._jpeg
+
+    def stream(self, boundary="frame", timeout=1.0):
+        """Yield the frames as `multipart/x-mixed-replace` parts until the channel closes."""
+        with self._cond:
+            self.viewers += 1
+        try:
+            seq = 0
+            while True:
+                item = self.get(seq, timeout=timeout)
+                if item is None:
+                    return
+                seq, jpeg = item
+                if jpeg is None:  # no new frame yet
+                    continue
+                header = f"--{boundary}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n"
+                yield header.encode() + jpeg + b"\r\n"
+        finally:
+            with self._cond:
+                self.viewers -= 1
+
+    def stats(self):
+        """Return published frames, encodes and connected viewers."""
+        return {"frames": self.frames, "encodes": self.encodes, "viewers": self.viewers}
+
+
+class PreviewHub:
+    """
+    Preview channels of the running jobs by key.
+
+    Attributes:
+        quality (int): JPEG quality of new channels.
+    """
+
+    def __init__(self, quality=80):
+        """Initialize an empty hub."""
+        self.quality = quality
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def open(self, key):
+        """Create and return the channel of `key`, replacing a channel left by an earlier run."""
+        channel = PreviewChannel(self.quality)
+        with self._lock:
+            previous = self._channels.get(key)
+            self._channels[key] = channel
+        if previous is not None:
+            previous.close()
+        return channel
+
+    def get(self, key):
+        """Return the channel of `key`, None if it has no running job."""
+        with self._lock:
+            return self._channels.get(key)
+
+    def close(self, key, channel=None):
+        """Close and remove the channel of `key`, only if it is still `channel` when given."""
+        with self._lock:
+            current = self._channels.get(key)
+            if current is None or (channel is not None and current is not channel):
+                return
+            del self._channels[key]
+        current.close()
+
+
+class PreviewStage(Stage):
+    """
+    Pipeline stage that publishes the frame an earlier stage stored in `packet.data[data_key]` to a preview channel.
+
+    Attributes:
+        hub (PreviewHub): Hub the channel is opened in.
+        key (str): Channel key, e.g. the job ID.
+        data_key (str): `packet.data` key of the frame to publish.
+    """
+
+    def __init__(self, hub, key, data_key="annotated"):
+        """Initialize the stage, the channel is opened by `open`."""
+        self.hub = hub
+        self.key = key
+        self.data_key = data_key
+        self.channel = None
+
+    def open(self, info):
+        """Open the preview channel of the job."""
+        self.channel = self.hub.open(self.key)
+
+    def process(self, packet):
+        """Publish the frame."""
+        self.channel.publish(packet.data[self.data_key])
+
+    def close(self):
+        """Close the channel, connected viewers receive the end of the stream."""
+        if self.channel is not None:
+            self.hub.close(self.key, self.channel)
+
+    def stats(self):
+        """Return the channel statistics."""
+        return self.channel.stats() if self.channel else {}
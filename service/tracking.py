@@ -0,0 +1,113 @@
+"""Per-video object tracking on top of a shared detection model."""
+
+import math
+
+import torch
+
+from ultralytics.engine.results import Results
+from ultralytics.trackers.basetrack import BaseTrack
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+
+
+class FrameTracker:
+    """
+    Tracker state for a single video, fed by `model.predict`.
+
+    `model.track(persist=True)` keeps its trackers on the model's predictor, so every video processed by the same
+    model would share (and corrupt) one ByteTrack state. This class keeps the tracker with the job instead and applies
+    it to the detections exactly like `ultralytics.trackers.track.on_predict_postprocess_end`.
+
+    Attributes:
+        model (YOLO): Detection model, may be shared between threads.
+        tracker (BYTETracker | BOTSORT): Tracker owned by this video.
+        predict_args (dict): Keyword arguments for `model.predict`.
+    """
+
+    def __init__(self, model, tracker="bytetrack.yaml", frame_rate=30, **predict_args):
+        """Initialize the tracker from a tracker YAML and the frame rate of the video."""
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker)))
+        if cfg.tracker_type not in TRACKER_MAP:
+            raise AssertionError(f"Only 'bytetrack' and 'botsort' are supported for now, but got '{cfg.tracker_type}'")
+        self.model = model
+        self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+        self.last = None  # last detector Results, provides path and names for predicted frames
+        # ByteTrack-based methods need low confidence predictions as input, same default as model.track()
+        self.predict_args = {"conf": 0.1, "verbose": False, **predict_args}
+
+    def __call__(self, frame):
+        """Detect objects in `frame` and return the `Results` updated with track IDs."""
+        results = self.model.predict(frame, **self.predict_args)[0]
+        self.last = results
+        return self.update(results, frame)
+
+    def predict(self, frame):
+        """Return `Results` for `frame` with the Kalman-predicted boxes of the current tracks, without detection."""
+        if self.last is None:  # nothing to carry forward before the first detection
+            return self(frame)
+        tracks = self.tracker.predict()
+        boxes = torch.as_tensor(tracks[:, :-1]) if len(tracks) else torch.zeros((0, 7))
+        return Results(frame, path=self.last.path, names=self.last.names, boxes=boxes)
+
+    def state(self):
+        """Return the picklable tracker state for a checkpoint."""
+        return {"tracker": self.tracker, "next_id": BaseTrack._count}
+
+    def restore(self, state):
+        """Continue tracking from a checkpointed `state`."""
+        self.tracker = state["tracker"]
+        self.last = None
+        # Track IDs come from a process-wide counter, never hand out an ID the checkpointed tracks already use
+        BaseTrack._count = max(BaseTrack._count, state["next_id"])
+
+    def update(self, results, frame):
+        """Update the tracker with the detections in `results` and return the tracked `Results`."""
+        det = results.boxes.cpu().numpy()
+        if len(det) == 0:
+            return results
+        tracks = self.tracker.update(det, frame)
+        if len(tracks) == 0:
+            return results
+        results = results[tracks[:, -1].astype(int)]
+        results.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return results
+
+
+class InferenceCadence:
+    """
+    Decides on which frames the detector runs, the tracker carries the boxes forward on the others.
+
+    With a fixed `stride` the detector runs on every `stride`-th frame. With `stride='auto'` the stride follows the
+    measured detection latency: a detector that needs 50 ms per frame on a 60 FPS video runs on every 3rd frame, so
+    the pipeline keeps up with the source frame rate.
+
+    Attributes:
+        stride (int): Current number of frames per detector run.
+        adaptive (bool): Whether `stride` is derived from the measured latency.
+        latency (float | None): Exponential moving average of the detection time in seconds.
+    """
+
+    def __init__(self, stride=1, fps=30, max_stride=8, momentum=0.9):
+        """Initialize with a fixed stride or 'auto', the source FPS and the maximum adaptive stride."""
+        self.adaptive = stride == "auto"
+        self.stride = 1 if self.adaptive else max(int(stride), 1)
+        self.fps = fps
+        self.max_stride = max(int(max_stride), 1)
+        self.momentum = momentum
+        self.latency = None
+        self._since = None  # frames since the last detector run
+
+    def due(self):
+        """Return True if the detector should run on the next frame."""
+        if self._since is None or self._since + 1 >= self.stride:
+            self._since = 0
+            return True
+        self._since += 1
+        return False
+
+    def record(self, seconds):
+        """Record the duration of a detector run and update the adaptive stride."""
+        self.latency = seconds if self.latency is None else self.momentum * self.latency + (1 - self.momentum) * seconds
+        if self.adaptive:
+            self.stride = min(max(math.ceil(self.latency * self.fps), 1), self.max_stride)
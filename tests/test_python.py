@@ -259,6 +259,50 @@ def test_predict_callback_and_setup():
         print(boxes)
 
 
+def test_predict_fused_preprocess():
+    """Test that the fused preprocessing is bit-identical to letterbox, stack, transpose and division."""
+    model = YOLO(CFG)
+    model.predict(np.zeros((64, 64, 3), dtype=np.uint8), imgsz=160)
+    predictor = model.predictor
+    rng = np.random.default_rng(0)
+    for shapes in [(120, 200)], [(120, 200)] * 3, [(200, 120), (90, 160)], [(160, 160)], [(120, 200)]:
+        images = [rng.integers(0, 255, (*shape, 3), dtype=np.uint8) for shape in shapes]
+        im = np.stack(predictor.pre_transform(images))[..., ::-1].transpose((0, 3, 1, 2))
+        expected = torch.from_numpy(np.ascontiguousarray(im)).float() / 255
+        assert torch.equal(predictor.preprocess(images), expected)
+
+
+def test_letterbox_labels():
+    """Test that LetterBox with a label dict resizes the image, records the target shape and shifts the boxes."""
+    from ultralytics.data.augment import LetterBox
+    from ultralytics.utils.instance import Instances
+
+    boxes = np.array([[10.0, 20.0, 110.0, 60.0]], dtype=np.float32)
+    def labels(**kwargs):
+        instances = Instances(boxes.copy(), np.zeros((0, 1000, 2), dtype=np.float32), None, "xyxy", normalized=False)
+        return {"img": np.zeros((100, 200, 3), dtype=np.uint8), "instances": instances, **kwargs}
+
+    out = LetterBox(160, auto=False)(labels=labels(rect_shape=(96, 160)))  # rectangular validation batch
+    assert out["img"].shape == (96, 160, 3) and out["resized_shape"] == (96, 160) and "rect_shape" not in out
+    assert np.allclose(out["instances"].bboxes, boxes * 0.8 + [0, 8, 0, 8])
+
+    out = LetterBox(160, auto=False)(labels=labels())  # int target size
+    assert out["img"].shape == (160, 160, 3) and out["resized_shape"] == (160, 160)
+    assert np.allclose(out["instances"].bboxes, boxes * 0.8 + [0, 40, 0, 40])
+
+
+def test_predict_infer_frame():
+    """Test that the single-frame fast path returns the results of `predict` and follows argument changes."""
+    model = YOLO(CFG)
+    frame = np.random.default_rng(0).integers(0, 255, (120, 200, 3), dtype=np.uint8)
+    for conf in 0.01, 0.5:
+        expected = model.predict(frame, imgsz=160, conf=conf)[0]
+        for _ in range(2):
+            result = model.predictor.infer_frame(frame)
+            assert torch.equal(result.boxes.data, expected.boxes.data) and result.orig_img is frame
+            assert set(result.speed) == {"preprocess", "inference", "postprocess"}
+
+
 @pytest.mark.parametrize("model", MODELS)
 def test_results(model):
     """Ensure YOLO model predictions can be processed and printed in various formats."""
@@ -322,6 +366,60 @@ def test_data_utils():
     zip_directory(TMP / "coco8/images/val")  # zip
 
 
+def test_frame_ring():
+    """Test FIFO and latest-frame modes of the LoadStreams frame ring and that frames still in use are not reused."""
+    import threading
+
+    from ultralytics.data.loaders import FrameRing
+
+    def put(ring, value):
+        i, slot = ring.acquire()
+        slot[:] = value
+        ring.commit(i)
+
+    fifo = FrameRing((2, 2), capacity=3)
+    for v in range(3):
+        put(fifo, v)
+    waiting = threading.Thread(target=put, args=(fifo, 3))  # buffer full, the reader waits for room
+    waiting.start()
+    waiting.join(timeout=0.1)
+    assert waiting.is_alive() and len(fifo) == 3
+    kept = fifo.get()  # kept outside the ring, like `Results.orig_img`
+    waiting.join(timeout=5)
+    assert kept[0, 0] == 0 and [fifo.get()[0, 0] for _ in range(3)] == [1, 2, 3] and fifo.get(timeout=0.01) is None
+    for v in range(4, 8):
+        put(fifo, v)
+        fifo.get()
+    assert kept[0, 0] == 0  # the slot was replaced instead of overwritten
+
+    latest = FrameRing((2, 2), latest=True)
+    for v in range(5):
+        put(latest, v)
+    assert latest.get()[0, 0] == 4 and latest.dropped == 4 and latest.get(timeout=0.01) is None
+    latest.close()
+    assert latest.acquire() == (None, None)
+
+
+def test_stream_decode_process(tmp_path):
+    """Test that stream sources decoded in separate processes yield the same frames as the threaded stream loader."""
+    video = str(tmp_path / "stream.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(8):
+        writer.write(np.full((48, 64, 3), i * 30, dtype=np.uint8))
+    writer.release()
+    streams = tmp_path / "test.streams"
+    streams.write_text(f"{video}\n{video}\n")
+
+    frames = {}
+    for decode in ("thread", "process"):
+        dataset = load_inference_source(str(streams), buffer=True, decode=decode)
+        frames[decode] = []
+        with contextlib.suppress(cv2.error):  # LoadStreams.close() calls cv2.destroyAllWindows()
+            for _, images, _ in dataset:
+                frames[decode].append([int(im.mean()) for im in images])
+    assert frames["process"] == frames["thread"] and len(frames["process"]) == 8
+
+
 @pytest.mark.skipif(not ONLINE, reason="environment is offline")
 def test_data_converter():
     """Test dataset conversion functions from COCO to YOLO format and class mappings."""
@@ -447,6 +545,47 @@ def test_utils_ops():
     torch.allclose(boxes, xyxyxyxy2xywhr(xywhr2xyxyxyxy(boxes)), rtol=1e-3)
 
 
+@pytest.mark.parametrize("anchors", [200, 2000])  # one NMS call for the batch, several runs of images
+@pytest.mark.parametrize("multi_label,agnostic,max_det", [(False, False, 300), (True, False, 300), (False, True, 3)])
+def test_utils_ops_batched_nms(anchors, multi_label, agnostic, max_det):
+    """Test that batched NMS returns exactly the boxes of the per-image NMS loop."""
+    from ultralytics.utils.ops import non_max_suppression
+
+    g = torch.Generator().manual_seed(0)
+    p = torch.rand(6, 4 + 3 + 8, anchors, generator=g)  # 3 classes, 8 mask coefficients
+    p[:, :4] *= torch.tensor([640.0, 640.0, 100.0, 100.0])[:, None]
+    p[:, 4:7] = p[:, 4:7] ** 4
+    p[2, 4:7] = 0  # image without candidates
+    args = dict(conf_thres=0.25, multi_label=multi_label, agnostic=agnostic, max_det=max_det, nc=3, in_place=False)
+    loop = non_max_suppression(p, batched=False, **args)
+    output = non_max_suppression(p, **args)
+    assert len(output) == len(loop) == 6 and len(output[2]) == 0
+    assert all(torch.equal(a, b) for a, b in zip(output, loop))
+
+
+@pytest.mark.parametrize("agnostic", [False, True])
+def test_utils_ops_batched_nms_single_call(agnostic):
+    """Test that single-call batched NMS differs from the per-image loop only for boxes with IoU near the threshold."""
+    from ultralytics.utils.metrics import box_iou
+    from ultralytics.utils.ops import _batched_nms, non_max_suppression, xywh2xyxy
+
+    g = torch.Generator().manual_seed(0)
+    p = torch.rand(8, 4 + 80, 2000, generator=g)  # 80 classes, large offsets in float32
+    p[:, :4] *= torch.tensor([640.0, 640.0, 100.0, 100.0])[:, None]
+    p[:, 4:] = p[:, 4:] ** 8
+    loop = non_max_suppression(p, batched=False, iou_thres=0.5, agnostic=agnostic, in_place=False)
+    x = p.transpose(-1, -2).clone()
+    x[..., :4] = xywh2xyxy(x[..., :4])
+    xc = p[:, 4:].amax(1) > 0.25
+    output = _batched_nms(x, xc, 0.25, 0.5, None, agnostic, False, 300, 80, 0, 30000, 7680, single_call=True)
+    for a, b in zip(output, loop):
+        kept_a, kept_b = {tuple(r.tolist()) for r in a}, {tuple(r.tolist()) for r in b}
+        for row in kept_a ^ kept_b:  # a box kept by one path only overlaps a kept box by about the threshold
+            same = b if agnostic else b[b[:, 5] == row[5]]
+            iou = box_iou(torch.tensor([row[:4]]).double(), same[:, :4].double())
+            assert len(same) and (iou - 0.5).abs().min() < 1e-3
+
+
 def test_utils_files():
     """Test file handling utilities including file age, date, and paths with spaces."""
     from ultralytics.utils.files import file_age, file_date, get_latest_run, spaces_in_path
@@ -0,0 +1,651 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pytest
+import torch
+
+from service import DetectionWriter, JobScheduler, QueueFullError, setup_database
+
+
+def test_job_scheduler():
+    """Test job queue admission control, progress, cancellation and completion."""
+    release = threading.Event()
+
+    def handler(job):
+        job.frames_total = 10
+        release.wait(timeout=10)
+        for i in range(10):
+            if job.cancel_event.is_set():
+                return
+            job.frames_done = i + 1
+
+    scheduler = JobScheduler(handler, workers=1, queue_size=1)
+    running = scheduler.submit("running.mp4")
+    while scheduler.get(running.id).status != "running":  # worker picked up the first job, queue is empty again
+        pass
+    queued = scheduler.submit("queued.mp4")
+    assert scheduler.active() == [running.id, queued.id]
+    with pytest.raises(QueueFullError):
+        scheduler.submit("rejected.mp4")
+
+    scheduler.cancel(queued.id)
+    assert queued.to_dict()["status"] == "cancelled"
+    release.set()
+    scheduler._queue.join()
+    assert running.status == "done" and running.progress()["percent"] == 100.0
+    assert scheduler.stats()["done"] == 1 and scheduler.active() == []
+    scheduler.shutdown()
+
+
+def test_detection_writer(tmp_path):
+    """Test that the batched writer commits every row on size, interval, flush and close."""
+    db = str(tmp_path / "detections.db")
+    writer = DetectionWriter(db, batch_size=4, flush_interval=0.05)
+    for i in range(10):
+        writer.write(i, i // 2, frame_idx=i, video_id="a")
+    assert writer.flush(timeout=5)
+    assert writer.rows_written == 10
+    writer.write(1, 1, frame_idx=10, video_id="b")
+    writer.close()
+
+    conn = setup_database(db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    rows = conn.execute("SELECT person_count, head_count, frame_idx, video_id FROM person ORDER BY id").fetchall()
+    conn.close()
+    assert len(rows) == 11 and rows[3] == (3, 1, 3, "a") and rows[-1] == (1, 1, 10, "b")
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    with pytest.raises(sqlite3.OperationalError):  # the database cannot be created, the error reaches the constructor
+        DetectionWriter(str(tmp_path / "missing" / "detections.db"))
+
+
+def test_detection_writer_dies(tmp_path):
+    """Test that callers blocked on a full queue raise instead of hanging when the writer thread dies."""
+    writer = DetectionWriter(str(tmp_path / "detections.db"), batch_size=1, max_pending=1)
+    gate = threading.Event()
+
+    def commit(conn, rows):
+        gate.wait()
+        raise ValueError("disk gone")
+
+    writer._commit = commit
+    writer.write(1, 1)  # taken by the thread, which blocks in commit
+    while not writer._queue.empty():
+        time.sleep(0.01)
+    writer.write(2, 2)  # fills the queue
+    threading.Timer(0.2, gate.set).start()
+    with pytest.raises(RuntimeError, match="disk gone"):
+        writer.write(3, 3)  # blocked on the full queue until the thread dies
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    writer.close()
+
+
+def test_rollup_queries(tmp_path):
+    """Test per-second/per-minute rollups, backfill, bucketing and keyset pagination."""
+    from service.database import query_rollup, query_summary
+
+    db = str(tmp_path / "detections.db")
+    writer = DetectionWriter(db, batch_size=7)
+    t0 = 1_700_000_040  # minute aligned
+    for i in range(180):  # 3 minutes at 1 FPS, counts cycle 0..9
+        writer.write(i % 10, i % 5, frame_idx=i, video_id="a", ts=t0 + i)
+    writer.write(50, 50, frame_idx=0, video_id="b", ts=t0)
+    writer.close()
+
+    conn = setup_database(db)
+    items, cursor = query_rollup(conn, "minute", video_id="a")
+    assert cursor is None and [x["frames"] for x in items] == [60, 60, 60]
+    assert items[0]["person_min"] == 0 and items[0]["person_max"] == 9 and items[0]["person_avg"] == 4.5
+
+    items, cursor = query_rollup(conn, "second", start=t0, end=t0 + 60, limit=30)
+    assert len(items) == 30 and items[0]["person_max"] == 50 and items[0]["frames"] == 2
+    items, cursor = query_rollup(conn, "second", start=cursor, end=t0 + 60, limit=30)
+    assert len(items) == 30 and cursor is None and items[-1]["bucket"] == t0 + 59
+
+    items, _ = query_rollup(conn, "minute", bucket=120, start=t0, order="desc")
+    assert [x["frames"] for x in items] == [60, 121]
+    with pytest.raises(ValueError):
+        query_rollup(conn, "minute", bucket=90)
+
+    summary = query_summary(conn, video_id="a")
+    assert summary["frames"] == 180 and summary["person_max"] == 9 and summary["head_avg"] == 2.0
+    conn.close()
+
+
+def test_delete_frames(tmp_path):
+    """Test that deleting the frames after a checkpoint also takes them out of the rollups."""
+    from service.database import delete_frames, query_rollup
+
+    db = str(tmp_path / "detections.db")
+    writer = DetectionWriter(db)
+    t0 = 1_700_000_040  # minute aligned
+    for i in range(120):  # 2 minutes at 1 FPS, the highest counts are in the deleted frames
+        writer.write(i, 0, frame_idx=i, video_id="a", ts=t0 + i)
+    writer.write(7, 7, frame_idx=100, video_id="b", ts=t0 + 100)
+    writer.close()
+
+    conn = setup_database(db)
+    assert delete_frames(conn, "a", 90) == 30
+    items, _ = query_rollup(conn, "minute", video_id="a")
+    assert [(x["frames"], x["person_max"]) for x in items] == [(60, 59), (30, 89)]
+    items, _ = query_rollup(conn, "second", start=t0 + 89, end=t0 + 101)
+    assert [x["bucket"] - t0 for x in items] == [89, 100] and items[1]["person_max"] == 7
+    conn.close()
+
+
+def test_detection_log(tmp_path):
+    """Test chunked columnar box logging, time-window reads through the chunk index and truncation."""
+    import os
+
+    from service import DetectionLog
+
+    log = DetectionLog(str(tmp_path), chunk_rows=10)
+    t0 = 1_700_000_000
+    for i in range(12):  # 3 boxes per frame, chunks are cut after 4 frames
+        xyxy = np.tile(np.array([[i, 0, i + 10, 10]], dtype=np.float32), (3, 1))
+        log.write("a", i, xyxy, [0.5, 0.6, 0.7], [0, 1, 0], track_id=[1, 2, 3], ts=t0 + i)
+    log.write("b", 0, np.zeros((2, 4)), [0.9, 0.9], [1, 1], ts=t0)
+    log.write("b", 1, np.zeros((0, 4)), [], [], ts=t0 + 1)  # frames without boxes are allowed
+    assert log.flush(timeout=5)
+
+    chunks = log.chunks("a")
+    assert [(c["frame_start"], c["frame_end"], c["rows"]) for c in chunks] == [(0, 3, 12), (4, 7, 12), (8, 11, 12)]
+    rows = log.read("a", start=t0 + 2, end=t0 + 6)
+    assert rows["frame"].tolist() == [2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5] and rows["xyxy"].shape == (12, 4)
+    assert rows["track_id"][:3].tolist() == [1, 2, 3] and rows["cls"].dtype == np.uint16
+    assert log.read("b")["track_id"].tolist() == [-1, -1] and len(log.read("c")["frame"]) == 0
+
+    assert log.truncate("a", 6, timeout=5)
+    assert [(c["frame_start"], c["frame_end"]) for c in log.chunks("a")] == [(0, 3), (4, 5)]
+    assert log.read("a")["frame"].max() == 5
+    os.remove(log.chunks("a")[-1]["path"])  # a lost chunk file does not stop the writer thread
+    assert log.truncate("a", 5, timeout=5) and [c["frame_end"] for c in log.chunks("a")] == [3]
+    with pytest.raises(ValueError):
+        log.write("../a", 0, np.zeros((0, 4)), [], [])
+    log.close()
+    with pytest.raises(RuntimeError):
+        log.flush()
+    (tmp_path / "file").touch()
+    with pytest.raises(OSError):  # the log directory cannot be created, the error reaches the constructor
+        DetectionLog(str(tmp_path / "file" / "log"))
+
+
+def test_inference_cadence():
+    """Test fixed and latency-driven detector strides and Kalman carry-forward on skipped frames."""
+    from service import InferenceCadence
+    from ultralytics.trackers.byte_tracker import BYTETracker
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    cadence = InferenceCadence(stride=3)
+    assert [cadence.due() for _ in range(7)] == [True, False, False, True, False, False, True]
+    cadence = InferenceCadence(stride="auto", fps=60, max_stride=4)
+    cadence.record(0.05)
+    assert cadence.stride == 3
+    cadence.record(1.0)
+    assert cadence.stride == 4
+
+    class Boxes:  # minimal stand-in for the numpy Boxes passed by FrameTracker
+        def __init__(self, xyxy):
+            self.xyxy = np.array(xyxy, dtype=np.float32)
+            xy, wh = (self.xyxy[:, :2] + self.xyxy[:, 2:]) / 2, self.xyxy[:, 2:] - self.xyxy[:, :2]
+            self.xywh = np.concatenate([xy, wh], 1)
+            self.conf = np.full(len(xyxy), 0.9, dtype=np.float32)
+            self.cls = np.zeros(len(xyxy), dtype=np.float32)
+
+    tracker = BYTETracker(IterableSimpleNamespace(**yaml_load(check_yaml("bytetrack.yaml"))), frame_rate=30)
+    for x in range(0, 50, 10):  # box moving right by 10 px per frame
+        tracks = tracker.update(Boxes([[x, 0, x + 20, 40]]))
+    predicted = tracker.predict()
+    assert len(predicted) == 1 and predicted[0, 4] == tracks[0, 4] and predicted[0, 0] > tracks[0, 0]
+
+
+def test_model_registry():
+    """Test that the registry shares one lazily loaded, warmed-up handle per weights and reports its status."""
+    from service import ModelRegistry
+
+    registry = ModelRegistry(device="cpu", imgsz=64)
+    handle = registry.get("yolo11n.yaml")
+    assert registry.get("yolo11n.yaml") is handle and handle.status()["state"] == "unloaded"
+    results = handle(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+    status = registry.status()[0]
+    assert len(results) == 1 and handle.names == results[0].names
+    assert status["state"] == "ready" and status["warmed_up"] and status["device"] == "cpu"
+
+    frame = np.random.default_rng(0).integers(0, 255, (48, 80, 3), dtype=np.uint8)
+    expected = handle.load().predict(frame, imgsz=64, device="cpu", conf=0.01, verbose=False)[0].boxes.data
+    handle(frame, conf=0.01, verbose=False)
+    seen = handle.load().predictor.seen
+    fast = handle(frame, conf=0.01, verbose=False)[0]  # same arguments, runs predictor.infer_batch
+    assert handle.load().predictor.seen == seen + 1 and torch.equal(fast.boxes.data, expected)
+    assert handle.fingerprint != registry.get("yolo11n.yaml", imgsz=32, device="cuda").fingerprint
+    assert registry.get("yolo11n.yaml", imgsz=32) is not handle and registry.get("yolo11n.yaml", imgsz=64) is handle
+    with pytest.raises(ValueError):
+        registry.get("yolo11n.yaml", backend="tflite")
+
+
+def test_inference_broker():
+    """Test that concurrent single-frame calls run in shared batches and return the boxes of a call of their own."""
+    import threading
+
+    from service import InferenceBroker, ModelRegistry
+
+    handle = ModelRegistry(device="cpu", imgsz=64).get("yolo11n.yaml")
+    broker = InferenceBroker(handle, max_batch=4, max_wait=1.0)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (48, 80, 3), dtype=np.uint8) for _ in range(8)]
+    expected = [handle(frame, conf=0.01, verbose=False)[0].boxes.data for frame in frames]
+    results = [None] * len(frames)
+
+    def worker(i):
+        results[i] = broker(frames[i], conf=0.01, verbose=False)[0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(frames))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = broker.stats()
+    assert stats["batches"] == 2 and stats["frames"] == 8 and stats["p99_ms"] is not None
+    assert all(torch.equal(r.boxes.data, e) for r, e in zip(results, expected))
+
+    future = broker.submit(frames[0][..., :2], conf=0.01, verbose=False)  # 2-channel frame, the batch fails
+    broker.stop()
+    assert future.exception() is not None and broker.stats()["frames"] == 8
+
+
+def test_overlay_renderer():
+    """Test the `cv2.putText` HUD and that batched box drawing matches `cv2.rectangle` pixel for pixel."""
+    import cv2
+    import supervision as sv
+
+    from service import OverlayRenderer
+    from service.overlay import draw_boxes
+
+    frame = np.random.default_rng(0).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+    expected = frame.copy()
+    for text, y in (("Person: 16", 30), ("Head: 4", 60), ("Crowded", 100)):
+        cv2.putText(expected, text, (320 - 200, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+    renderer = OverlayRenderer(crowd_threshold=15, vectorize_above=2)
+    empty = sv.Detections.empty()
+    assert np.array_equal(renderer.render(frame.copy(), empty, 16, 4), expected)
+
+    xyxy = np.array([[10, 20, 60, 90], [-5, 100, 40, 250], [30.4, 40.6, 200, 120]])
+    expected = frame.copy()
+    for x1, y1, x2, y2 in np.round(xyxy).astype(int):
+        cv2.rectangle(expected, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    assert np.array_equal(draw_boxes(frame.copy(), xyxy, (0, 255, 0)), expected)
+
+    detections = sv.Detections(xyxy=xyxy, class_id=np.array([0, 1, 0]), data={"class_name": np.array(["a", "b", "a"])})
+    crowd = renderer.render(frame.copy(), detections, 2, 1)
+    assert not np.array_equal(crowd, frame)
+
+
+def test_class_counter():
+    """Test bincount-based per-class counts with confidence filtering and missing classes."""
+    import supervision as sv
+
+    from service import ClassCounter, CountingStage, FramePacket
+    from ultralytics.engine.results import Results
+
+    names = {0: "Person", 1: "Head", 2: "Bag"}
+    boxes = torch.tensor([[0, 0, 10, 10, 0.9, 0], [0, 0, 5, 5, 0.2, 0], [1, 1, 4, 4, 0.8, 1], [2, 2, 9, 9, 0.5, 0]])
+    results = Results(np.zeros((20, 20, 3), dtype=np.uint8), path="", names=names, boxes=boxes)
+    counter = ClassCounter(names, conf=0.25)
+    assert counter(results).tolist() == [2, 1, 0]
+    assert counter(sv.Detections.from_ultralytics(results)).tolist() == [2, 1, 0]
+    assert ClassCounter(["Person"]).get(counter(results), "Head") == 0
+
+    stage = CountingStage(names, conf=0.25, fields={"person_count": "Person", "head_count": "Head", "car": "Car"})
+    packet = FramePacket(index=0, image=None, results=results)
+    stage.process(packet)
+    assert packet.data["person_count"] == 2 and packet.data["head_count"] == 1 and packet.data["car"] == 0
+
+
+@pytest.mark.parametrize("drop", ["oldest", "newest", "block"])
+def test_frame_encoder(tmp_path, drop):
+    """Test that frames reach the encoder process through the pipe and the drop policy bounds the queue."""
+    import sys
+
+    from service import FrameEncoder
+
+    out = tmp_path / "frames.raw"
+    slow_reader = (
+        "import shutil, sys, time; time.sleep(0.5); shutil.copyfileobj(sys.stdin.buffer, open(sys.argv[1], 'wb'))"
+    )
+    encoder = FrameEncoder([sys.executable, "-c", slow_reader, str(out)], queue_size=2, drop=drop)
+    frames = [np.full((64, 64, 3), i, dtype=np.uint8) for i in range(40)]
+    for frame in frames:
+        encoder.write(frame)
+    encoder.close()
+    stats = encoder.stats()
+    data = np.fromfile(out, dtype=np.uint8).reshape(-1, 64, 64, 3)
+    assert stats["frames_written"] + stats["frames_dropped"] == 40 and len(data) == stats["frames_written"]
+    assert (stats["frames_dropped"] == 0) == (drop == "block")
+    if drop != "newest":
+        assert data[-1, 0, 0, 0] == 39  # the latest frame is never dropped
+
+
+def test_hls_outputs(tmp_path):
+    """Test rolling/low-latency HLS options and pruning of old per-job output directories."""
+    import os
+
+    from service.hls import hls_params, prune_job_dirs
+
+    live = hls_params(str(tmp_path), fps=25, list_size=6)
+    assert live["-hls_list_size"] == 6 and "delete_segments" in live["-hls_flags"] and live["-g"] == 50
+    assert "delete_segments" not in hls_params(str(tmp_path), fps=25, list_size=0)["-hls_flags"]
+    ll = hls_params(str(tmp_path), fps=30, vcodec="h264_nvenc", low_latency=True)
+    assert ll["-hls_time"] == 0.5 and ll["-g"] == 15 and ll["-hls_segment_type"] == "fmp4" and "-preset" not in ll
+
+    for i in range(5):
+        (tmp_path / f"job{i}").mkdir()
+        os.utime(tmp_path / f"job{i}", (time.time() + i, time.time() + i))
+    assert prune_job_dirs(str(tmp_path), keep=2, active=["job0"]) == 2  # job0 is still running
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["job0", "job3", "job4"]
+    assert prune_job_dirs(str(tmp_path), keep=2) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["job3", "job4"]
+
+
+def test_hls_resume(tmp_path):
+    """Test that resuming an HLS output drops the segments written after the checkpoint and appends to the playlist."""
+    from service.hls import hls_params, playlist_segments, resume_hls
+
+    playlist = tmp_path / "output.m3u8"
+    assert playlist_segments(str(playlist)) == []
+    header = "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:3\n"
+    segments = "".join(f"#EXTINF:2.000000,\nsegment_{i:05d}.ts\n" for i in range(3, 8))
+    playlist.write_text(header + segments + "#EXT-X-ENDLIST\n")
+    assert playlist_segments(str(playlist)) == [3, 4, 5, 6, 7]
+
+    params = resume_hls(str(playlist), 6, hls_params(str(tmp_path), fps=25))
+    assert playlist_segments(str(playlist)) == [3, 4, 5] and "ENDLIST" not in playlist.read_text()
+    assert playlist.read_text().startswith(header)
+    assert params["-start_number"] == 6 and params["-hls_flags"].endswith("+append_list+discont_start")
+
+
+def test_heatmap_snapshots(tmp_path):
+    """Test per-interval heatmap snapshots and heatmaps summed over time windows."""
+    from service import FramePacket, HeatmapSnapshotStage, HeatmapStore, VideoInfo
+    from ultralytics.engine.results import Results
+
+    now = [1000.0]
+    store = HeatmapStore(str(tmp_path))
+    stage = HeatmapSnapshotStage(store, "cam1", interval=60, grid=8, kernel="rect", clock=lambda: now[0])
+    stage.open(VideoInfo(path="", width=160, height=120, fps=1, frames=0))
+    boxes = torch.tensor([[0, 0, 16, 16, 0.9, 0]])
+    results = Results(np.zeros((120, 160, 3), dtype=np.uint8), path="", names={0: "Person"}, boxes=boxes)
+    for i in range(150):  # 1000..1149 s: buckets 960, 1020, 1080 and 1140
+        now[0] = 1000.0 + i
+        stage.process(FramePacket(index=i, image=None, results=results))
+    stage.close()
+    assert store.keys() == ["cam1"] and store.snapshots("cam1") == [960, 1020, 1080, 1140]
+
+    assert stage.stats()["snapshots"] == 4
+    heat, meta = store.query("cam1")
+    assert heat.shape == (15, 20) and meta["frames"] == 150 and meta["end"] == 1149.0
+    assert heat[:2, :2].sum() == pytest.approx(150 * 16 * 16 * 2)
+    heat, meta = store.query("cam1", start=1020, end=1080)
+    assert meta["frames"] == 60 and meta["snapshots"] == 1
+    assert store.query("cam1", start=2000)[0] is None
+    assert store.render("cam1", end=1020).shape == (120, 160, 3)
+    with pytest.raises(ValueError):
+        store.query("../cam1")
+
+
+def test_camera_hub(tmp_path):
+    """Test one batched predict call per tick across cameras, per-camera stages and reconnects of a lost source."""
+    import cv2
+
+    from service import CameraHub, Stage
+    from ultralytics.engine.results import Results
+
+    video = str(tmp_path / "cam.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(5):
+        writer.write(np.full((48, 64, 3), i * 40, dtype=np.uint8))
+    writer.release()
+
+    class Model:
+        batches = []
+        unlocked = []
+
+        def predict(self, frames, **kwargs):
+            self.batches.append(len(frames))
+            self.unlocked.append(hub._lock.acquire(blocking=False))  # status/register do not wait for inference
+            if self.unlocked[-1]:
+                hub._lock.release()
+            return [Results(f, path="", names={0: "Person"}, boxes=torch.zeros((0, 6))) for f in frames]
+
+    class Recorder(Stage):
+        def __init__(self):
+            self.frames, self.info, self.closed = 0, None, False
+
+        def open(self, info):
+            self.info = info
+
+        def process(self, packet):
+            self.frames += 1
+
+        def close(self):
+            self.closed = True
+
+    recorders = {}
+    hub = CameraHub(Model(), stages=lambda camera_id: [recorders.setdefault(camera_id, Recorder())], fps=5)
+    for camera_id in ("a", "b"):
+        hub.register(camera_id, video, backoff=0.05, max_backoff=0.1)
+    with pytest.raises(ValueError):
+        hub.register("a", video)
+    deadline = time.time() + 10
+    while any(c["frames_read"] == 0 for c in hub.status()["cameras"]) and time.time() < deadline:
+        time.sleep(0.01)
+    assert hub.tick() == 2 and Model.batches == [2] and Model.unlocked == [True]
+    assert recorders["a"].frames == 1 and recorders["a"].info.width == 64
+    while hub.status()["cameras"][0]["reconnects"] == 0 and time.time() < deadline:  # 5-frame file ends quickly
+        time.sleep(0.01)
+    assert hub.status()["cameras"][0]["reconnects"] > 0
+
+    hub.unregister("a")
+    assert recorders["a"].closed and [c["camera_id"] for c in hub.status()["cameras"]] == ["b"]
+    with pytest.raises(KeyError):
+        hub.unregister("a")
+    hub.stop()
+    assert recorders["b"].closed and hub.status()["cameras"] == []
+
+
+def test_pipeline_process_decode(tmp_path):
+    """Test that process decoding with shared-memory frames yields the same frames as in-thread decoding."""
+    import cv2
+
+    from service import FramePipeline, Stage
+    from ultralytics.engine.results import Results
+
+    video = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(12):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+
+    class Model:
+        def predict(self, frame, **kwargs):
+            return [Results(frame, path="", names={0: "Person"}, boxes=torch.zeros((0, 6)))]
+
+    class Recorder(Stage):
+        def open(self, info):
+            self.info, self.frames = info, []
+
+        def process(self, packet):
+            self.frames.append(int(packet.image.mean()))
+
+    seen = {}
+    for decode in ("thread", "process"):
+        recorder = Recorder()
+        assert FramePipeline(Model(), [recorder], decode=decode).run(video) == 12
+        seen[decode] = recorder.frames, (recorder.info.width, recorder.info.height, recorder.info.frames)
+    assert seen["process"] == seen["thread"]
+    with pytest.raises(ValueError):
+        FramePipeline(Model(), [], decode="gpu")
+
+
+def test_pipeline_resume(tmp_path):
+    """Test that a job resumed from a checkpoint continues frames, tracks and heatmap like an uninterrupted run."""
+    import cv2
+
+    from service import CheckpointStore, FramePipeline, HeatmapOverlayStage, HeatmapSnapshotStage, HeatmapStore, Stage
+    from ultralytics.engine.results import Results
+
+    video = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+    class Model:
+        def predict(self, frame, **kwargs):
+            x = float(frame.mean()) / 10  # one person walking right
+            boxes = torch.tensor([[x, 10.0, x + 20, 40.0, 0.9, 0]])
+            return [Results(frame, path="", names={0: "Person"}, boxes=boxes)]
+
+    class Recorder(Stage):
+        def __init__(self):
+            self.frames = []
+
+        def process(self, packet):
+            self.frames.append((packet.index, int(packet.results.boxes.id[0])))
+
+    def run(root, **kwargs):
+        recorder = Recorder()
+        heatmaps = HeatmapSnapshotStage(HeatmapStore(str(tmp_path / root)), "job", grid=4, clock=lambda: 600.0)
+        overlay = HeatmapOverlayStage(str(tmp_path / root / "overlay"), {0: "Person"}, grid=4)
+        pipeline = FramePipeline(Model(), [recorder, heatmaps, overlay])
+        pipeline.run(video, **kwargs)
+        return recorder.frames, heatmaps.store.query("job")[0], overlay
+
+    frames, heat, overlay = run("full")
+
+    store, stop = CheckpointStore(str(tmp_path / "checkpoints")), threading.Event()
+    first, _, _ = run(
+        "resumed",
+        stop=stop,
+        progress=lambda n, info: n == 13 and stop.set(),  # stops after a checkpoint at 10, like a crash
+        checkpoint=lambda state: store.save("job", state),
+        checkpoint_interval=5,
+    )
+    assert len(first) == 13 and store.keys() == ["job"] and store.load("job")["frame"] == 10
+    second, resumed_heat, resumed_overlay = run("resumed", resume=store.load("job"))
+    assert [i for i, _ in second] == list(range(10, 20))
+    assert second[0][1] == first[9][1]  # the track keeps its ID across the restart
+    np.testing.assert_allclose(resumed_heat, heat)
+    for name in ("decayed", "total"):  # the decayed overlay heat continues instead of restarting empty
+        expected, resumed = overlay.state()[name], resumed_overlay.state()[name]
+        np.testing.assert_allclose(resumed.value(), expected.value(), rtol=1e-5)
+    assert [i for i, _ in first[:10] + second] == [i for i, _ in frames]
+
+
+def test_detection_cache(tmp_path):
+    """Test that cached detections replay a run without inference, including frames the detector skipped."""
+    import cv2
+
+    from service import DetectionCache, FramePipeline, Stage
+    from service.cache import file_hash
+    from ultralytics.engine.results import Results
+
+    video = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(12):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+
+    class Model:
+        calls = 0
+
+        def predict(self, frame, **kwargs):
+            Model.calls += 1
+            x = float(frame.mean()) / 10
+            boxes = torch.tensor([[x, 10.0, x + 20, 40.0, 0.9, 0], [40.0, 5.0, 60.0, 30.0, 0.3, 1]])
+            return [Results(frame, path="", names={0: "Person", 1: "Head"}, boxes=boxes)]
+
+    class Recorder(Stage):
+        def __init__(self):
+            self.frames = []
+
+        def process(self, packet):
+            self.frames.append((packet.detected, packet.results.boxes.data[:, [0, 1, 2, 3, 5, 6]].tolist()))
+
+    cache = DetectionCache(str(tmp_path / "cache"))
+    key = cache.key(file_hash(video), "model", stride=2)
+    assert key == cache.key(file_hash(video), "model", stride=2) != cache.key(file_hash(video), "model", stride=1)
+    assert cache.get(key) is None
+
+    recorded = Recorder()
+    FramePipeline(Model(), [recorded], stride=2).run(video, record=cache.recorder(key))
+    assert Model.calls == 6
+
+    replay = cache.get(key)
+    assert len(replay) == 12 and replay.detected.tolist() == [True, False] * 6 and isinstance(replay.xyxy, np.memmap)
+    replayed = Recorder()
+    FramePipeline(Model(), [replayed], stride=2).run(video, replay=replay)
+    assert Model.calls == 6 and replayed.frames == recorded.frames
+
+    size = sum(f.stat().st_size for f in (tmp_path / "cache" / key).iterdir())
+    cache.max_bytes = size * 3 // 2  # room for one entry
+    other = cache.key(file_hash(video), "model", stride=1)
+    FramePipeline(Model(), [Recorder()], stride=2).run(video, record=cache.recorder(other))
+    assert cache.get(key) is None and cache.get(other) is not None  # the least recently used entry was evicted
+    cache.max_bytes, cache.max_age = None, 0
+    assert cache.prune() == 1 and cache.get(other) is None
+
+
+def test_preview_channel():
+    """Test that preview viewers share one JPEG encode per frame, skip to the newest frame and end with the job."""
+    from service import PreviewHub
+
+    hub = PreviewHub(quality=70)
+    channel = hub.open("job")
+    frames = [np.full((48, 64, 3), i * 40, dtype=np.uint8) for i in range(4)]
+    channel.publish(frames[0])
+    seq, jpeg = channel.get(0)
+    assert seq == 1 and jpeg[:2] == b"\xff\xd8" and channel.get(0) == (seq, jpeg) and channel.encodes == 1
+
+    for frame in frames[1:]:
+        channel.publish(frame)
+    assert channel.get(seq)[0] == 4 and channel.encodes == 2  # a slow viewer skips frames 2 and 3
+    assert channel.get(4, timeout=0.01) == (4, None)
+
+    stream = channel.stream(timeout=0.01)
+    part = next(stream)
+    assert part.startswith(b"--frame\r\nContent-Type: image/jpeg\r\n") and channel.viewers == 1
+    hub.close("job", hub.open("job"))  # a new run replaced the channel, its viewers reached the end
+    assert list(stream) == [] and channel.closed and channel.viewers == 0 and hub.get("job") is None
+
+
+def test_edge_detector(tmp_path):
+    """Test that the torch-free ONNX detector returns exactly the detections of the ultralytics predictor."""
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    import subprocess
+    import sys
+
+    import cv2
+
+    from service import ClassCounter, EdgeDetector
+    from service.benchmarks import make_onnx_detector
+    from ultralytics import YOLO
+
+    weights = make_onnx_detector(str(tmp_path / "detector.onnx"), imgsz=320)
+    rng = np.random.default_rng(0)
+    image = cv2.resize(rng.integers(0, 255, (12, 20, 3), dtype=np.uint8), (640, 360), interpolation=cv2.INTER_NEAREST)
+    for args in {}, {"conf": 0.5, "agnostic_nms": True}, {"classes": [1], "max_det": 10}:
+        expected = YOLO(weights, task="detect").predict(image, imgsz=320, verbose=False, **args)[0]
+        result = EdgeDetector(weights, **args)(image)[0]
+        assert len(result) and np.array_equal(result.boxes.data, expected.boxes.data.numpy())
+        assert result.names == expected.names == {0: "person", 1: "head"}
+        assert ClassCounter(result.names)(result).tolist() == ClassCounter(expected.names)(expected).tolist()
+
+    code = "import sys, service.edge; assert not {'torch', 'torchvision', 'ultralytics'} & set(sys.modules)"
+    subprocess.run([sys.executable, "-c", code], check=True)
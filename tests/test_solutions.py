@@ -1,6 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
 import cv2
+import numpy as np
 import pytest
 
 from ultralytics import YOLO, solutions
@@ -37,6 +38,46 @@ def test_major_solutions():
     cv2.destroyAllWindows()
 
 
+def test_heatmap_accumulator():
+    """Test that sprite stamping with lazy decay matches full-frame circle masks with per-frame decay."""
+    rng = np.random.default_rng(0)
+    reference = np.zeros((240, 320), dtype=np.float32)
+    # min_scale=0.05 renormalizes the array every 29 frames
+    accumulator = solutions.HeatmapAccumulator((240, 320, 3), decay=0.9, min_scale=0.05)
+    for _ in range(40):
+        xy = rng.uniform(0, (300, 220), (8, 2))
+        boxes = np.concatenate([xy, np.minimum(xy + rng.uniform(4, 90, (8, 2)), (320, 240))], 1)
+        reference *= 0.9
+        y, x = np.ogrid[0:240, 0:320]
+        for x1, y1, x2, y2 in boxes:
+            radius = min(int(x2) - int(x1), int(y2) - int(y1)) // 2
+            mask = (x - int((x1 + x2) // 2)) ** 2 + (y - int((y1 + y2) // 2)) ** 2 <= radius**2
+            reference[int(y1) : int(y2), int(x1) : int(x2)] += 2 * mask[int(y1) : int(y2), int(x1) : int(x2)]
+        accumulator.step()
+        accumulator.add(boxes)
+    np.testing.assert_allclose(accumulator.value(), reference, rtol=1e-4, atol=1e-4)
+
+    gaussian = solutions.HeatmapAccumulator((240, 320), kernel="gaussian")
+    gaussian.add([[100, 100, 140, 180]])
+    heat = gaussian.value()
+    assert heat[140, 120] == pytest.approx(2.0) and heat[100:180, 100:140].sum() == heat.sum()
+
+
+def test_heatmap_grid():
+    """Test that coarse-grid accumulation keeps heat totals and renders at the frame size."""
+    boxes = [[16, 24, 80, 120], [200, 100, 260, 230]]
+    full = solutions.HeatmapAccumulator((240, 321), kernel="rect", decay=1)
+    coarse = solutions.HeatmapAccumulator((240, 321), kernel="rect", decay=1, grid=8)
+    for _ in range(3):
+        for accumulator in full, coarse:
+            accumulator.step()
+            accumulator.add(boxes)
+    assert coarse.heat.shape == (30, 41) and coarse.scale == 1.0
+    assert coarse.value().sum() == pytest.approx(full.value().sum(), rel=0.05)
+    image = coarse.render()
+    assert image.shape == (240, 321, 3) and image.dtype == np.uint8
+
+
 @pytest.mark.slow
 def test_aigym():
     """Test the workouts monitoring solution."""
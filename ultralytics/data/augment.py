@@ -1557,6 +1557,46 @@ class LetterBox:
         img = labels.get("img") if image is None else image
         shape = img.shape[:2]  # current shape [height, width]
         new_shape = labels.pop("rect_shape", self.new_shape)
+        if isinstance(new_shape, int):
+            new_shape = (new_shape, new_shape)
+        ratio, new_unpad, (dw, dh), (top, bottom, left, right) = self.geometry(shape, new_shape)
+        if shape[::-1] != new_unpad:  # resize
+            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
+        img = cv2.copyMakeBorder(
+            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
+        )  # add border
+        if labels.get("ratio_pad"):
+            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
+
+        if len(labels):
+            labels = self._update_labels(labels, ratio, dw, dh)
+            labels["img"] = img
+            labels["resized_shape"] = new_shape
+            return labels
+        else:
+            return img
+
+    def geometry(self, shape, new_shape=None):
+        """
+        Computes the resize and padding that letterboxing applies to an image of a given shape.
+
+        Args:
+            shape (Tuple[int, int]): Image shape (height, width).
+            new_shape (int | Tuple[int, int] | None): Target size (height, width), `self.new_shape` if None.
+
+        Returns:
+            ratio (Tuple[float, float]): Width and height scale ratios.
+            new_unpad (Tuple[int, int]): Size (width, height) of the resized image before padding.
+            pad (Tuple[float, float]): Width and height padding, per side if `center` else in total.
+            border (Tuple[int, int, int, int]): Top, bottom, left and right padding in pixels.
+
+        Examples:
+            >>> letterbox = LetterBox(new_shape=(640, 640))
+            >>> ratio, new_unpad, pad, border = letterbox.geometry((1080, 1920))
+            >>> new_unpad, border
+            ((640, 360), (140, 140, 0, 0))
+        """
+        new_shape = self.new_shape if new_shape is None else new_shape
         if isinstance(new_shape, int):
             new_shape = (new_shape, new_shape)
 
@@ -1580,23 +1620,9 @@ class LetterBox:
             dw /= 2  # divide padding into 2 sides
             dh /= 2
 
-        if shape[::-1] != new_unpad:  # resize
-            img = cv2.resize(img, new_unpad, interpolation=cv2.INTER_LINEAR)
         top, bottom = int(round(dh - 0.1)) if self.center else 0, int(round(dh + 0.1))
         left, right = int(round(dw - 0.1)) if self.center else 0, int(round(dw + 0.1))
-        img = cv2.copyMakeBorder(
-            img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114)
-        )  # add border
-        if labels.get("ratio_pad"):
-            labels["ratio_pad"] = (labels["ratio_pad"], (left, top))  # for evaluation
-
-        if len(labels):
-            labels = self._update_labels(labels, ratio, dw, dh)
-            labels["img"] = img
-            labels["resized_shape"] = new_shape
-            return labels
-        else:
-            return img
+        return ratio, new_unpad, (dw, dh), (top, bottom, left, right)
 
     def _update_labels(self, labels, ratio, padw, padh):
         """
@@ -16,6 +16,7 @@ from ultralytics.data.loaders import (
     LoadPilAndNumpy,
     LoadScreenshots,
     LoadStreams,
+    LoadStreamsProcess,
     LoadTensor,
     SourceTypes,
     autocast_list,
@@ -171,7 +172,7 @@ def check_source(source):
     return source, webcam, screenshot, from_img, in_memory, tensor
 
 
-def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
+def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False, decode="thread"):
     """
     Loads an inference source for object detection and applies necessary transformations.
 
@@ -180,6 +181,8 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
         batch (int, optional): Batch size for dataloaders. Default is 1.
         vid_stride (int, optional): The frame interval for video sources. Default is 1.
         buffer (bool, optional): Determined whether stream frames will be buffered. Default is False.
+        decode (str, optional): Decode streams on threads ('thread') or each in its own process with shared-memory
+            frame handoff ('process'). Default is 'thread'.
 
     Returns:
         dataset (Dataset): A dataset object for the specified input source.
@@ -193,7 +196,10 @@ def load_inference_source(source=None, batch=1, vid_stride=1, buffer=False):
     elif in_memory:
         dataset = source
     elif stream:
-        dataset = LoadStreams(source, vid_stride=vid_stride, buffer=buffer)
+        if decode not in {"thread", "process"}:
+            raise ValueError(f"Invalid decode '{decode}', valid values are ['thread', 'process']")
+        loader = LoadStreamsProcess if decode == "process" else LoadStreams
+        dataset = loader(source, vid_stride=vid_stride, buffer=buffer)
     elif screenshot:
         dataset = LoadScreenshots(source)
     elif from_img:
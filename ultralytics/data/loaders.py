@@ -2,11 +2,16 @@
 
 import glob
 import math
+import multiprocessing
 import os
+import queue
+import sys
 import time
+from collections import deque
 from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
 from pathlib import Path
-from threading import Thread
+from threading import Condition, Thread
 from urllib.parse import urlparse
 
 import cv2
@@ -30,6 +35,87 @@ class SourceTypes:
     tensor: bool = False
 
 
+class FrameRing:
+    """
+    Preallocated ring of frame slots between one reader thread and one consumer, signalled with a condition variable.
+
+    The reader acquires a free slot, decodes into it (e.g. `cv2.VideoCapture.retrieve(slot)`) and commits it; the
+    consumer wakes as soon as a frame is committed. In FIFO mode the reader waits while `capacity` frames are ready;
+    in latest-frame mode a commit drops the frame that was ready but not consumed yet. The consumer gets the slot array
+    itself, and the last `hold` frames it got are never written to. A slot is only reused once nothing outside the
+    ring references it anymore, otherwise (e.g. a frame kept in a `Results` object) it is replaced by a new array.
+
+    Attributes:
+        latest (bool): Latest-frame mode, otherwise FIFO.
+        capacity (int): Frames ready for the consumer at most, 1 in latest-frame mode.
+        hold (int): Frames most recently returned by `get` that stay untouched.
+        slots (list): Frame arrays.
+        dropped (int): Frames dropped by latest-frame mode before being consumed.
+        closed (bool): Whether `close` was called.
+    """
+
+    def __init__(self, shape, capacity=30, latest=False, hold=2, dtype=np.uint8):
+        """Preallocate slots for frames of `shape`."""
+        self.latest = latest
+        self.capacity = 1 if latest else max(capacity, 1)
+        self.hold = hold
+        n = self.capacity + hold + 1  # ready frames, frames held by the consumer and the frame being written
+        self.slots = [np.zeros(shape, dtype=dtype) for _ in range(n)]
+        self.free = deque(range(n))
+        self.ready = deque()
+        self.held = deque()
+        self.dropped = 0
+        self.closed = False
+        self.cond = Condition()
+
+    def __len__(self):
+        """Return the number of frames ready for the consumer."""
+        return len(self.ready)
+
+    def acquire(self):
+        """Return (index, array) of a free slot, waiting for room in FIFO mode, or (None, None) once closed."""
+        with self.cond:
+            while not self.closed and len(self.ready) >= self.capacity and not self.latest:
+                self.cond.wait()
+            if self.closed:
+                return None, None
+            i = self.free.popleft()
+            return i, self.slots[i]
+
+    def commit(self, i, frame=None):
+        """Publish slot `i`, `frame` replaces the slot array if the frame was decoded into a new one (e.g. new size)."""
+        with self.cond:
+            if frame is not None and frame is not self.slots[i]:
+                self.slots[i] = frame
+            if self.latest:
+                self.dropped += len(self.ready)
+                self.free.extend(self.ready)
+                self.ready.clear()
+            self.ready.append(i)
+            self.cond.notify_all()
+
+    def get(self, timeout=None):
+        """Return the next frame (oldest in FIFO mode, newest in latest-frame mode), None after `timeout` seconds."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.ready or self.closed, timeout) or not self.ready:
+                return None
+            i = self.ready.popleft()
+            self.held.append(i)
+            if len(self.held) > self.hold:
+                j = self.held.popleft()
+                if sys.getrefcount(self.slots[j]) > 2:  # the list and the argument, anything else still uses it
+                    self.slots[j] = np.empty_like(self.slots[j])
+                self.free.append(j)
+            self.cond.notify_all()
+            return self.slots[i]
+
+    def close(self):
+        """Wake up a waiting reader and consumer, `acquire` returns (None, None) afterwards."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
 class LoadStreams:
     """
     Stream Loader for various types of video streams, Supports RTSP, RTMP, HTTP, and TCP streams.
@@ -40,7 +126,7 @@ class LoadStreams:
         buffer (bool): Whether to buffer input streams, defaults to False.
         running (bool): Flag to indicate if the streaming thread is running.
         mode (str): Set to 'stream' indicating real-time capture.
-        imgs (list): List of image frames for each stream.
+        imgs (list): List of `FrameRing` frame buffers for each stream.
         fps (list): List of FPS for each stream.
         frames (list): List of total frames for each stream.
         threads (list): List of threads for each stream.
@@ -77,21 +163,13 @@ class LoadStreams:
         self.frames = [0] * n
         self.threads = [None] * n
         self.caps = [None] * n  # video capture objects
-        self.imgs = [[] for _ in range(n)]  # images
+        self.imgs = [None] * n  # frame rings
         self.shape = [[] for _ in range(n)]  # image shapes
         self.sources = [ops.clean_str(x) for x in sources]  # clean source names for later
         for i, s in enumerate(sources):  # index, source
             # Start thread to read frames from video stream
             st = f"{i + 1}/{n}: {s}... "
-            if urlparse(s).hostname in {"www.youtube.com", "youtube.com", "youtu.be"}:  # if source is YouTube video
-                # YouTube format i.e. 'https://www.youtube.com/watch?v=Jsn8D3aC840' or 'https://youtu.be/Jsn8D3aC840'
-                s = get_best_youtube_url(s)
-            s = eval(s) if s.isnumeric() else s  # i.e. s = '0' local webcam
-            if s == 0 and (IS_COLAB or IS_KAGGLE):
-                raise NotImplementedError(
-                    "'source=0' webcam not supported in Colab and Kaggle notebooks. "
-                    "Try running 'source=0' in a local environment."
-                )
+            s = resolve_stream_source(s)
             self.caps[i] = cv2.VideoCapture(s)  # store video capture object
             if not self.caps[i].isOpened():
                 raise ConnectionError(f"{st}Failed to open {s}")
@@ -106,7 +184,8 @@ class LoadStreams:
             success, im = self.caps[i].read()  # guarantee first frame
             if not success or im is None:
                 raise ConnectionError(f"{st}Failed to read images from {s}")
-            self.imgs[i].append(im)
+            self.imgs[i] = FrameRing(im.shape, capacity=30, latest=not self.buffer)  # keep a <=30-image buffer
+            self.imgs[i].commit(self.imgs[i].acquire()[0], im)
             self.shape[i] = im.shape
             self.threads[i] = Thread(target=self.update, args=([i, self.caps[i], s]), daemon=True)
             LOGGER.info(f"{st}Success ✅ ({self.frames[i]} frames of shape {w}x{h} at {self.fps[i]:.2f} FPS)")
@@ -115,27 +194,28 @@ class LoadStreams:
 
     def update(self, i, cap, stream):
         """Read stream `i` frames in daemon thread."""
-        n, f = 0, self.frames[i]  # frame number, frame array
+        n, f, ring = 0, self.frames[i], self.imgs[i]  # frame number, frame array, frame buffer
         while self.running and cap.isOpened() and n < (f - 1):
-            if len(self.imgs[i]) < 30:  # keep a <=30-image buffer
-                n += 1
-                cap.grab()  # .read() = .grab() followed by .retrieve()
-                if n % self.vid_stride == 0:
-                    success, im = cap.retrieve()
-                    if not success:
-                        im = np.zeros(self.shape[i], dtype=np.uint8)
-                        LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
-                        cap.open(stream)  # re-open stream if signal was lost
-                    if self.buffer:
-                        self.imgs[i].append(im)
-                    else:
-                        self.imgs[i] = [im]
-            else:
-                time.sleep(0.01)  # wait until the buffer is empty
+            n += 1
+            cap.grab()  # .read() = .grab() followed by .retrieve()
+            if n % self.vid_stride == 0:
+                slot, im = ring.acquire()  # waits until the buffer has room in FIFO mode
+                if slot is None:
+                    break
+                success, im = cap.retrieve(im)  # decode into the preallocated slot
+                if not success:
+                    im = ring.slots[slot]
+                    im[:] = 0
+                    LOGGER.warning("WARNING ⚠️ Video stream unresponsive, please check your IP camera connection.")
+                    cap.open(stream)  # re-open stream if signal was lost
+                ring.commit(slot, im)
 
     def close(self):
         """Close stream loader and release resources."""
         self.running = False  # stop flag for Thread
+        for ring in self.imgs:
+            if ring is not None:
+                ring.close()  # wake up threads waiting for buffer room
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)  # Add timeout
@@ -156,31 +236,264 @@ class LoadStreams:
         self.count += 1
 
         images = []
-        for i, x in enumerate(self.imgs):
-            # Wait until a frame is available in each buffer
-            while not x:
+        for i, ring in enumerate(self.imgs):
+            # Wait until a frame is available in each buffer, the reader thread wakes us as soon as it has one. The
+            # ring returns the first frame in buffer mode and the last frame, dropping older ones, otherwise
+            while (im := ring.get(timeout=1 / min(self.fps))) is None:
                 if not self.threads[i].is_alive() or cv2.waitKey(1) == ord("q"):  # q to quit
                     self.close()
                     raise StopIteration
-                time.sleep(1 / min(self.fps))
-                x = self.imgs[i]
-                if not x:
-                    LOGGER.warning(f"WARNING ⚠️ Waiting for stream {i}")
+                LOGGER.warning(f"WARNING ⚠️ Waiting for stream {i}")
+            images.append(im)
 
-            # Get and remove the first frame from imgs buffer
-            if self.buffer:
-                images.append(x.pop(0))
+        return self.sources, images, [""] * self.bs
 
-            # Get the last frame, and clear the rest from the imgs buffer
-            else:
-                images.append(x.pop(-1) if x else np.zeros(self.shape[i], dtype=np.uint8))
-                x.clear()
+    def __len__(self):
+        """Return the length of the sources object."""
+        return self.bs  # 1E12 frames = 32 streams at 30 FPS for 30 years
+
+
+def _shared_memory_decode(source, vid_stride, latest, start, meta, free, ready, stop):
+    """Decode process of `SharedMemoryDecoder`, writes frames of `source` into the slots it receives on `free`."""
+    source = resolve_stream_source(source)
+    cap = cv2.VideoCapture(source)
+    if start and cap.isOpened():
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    success, im = cap.read() if cap.isOpened() else (False, None)  # guarantee first frame
+    if not success or im is None:
+        meta.put((None, f"Failed to open or read images from {source}", None))
+        return
+    fps = cap.get(cv2.CAP_PROP_FPS)  # warning: may return 0 or nan
+    fps = max((fps if math.isfinite(fps) else 0) % 100, 0) or 30  # 30 FPS fallback
+    frames = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0) or float("inf")  # infinite stream fallback
+    meta.put((im.shape, fps, frames))
+
+    shm = shared_memory.SharedMemory(name=free.get())  # created and unlinked by the reading process
+    views = [np.ndarray(im.shape, dtype=np.uint8, buffer=shm.buf, offset=i * im.nbytes) for i in range(free.get())]
+    try:
+        n, i = start, free.get()
+        views[i][:] = im
+        ready.put(i)
+        while not stop.is_set() and n < (frames - 1):
+            n += 1
+            if not cap.grab():  # .read() = .grab() followed by .retrieve()
+                break
+            if n % vid_stride:
+                continue
+            try:  # latest-frame mode keeps grabbing while all slots are in use, FIFO mode waits for a slot
+                i = free.get_nowait() if latest else free.get()
+            except queue.Empty:
+                continue
+            if i is None:
+                break
+            success, im = cap.retrieve(views[i])  # decode into the slot
+            if not success:
+                views[i][:] = 0
+                cap.open(source)  # re-open stream if signal was lost
+            elif im is not views[i]:  # the source changed its frame size
+                views[i][:] = cv2.resize(im, views[i].shape[1::-1])
+            ready.put(i)
+    finally:
+        ready.put(None)  # end of stream
+        del views
+        shm.close()
+        cap.release()
+
+
+class SharedMemoryDecoder:
+    """
+    Decodes one video or stream in a separate process into shared-memory frame slots.
+
+    The decode process writes frames into a `multiprocessing.shared_memory` block holding `slots` frames and passes
+    only slot indices through queues, so decoding and colour conversion never contend for the GIL of the inference
+    process and frames arrive as zero-copy numpy views. Like `FrameRing`, the last `hold` frames returned by `read` are
+    never written to. A slot that is still referenced after that (e.g. by a `Results` object) is kept out of use until
+    it is released, so a consumer that keeps every frame stalls the decoder instead of seeing frames overwritten.
+
+    Attributes:
+        source (str): Video file, stream URL or webcam index.
+        latest (bool): Latest-frame mode (frames not yet read are dropped for newer ones), otherwise FIFO.
+        shape (tuple): Frame shape.
+        fps (float): Frame rate reported by the source.
+        frames (int | float): Frame count of the source, `inf` for streams.
+        ended (bool): Whether the decode process reached the end of the source.
+        process (multiprocessing.Process): Decode process.
+    """
+
+    def __init__(self, source, vid_stride=1, latest=False, slots=8, hold=2, timeout=30.0, start=0):
+        """Start decoding from frame `start` and allocate the shared-memory slots once the frame size is known."""
+        ctx = multiprocessing.get_context()  # platform default, fork on Linux starts without re-importing torch
+        self.source = str(source)
+        self.latest = latest
+        self.hold = hold
+        self.ended = False
+        self._meta, self._free, self._ready, self._stop = ctx.Queue(), ctx.Queue(), ctx.Queue(), ctx.Event()
+        args = (self.source, max(int(vid_stride), 1), latest, int(start))
+        args += (self._meta, self._free, self._ready, self._stop)
+        self.process = ctx.Process(target=_shared_memory_decode, args=args, daemon=True)
+        resource_tracker.ensure_running()  # shared with the decode process, which would otherwise start its own
+        self.process.start()
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self.shape, self.fps, self.frames = self._meta.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if not self.process.is_alive() or time.time() > deadline:
+                    self.process.terminate()
+                    reason = "timed out" if self.process.exitcode is None else "decode process exited"
+                    raise ConnectionError(f"Failed to open {self.source}, {reason}") from None
+        if self.shape is None:
+            raise ConnectionError(self.fps)
+
+        n = max(slots, hold + 2)
+        nbytes = int(np.prod(self.shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=n * nbytes)
+        self.views = [np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=i * nbytes) for i in range(n)]
+        self._free.put(self.shm.name)
+        self._free.put(n)
+        for i in range(n):
+            self._free.put(i)
+        self._held = deque()
+        self._pinned = []
+        self._warned = False
+
+    def read(self, timeout=None):
+        """Return the next frame as a view into shared memory, None after `timeout` seconds or at the end."""
+        if self.ended:
+            return None
+        try:
+            i = self._ready.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if self.latest:  # skip to the newest decoded frame
+            while i is not None:
+                try:
+                    j = self._ready.get_nowait()
+                except queue.Empty:
+                    break
+                if j is None:
+                    self.ended = True
+                    break
+                self._free.put(i)
+                i = j
+        if i is None:
+            self.ended = True
+            return None
+        self._held.append(i)
+        self._pinned = [j for j in self._pinned if not self._release(j)]
+        while len(self._held) > self.hold:
+            j = self._held.popleft()
+            if not self._release(j):
+                self._pinned.append(j)
+        return self.views[i]
+
+    def _release(self, i):
+        """Return slot `i` to the decoder unless its view is still referenced outside the decoder."""
+        if sys.getrefcount(self.views[i]) > 2:  # the list and the argument, anything else still uses it
+            if not self._warned and len(self._pinned) >= len(self.views) - self.hold - 2:
+                LOGGER.warning(
+                    f"WARNING ⚠️ Frames of {self.source} are kept after inference, the decoder waits until they are "
+                    "released. Copy frames that are kept, e.g. 'frame.copy()'."
+                )
+                self._warned = True
+            return False
+        self._free.put(i)
+        return True
+
+    def alive(self):
+        """Return True while the decode process is running."""
+        return self.process.is_alive()
+
+    def close(self):
+        """Stop the decode process and free the shared memory."""
+        self._stop.set()
+        self._free.put(None)  # wake up a decoder waiting for a slot
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.views = []
+        try:
+            self.shm.close()
+        except BufferError:  # frames are still referenced, the memory is released with them
+            pass
+        self.shm.unlink()
+
+
+class LoadStreamsProcess:
+    """
+    Stream loader like `LoadStreams` that decodes every stream in its own process with shared-memory frame handoff.
+
+    Selected with `load_inference_source(..., decode='process')` or `stream_decode='process'` for predictions. Returned
+    frames are zero-copy views into shared memory, see `SharedMemoryDecoder`.
 
+    Attributes:
+        sources (list): Cleaned source names.
+        vid_stride (int): Video frame-rate stride.
+        buffer (bool): Whether to buffer input streams (FIFO) instead of returning the latest frame.
+        running (bool): Flag to indicate if the decoders are running.
+        mode (str): Set to 'stream' indicating real-time capture.
+        decoders (list): `SharedMemoryDecoder` of each stream.
+        fps (list): List of FPS for each stream.
+        frames (list): List of total frames for each stream.
+        shape (list): List of shapes for each stream.
+        bs (int): Batch size for processing.
+    """
+
+    def __init__(self, sources="file.streams", vid_stride=1, buffer=False):
+        """Start one decode process per source."""
+        self.buffer = buffer
+        self.running = True
+        self.mode = "stream"
+        self.vid_stride = vid_stride
+        sources = Path(sources).read_text().rsplit() if os.path.isfile(sources) else [sources]
+        self.bs = len(sources)
+        self.sources = [ops.clean_str(x) for x in sources]
+        self.decoders = []
+        for i, s in enumerate(sources):
+            st = f"{i + 1}/{self.bs}: {s}... "
+            try:
+                self.decoders.append(SharedMemoryDecoder(s, vid_stride=vid_stride, latest=not buffer))
+            except ConnectionError as e:
+                self.close()
+                raise ConnectionError(f"{st}{e}") from e
+            d = self.decoders[-1]
+            LOGGER.info(f"{st}Success ✅ ({d.frames} frames of shape {d.shape[1]}x{d.shape[0]} at {d.fps:.2f} FPS)")
+        self.fps = [d.fps for d in self.decoders]
+        self.frames = [d.frames for d in self.decoders]
+        self.shape = [d.shape for d in self.decoders]
+        LOGGER.info("")  # newline
+
+    def close(self):
+        """Stop the decode processes and free their shared memory."""
+        self.running = False
+        for decoder in self.decoders:
+            decoder.close()
+        self.decoders = []
+
+    def __iter__(self):
+        """Iterates through YOLO image feed."""
+        self.count = -1
+        return self
+
+    def __next__(self):
+        """Returns source paths, shared-memory frames and empty strings for processing."""
+        self.count += 1
+        if not self.running:
+            raise StopIteration
+        images = []
+        for i, decoder in enumerate(self.decoders):
+            while (im := decoder.read(timeout=1 / min(self.fps))) is None:
+                if decoder.ended or not decoder.alive():
+                    self.close()
+                    raise StopIteration
+                LOGGER.warning(f"WARNING ⚠️ Waiting for stream {i}")
+            images.append(im)
         return self.sources, images, [""] * self.bs
 
     def __len__(self):
         """Return the length of the sources object."""
-        return self.bs  # 1E12 frames = 32 streams at 30 FPS for 30 years
+        return self.bs
 
 
 class LoadScreenshots:
@@ -523,6 +836,31 @@ def autocast_list(source):
     return files
 
 
+def resolve_stream_source(source):
+    """
+    Resolve a stream source string to the argument for `cv2.VideoCapture`.
+
+    YouTube URLs are resolved to their best MP4 video stream and numeric strings to local webcam indices, other
+    sources (RTSP, RTMP, HTTP, TCP URLs and files) are returned unchanged.
+
+    Args:
+        source (str): Stream URL, file path or webcam index, e.g. 'rtsp://example.com/media.mp4' or '0'.
+
+    Returns:
+        (str | int): Source for `cv2.VideoCapture`.
+    """
+    if urlparse(source).hostname in {"www.youtube.com", "youtube.com", "youtu.be"}:  # if source is YouTube video
+        # YouTube format i.e. 'https://www.youtube.com/watch?v=Jsn8D3aC840' or 'https://youtu.be/Jsn8D3aC840'
+        source = get_best_youtube_url(source)
+    source = eval(source) if source.isnumeric() else source  # i.e. s = '0' local webcam
+    if source == 0 and (IS_COLAB or IS_KAGGLE):
+        raise NotImplementedError(
+            "'source=0' webcam not supported in Colab and Kaggle notebooks. "
+            "Try running 'source=0' in a local environment."
+        )
+    return source
+
+
 def get_best_youtube_url(url, method="pytube"):
     """
     Retrieves the URL of the best quality MP4 video stream from a given YouTube video.
@@ -574,4 +912,4 @@ def get_best_youtube_url(url, method="pytube"):
 
 
 # Define constants
-LOADERS = (LoadStreams, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots)
+LOADERS = (LoadStreams, LoadStreamsProcess, LoadPilAndNumpy, LoadImagesAndVideos, LoadScreenshots)
@@ -47,6 +47,9 @@ from ultralytics.utils.checks import check_imgsz, check_imshow
 from ultralytics.utils.files import increment_path
 from ultralytics.utils.torch_utils import select_device, smart_inference_mode
 
+# uint8 pixel value -> value / 255 in float32, the same values as dividing a float32 tensor by 255
+NORMALIZE_LUT = np.arange(256, dtype=np.float32) / np.float32(255)
+
 STREAM_WARNING = """
 WARNING ⚠️ inference results will accumulate in RAM unless `stream=True` is passed, causing potential out-of-memory
 errors for large sources or long-running streams and videos. See https://docs.ultralytics.com/modes/predict/ for help.
@@ -110,6 +113,11 @@ class BasePredictor:
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.txt_path = None
         self._lock = threading.Lock()  # for automatic thread-safe inference
+        self._letterboxed = None  # uint8 letterbox buffer (n, h, w, 3) reused by preprocess
+        self._input = None  # input tensor (n, 3, h, w) reused by preprocess
+        self._borders = []  # letterbox geometry of every buffer slot
+        self._imgsz_arg = None  # args.imgsz that self.imgsz was checked for by infer_frame
+        self._profilers = None  # profilers reused by infer_frame
         callbacks.add_integration_callbacks(self)
 
     def preprocess(self, im):
@@ -120,6 +128,9 @@ class BasePredictor:
             im (torch.Tensor | List(np.ndarray)): BCHW for tensor, [(HWC) x B] for list.
         """
         not_tensor = not isinstance(im, torch.Tensor)
+        if not_tensor and type(self).pre_transform is BasePredictor.pre_transform:
+            if all(x.ndim == 3 and x.shape[2] == 3 and x.dtype == np.uint8 for x in im):
+                return self.fused_preprocess(im)
         if not_tensor:
             im = np.stack(self.pre_transform(im))
             im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW, (n, 3, h, w)
@@ -132,6 +143,55 @@ class BasePredictor:
             im /= 255  # 0 - 255 to 0.0 - 1.0
         return im
 
+    def fused_preprocess(self, im):
+        """
+        Letterboxes, converts and normalizes a list of BGR images into a reused input tensor.
+
+        Every image is resized straight into its slot of a preallocated uint8 letterbox buffer. The padding keeps its
+        value between calls and is refilled only when the slot geometry changes. A channel split and one normalization
+        per channel (a `NORMALIZE_LUT` lookup on CPU, a division otherwise) then write the RGB planes into a
+        preallocated input tensor. This replaces the letterbox copy, stack, transpose, dtype conversion and division of
+        `preprocess` with a bit-identical result.
+
+        Args:
+            im (List(np.ndarray)): [(h, w, 3) x N] uint8 BGR images.
+
+        Returns:
+            (torch.Tensor): (N, 3, h, w) input tensor. It is overwritten by the next call.
+        """
+        same_shapes = len({x.shape for x in im}) == 1
+        letterbox = LetterBox(self.imgsz, auto=same_shapes and self.model.pt, stride=self.model.stride)
+        geometry = [letterbox.geometry(x.shape[:2])[1::2] for x in im]  # (new_unpad, border) per image
+        (w, h), (top, bottom, left, right) = geometry[0]
+        shape = (len(im), h + top + bottom, w + left + right)
+        dtype = torch.half if self.model.fp16 else torch.float
+        if self._input is None or tuple(self._letterboxed.shape[:3]) != shape or self._input.dtype != dtype:
+            pin = self.device.type == "cuda"  # pinned memory for asynchronous host to device copies
+            self._letterboxed = torch.empty((*shape, 3), dtype=torch.uint8, pin_memory=pin)
+            self._input = torch.empty((shape[0], 3, *shape[1:]), dtype=dtype, device=self.device)
+            self._borders = [None] * len(im)
+        buffer = self._letterboxed.numpy()
+        for i, (x, (new_unpad, border)) in enumerate(zip(im, geometry)):
+            if self._borders[i] != (new_unpad, border):
+                buffer[i] = 114
+                self._borders[i] = (new_unpad, border)
+            top, left = border[0], border[2]
+            out = buffer[i, top : top + new_unpad[1], left : left + new_unpad[0]]
+            if x.shape[1::-1] != new_unpad:
+                cv2.resize(x, new_unpad, dst=out, interpolation=cv2.INTER_LINEAR)
+            else:
+                out[:] = x
+        if self._input.device.type == "cpu" and self._input.dtype == torch.float:
+            out = self._input.numpy()
+            for i in range(len(im)):
+                for c, plane in enumerate(reversed(cv2.split(buffer[i]))):  # BGR to RGB, HWC to CHW
+                    cv2.LUT(plane, NORMALIZE_LUT, dst=out[i, c])  # 0 - 255 to 0.0 - 1.0
+        else:
+            letterboxed = self._letterboxed.to(self.device, non_blocking=True)
+            for c in range(3):  # BGR to RGB, BHWC to BCHW, 0 - 255 to 0.0 - 1.0
+                torch.div(letterboxed[..., 2 - c], 255, out=self._input[:, c])
+        return self._input
+
     def inference(self, im, *args, **kwargs):
         """Runs inference on a given image using the specified model and arguments."""
         visualize = (
@@ -200,6 +260,7 @@ class BasePredictor:
             batch=self.args.batch,
             vid_stride=self.args.vid_stride,
             buffer=self.args.stream_buffer,
+            decode=self.args.stream_decode,
         )
         self.source_type = self.dataset.source_type
         if not getattr(self, "stream", True) and (
@@ -298,6 +359,63 @@ class BasePredictor:
             LOGGER.info(f"Results saved to {colorstr('bold', self.save_dir)}{s}")
         self.run_callbacks("on_predict_end")
 
+    def infer_frame(self, frame, model=None):
+        """
+        Runs inference on a single BGR frame and returns its Results, without the per-call setup of `stream_inference`.
+
+        Args:
+            frame (np.ndarray): (h, w, 3) uint8 BGR image.
+            model (str | Path | nn.Module, optional): Model used if the predictor has none yet.
+
+        Returns:
+            (Results): Results of the frame, with speeds in `Results.speed`.
+        """
+        return self.infer_batch([frame], model)[0]
+
+    @smart_inference_mode()
+    def infer_batch(self, frames, model=None):
+        """
+        Runs inference on a list of BGR frames as one batch, without the per-call setup of `stream_inference`.
+
+        The data source, the profilers and the input buffers of `fused_preprocess` are created once and reused, so a
+        tight loop over frames only pays for preprocess, inference and postprocess. Callbacks are not run and nothing
+        is saved, shown or logged, use `__call__` for those.
+
+        Args:
+            frames (List(np.ndarray)): [(h, w, 3) x N] uint8 BGR images.
+            model (str | Path | nn.Module, optional): Model used if the predictor has none yet.
+
+        Returns:
+            (List[Results]): Results of every frame, with per-image speeds in `Results.speed`.
+        """
+        if not self.model:
+            self.setup_model(model)
+
+        with self._lock:  # for thread-safe inference
+            if self._imgsz_arg != self.args.imgsz:  # checked again only when the argument changes
+                self.imgsz = check_imgsz(self.args.imgsz, stride=self.model.stride, min_dim=2)
+                self._imgsz_arg = self.args.imgsz
+            if not self.done_warmup:
+                self.model.warmup(imgsz=(1 if self.model.pt or self.model.triton else len(frames), 3, *self.imgsz))
+                self.done_warmup = True
+            if self._profilers is None:
+                self._profilers = tuple(ops.Profile(device=self.device) for _ in range(3))
+            profilers = self._profilers
+
+            n = len(frames)
+            self.batch = ([f"image{i}.jpg" for i in range(n)], frames, [""] * n)  # as LoadPilAndNumpy
+            with profilers[0]:
+                im = self.preprocess(frames)
+            with profilers[1]:
+                preds = self.inference(im)
+            with profilers[2]:
+                self.results = self.postprocess(preds, im, frames)
+            self.seen += n
+            speed = {k: p.dt * 1e3 / n for k, p in zip(("preprocess", "inference", "postprocess"), profilers)}
+            for result in self.results:
+                result.speed = dict(speed)
+            return self.results
+
     def setup_model(self, model, verbose=True):
         """Initialize YOLO model with given parameters and set it to evaluation mode."""
         self.model = AutoBackend(
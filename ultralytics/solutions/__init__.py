@@ -3,7 +3,7 @@
 from .ai_gym import AIGym
 from .analytics import Analytics
 from .distance_calculation import DistanceCalculation
-from .heatmap import Heatmap
+from .heatmap import Heatmap, HeatmapAccumulator
 from .object_counter import ObjectCounter
 from .parking_management import ParkingManagement, ParkingPtsSelection
 from .queue_management import QueueManager
@@ -14,6 +14,7 @@ __all__ = (
     "AIGym",
     "DistanceCalculation",
     "Heatmap",
+    "HeatmapAccumulator",
     "ObjectCounter",
     "ParkingManagement",
     "ParkingPtsSelection",
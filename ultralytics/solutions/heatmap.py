@@ -13,6 +13,117 @@ check_requirements("shapely>=2.0.0")
 from shapely.geometry import LineString, Point, Polygon
 
 
+class HeatmapAccumulator:
+    """
+    Decaying or cumulative heat map that stamps cached kernel sprites into the region of each box only.
+
+    The per-frame decay is applied lazily: the array stores `heat / scale` and only the scalar `scale` shrinks each
+    frame, while new heat is added as `weight / scale`. The array is renormalized once `scale` drops below
+    `min_scale`, so the per-frame cost follows the total box area instead of the frame area; `decay=1` accumulates
+    without decay. Kernels are rendered once per size and reused.
+
+    With `grid > 1` heat is accumulated on a grid of `grid` x `grid` pixel cells, which divides memory and stamping
+    cost by `grid**2`. Each cell collects the heat of its pixels, so totals stay comparable across grid sizes, and the
+    grid is only upsampled and colormapped by `render`.
+
+    Attributes:
+        shape (tuple): Frame shape (height, width) the boxes refer to.
+        grid (int): Cell size in pixels, 1 accumulates at full resolution.
+        kernel (str): 'circle' (disc inscribed in the box), 'gaussian' (Gaussian spanning the box) or 'rect'.
+        decay (float): Multiplicative decay per frame, 1 for a cumulative heat map.
+        bucket (int): Gaussian kernel sizes are rounded up to a multiple of `bucket` cells to bound the cache.
+        heat (np.ndarray): Stored heat of shape (ceil(height / grid), ceil(width / grid)), the actual heat is
+            `heat * scale` (see `value`).
+        scale (float): Decay not yet applied to `heat`.
+    """
+
+    def __init__(self, shape, kernel="circle", decay=0.99, grid=1, bucket=8, min_scale=1e-4):
+        """Initialize an empty heat map for frames of `shape` (height, width[, channels])."""
+        if kernel not in {"circle", "gaussian", "rect"}:
+            raise ValueError(f"Invalid kernel '{kernel}', valid values are ['circle', 'gaussian', 'rect']")
+        if int(grid) < 1:
+            raise ValueError(f"Invalid grid {grid}, must be a positive integer")
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.grid = int(grid)
+        self.kernel = kernel
+        self.decay = decay
+        self.bucket = bucket
+        self.min_scale = min_scale
+        self.heat = np.zeros([-(-s // self.grid) for s in self.shape], dtype=np.float32)
+        self.scale = 1.0
+        self._sprites = {}
+
+    def step(self):
+        """Decay the heat by one frame, touching the array only when the pending scale gets too small."""
+        if self.decay == 1:
+            return
+        self.scale *= self.decay
+        if self.scale < self.min_scale:
+            self.heat *= self.scale
+            self.scale = 1.0
+
+    def add(self, boxes, weight=2.0):
+        """Add `weight` of heat per pixel, shaped by the kernel, inside each xyxy box given in frame pixels."""
+        h, w = self.heat.shape
+        value = weight * self.grid**2 / self.scale
+        for x1, y1, x2, y2 in np.asarray(boxes, dtype=np.float64).reshape(-1, 4) / self.grid:
+            bx1, by1, bx2, by2 = max(int(x1), 0), max(int(y1), 0), min(int(x2), w), min(int(y2), h)
+            if bx2 <= bx1 or by2 <= by1:
+                continue
+            if self.kernel == "rect":
+                self.heat[by1:by2, bx1:bx2] += value
+                continue
+            if self.kernel == "circle":
+                sprite = self.sprite(min(int(x2) - int(x1), int(y2) - int(y1)) // 2)
+            else:
+                sprite = self.sprite((int(x2) - int(x1), int(y2) - int(y1)))
+            sh, sw = sprite.shape
+            sx, sy = int((x1 + x2) // 2) - sw // 2, int((y1 + y2) // 2) - sh // 2  # sprite origin in the grid
+            X1, Y1, X2, Y2 = max(sx, bx1), max(sy, by1), min(sx + sw, bx2), min(sy + sh, by2)  # clipped to the box
+            if X2 > X1 and Y2 > Y1:
+                self.heat[Y1:Y2, X1:X2] += value * sprite[Y1 - sy : Y2 - sy, X1 - sx : X2 - sx]
+
+    def sprite(self, size):
+        """Return the cached kernel for a circle radius or a (width, height) box size, both in grid cells."""
+        if self.kernel == "gaussian":
+            size = tuple(max(-(-s // self.bucket) * self.bucket, 1) for s in size)
+        if size not in self._sprites:
+            if self.kernel == "circle":
+                y, x = np.ogrid[-size : size + 1, -size : size + 1]
+                sprite = (x**2 + y**2 <= size**2).astype(np.float32)
+            else:
+                x = (np.arange(size[0], dtype=np.float32) - size[0] // 2) / max(size[0] / 4, 1)  # box spans +-2 sigma
+                y = (np.arange(size[1], dtype=np.float32) - size[1] // 2) / max(size[1] / 4, 1)
+                sprite = np.exp(-0.5 * (y[:, None] ** 2 + x[None] ** 2))
+            self._sprites[size] = sprite
+        return self._sprites[size]
+
+    def value(self):
+        """Return the actual heat per grid cell with the pending decay applied."""
+        return self.heat * self.scale
+
+    def render(self, colormap=cv2.COLORMAP_JET, heat=None):
+        """
+        Min-max normalize the heat map, upsample it to the frame size and apply `colormap`.
+
+        Normalization does not depend on the pending decay scale, so the stored array is used directly. Only the
+        small uint8 grid is resized, and the colormap lookup runs once on the upsampled image.
+
+        Args:
+            colormap (int): OpenCV colormap.
+            heat (np.ndarray, optional): Grid to render instead of the accumulated heat, e.g. a sum of snapshots.
+
+        Returns:
+            (np.ndarray): BGR image of the frame size.
+        """
+        normalized = cv2.normalize(self.heat if heat is None else heat, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+        if self.grid > 1:
+            h, w = self.shape
+            normalized = cv2.resize(normalized, (-(-w // self.grid) * self.grid, -(-h // self.grid) * self.grid))
+            normalized = normalized[:h, :w]
+        return cv2.applyColorMap(normalized, colormap)
+
+
 class Heatmap:
     """A class to draw heatmaps in real-time video stream based on their tracks."""
 
@@ -31,6 +142,8 @@ class Heatmap:
         line_dist_thresh=15,
         line_thickness=2,
         shape="circle",
+        decay_factor=0.99,
+        grid=1,
     ):
         """Initializes the heatmap class with default values for Visual, Image, track, count and heatmap parameters."""
         # Visual information
@@ -47,9 +160,11 @@ class Heatmap:
         self.view_in_counts = view_in_counts
         self.view_out_counts = view_out_counts
 
-        # Heatmap colormap and heatmap np array
+        # Heatmap colormap and heat accumulator, created for the size of the first frame
         self.colormap = colormap
-        self.heatmap = None
+        self.decay_factor = decay_factor
+        self.grid = grid
+        self.accumulator = None
 
         # Predict/track information
         self.boxes = []
@@ -91,8 +206,8 @@ class Heatmap:
                 self.counting_region = LineString(self.count_reg_pts)
 
         # Shape of heatmap, if not selected
-        if self.shape not in {"circle", "rect"}:
-            print("Unknown shape value provided, 'circle' & 'rect' supported")
+        if self.shape not in {"circle", "gaussian", "rect"}:
+            print("Unknown shape value provided, 'circle', 'gaussian' & 'rect' supported")
             print("Using Circular shape now")
             self.shape = "circle"
 
@@ -120,13 +235,16 @@ class Heatmap:
 
         # Initialize heatmap only once
         if not self.initialized:
-            self.heatmap = np.zeros((int(self.im0.shape[0]), int(self.im0.shape[1])), dtype=np.float32)
+            self.accumulator = HeatmapAccumulator(
+                self.im0.shape, kernel=self.shape, decay=self.decay_factor, grid=self.grid
+            )
             self.initialized = True
 
-        self.heatmap *= 0.99  # decay factor
+        self.accumulator.step()  # decay factor
 
         self.extract_results(tracks)
         self.annotator = Annotator(self.im0, self.tf, None)
+        self.accumulator.add(self.boxes)
 
         if self.track_ids:
             # Draw counting region
@@ -140,20 +258,6 @@ class Heatmap:
                 if self.names[cls] not in self.class_wise_count:
                     self.class_wise_count[self.names[cls]] = {"IN": 0, "OUT": 0}
 
-                if self.shape == "circle":
-                    center = (int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2))
-                    radius = min(int(box[2]) - int(box[0]), int(box[3]) - int(box[1])) // 2
-
-                    y, x = np.ogrid[0 : self.heatmap.shape[0], 0 : self.heatmap.shape[1]]
-                    mask = (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2
-
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += (
-                        2 * mask[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])]
-                    )
-
-                else:
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += 2
-
                 # Store tracking hist
                 track_line = self.track_history[track_id]
                 track_line.append((float((box[0] + box[2]) / 2), float((box[1] + box[3]) / 2)))
@@ -193,22 +297,6 @@ class Heatmap:
                                     self.out_counts += 1
                                     self.class_wise_count[self.names[cls]]["OUT"] += 1
 
-        else:
-            for box, cls in zip(self.boxes, self.clss):
-                if self.shape == "circle":
-                    center = (int((box[0] + box[2]) // 2), int((box[1] + box[3]) // 2))
-                    radius = min(int(box[2]) - int(box[0]), int(box[3]) - int(box[1])) // 2
-
-                    y, x = np.ogrid[0 : self.heatmap.shape[0], 0 : self.heatmap.shape[1]]
-                    mask = (x - center[0]) ** 2 + (y - center[1]) ** 2 <= radius**2
-
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += (
-                        2 * mask[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])]
-                    )
-
-                else:
-                    self.heatmap[int(box[1]) : int(box[3]), int(box[0]) : int(box[2])] += 2
-
         if self.count_reg_pts is not None:
             labels_dict = {}
 
@@ -227,8 +315,7 @@ class Heatmap:
                 self.annotator.display_analytics(self.im0, labels_dict, self.count_txt_color, self.count_bg_color, 10)
 
         # Normalize, apply colormap to heatmap and combine with original image
-        heatmap_normalized = cv2.normalize(self.heatmap, None, 0, 255, cv2.NORM_MINMAX)
-        heatmap_colored = cv2.applyColorMap(heatmap_normalized.astype(np.uint8), self.colormap)
+        heatmap_colored = self.accumulator.render(self.colormap)
         self.im0 = cv2.addWeighted(self.im0, 0.5, heatmap_colored, 0.5, 0)
 
         if self.env_check and self.view_img:
@@ -236,6 +323,11 @@ class Heatmap:
 
         return self.im0
 
+    @property
+    def heatmap(self):
+        """Accumulated heat per grid cell with the decay applied, None before the first frame."""
+        return self.accumulator.value() if self.accumulator is not None else None
+
     def display_frames(self):
         """Display frame."""
         cv2.imshow("Ultralytics Heatmap", self.im0)
@@ -251,6 +251,7 @@ class BYTETracker:
 
     Methods:
         update(results, img=None): Updates object tracker with new detections.
+        predict(): Advances tracks by one frame with the Kalman filter only.
         get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
         init_track(dets, scores, cls, img=None): Initialize object tracking with detections.
         get_dists(tracks, detections): Calculates the distance between tracks and detections.
@@ -404,6 +405,23 @@ class BYTETracker:
 
         return np.asarray([x.result for x in self.tracked_stracks if x.is_activated], dtype=np.float32)
 
+    def predict(self):
+        """
+        Advances all tracks by one frame without new detections and returns their Kalman-predicted boxes.
+
+        Used on frames where detection is skipped, so boxes keep moving between detector runs. The returned array has
+        the same layout as `update()`, except that the last column holds the detection index of the last update.
+
+        Examples:
+            >>> tracker = BYTETracker(args, frame_rate=30)
+            >>> tracks = tracker.update(results)  # detection frame
+            >>> tracks = tracker.predict()  # skipped frame
+        """
+        self.frame_id += 1
+        tracked_stracks = [t for t in self.tracked_stracks if t.is_activated]
+        self.multi_predict(self.joint_stracks(tracked_stracks, self.lost_stracks))
+        return np.asarray([x.result for x in tracked_stracks], dtype=np.float32)
+
     def get_kalmanfilter(self):
         """Returns a Kalman filter object for tracking bounding boxes using KalmanFilterXYAH."""
         return KalmanFilterXYAH()
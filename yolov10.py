@@ -2,15 +2,15 @@ import torch
 import cv2
 import supervision as sv
 import sqlite3
-from ultralytics import YOLO
+from service import ClassCounter, ModelRegistry, OverlayRenderer
 import datetime
 import pytz
 
 # Mengatur device untuk menggunakan GPU jika tersedia
 device = 'cuda' if torch.cuda.is_available() else 'cpu'
 
-# Inisialisasi model YOLOv10 dengan perangkat yang dipilih
-model = YOLO('best.pt')
+# Inisialisasi model YOLOv10 dengan perangkat yang dipilih, dimuat dan di-warmup saat pertama dipakai
+model = ModelRegistry(device=device).get('best.pt')
 
 # Membuat koneksi ke SQLite
 def setup_database():
@@ -31,13 +31,19 @@ def setup_database():
 def open_video(video_path):
     return cv2.VideoCapture(video_path)
 
+# Penghitung per kelas dengan np.bincount, dibuat dari nama kelas hasil deteksi pertama
+# agar import modul ini tidak memuat model
+counter = None
+
 # Fungsi untuk mendeteksi objek
 def detect_objects(frame):
+    global counter
     results = model(frame)[0]
     detections = sv.Detections.from_ultralytics(results)
-    person_count = sum(1 for name in detections.data['class_name'] if name == 'Person')
-    head_count = sum(1 for name in detections.data['class_name'] if name == 'Head')
-    return detections, person_count, head_count
+    if counter is None:
+        counter = ClassCounter(results.names)
+    counts = counter(results)
+    return detections, counter.get(counts, 'Person'), counter.get(counts, 'Head')
 
 # Fungsi untuk menyimpan hasil deteksi ke database
 def save_detection(cursor, person_count, head_count):
@@ -47,47 +53,12 @@ def save_detection(cursor, person_count, head_count):
     cursor.execute('''INSERT INTO person (head_count) VALUES (?)''', (head_count,))
     cursor.connection.commit()
 
+# Renderer anotasi: annotator dibuat sekali, bukan setiap frame; teks head tetap di y=50 seperti sebelumnya
+renderer = OverlayRenderer(crowd_threshold=15, hud_rows=(30, 50, 100))
+
 # Fungsi untuk menambahkan anotasi pada frame
 def annotate_frame(frame, detections, person_count, head_count):
-    # Inisialisasi annotator
-    bounding_box_annotator = sv.BoundingBoxAnnotator()
-    label_annotator = sv.LabelAnnotator()
-    
-    # Anotasi bounding box dan label
-    annotated_frame = bounding_box_annotator.annotate(scene=frame, detections=detections)
-    annotated_frame = label_annotator.annotate(scene=annotated_frame, detections=detections)
-
-    # Mendapatkan ukuran frame untuk menghitung posisi teks
-    frame_height, frame_width, _ = frame.shape
-    text = f'Person: {person_count}'
-    text_head = f'Head: {head_count}'
-    
-    # Menentukan posisi teks
-    text_x = frame_width - 200  # Untuk posisi teks
-    text_y_person = 30
-    text_y_head = 50
-
-    # Tambahkan teks jumlah orang dengan warna merah
-    cv2.putText(annotated_frame, text, (text_x, text_y_person), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-    # Tambahkan teks jumlah orang dengan warna merah
-    cv2.putText(annotated_frame, text_head, (text_x, text_y_head), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-
-    # Logika tambahan untuk menambahkan teks "Crowded" atau "Aman"
-    if person_count > 15:
-        status_text = 'Crowded'
-        text_color = (0, 0, 255)  # Merah untuk 'Crowded'
-    else:
-        status_text = 'Uncrowded'
-        text_color = (0, 255, 0)  # Hijau untuk 'Aman'
-
-    # Menentukan posisi teks untuk status (di bawah teks jumlah orang)
-    text_y_status = text_y_person + 70
-
-    # Tambahkan teks status dengan warna yang sesuai
-    cv2.putText(annotated_frame, status_text, (text_x, text_y_status), cv2.FONT_HERSHEY_SIMPLEX, 1, text_color, 2)
-
-    return annotated_frame
+    return renderer.render(frame, detections, person_count, head_count)
 
 
 # Pipeline utama untuk memproses video